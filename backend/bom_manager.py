@@ -1,33 +1,62 @@
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
-from backend.parser import KiCadParser
+from backend.change_detection import stat_signature
 
 
 class BOMService:
     """Central service for BOM generation."""
 
+    RESULT_CACHE_SIZE = 16
+
     def __init__(self, logic):
         self.logic = logic
+        # root path -> (stat_signature of every sheet read, formatted BOM)
+        self._results: "OrderedDict[str, Tuple[FrozenSet, List[Dict[str, object]]]]" = OrderedDict()
+        self._lock = threading.Lock()
 
     def generate_bom(self, root_sch_path: str) -> List[Dict[str, object]]:
         if not root_sch_path or not os.path.exists(root_sch_path):
             print(f"Error: Root schematic path not found: {root_sch_path}")
             return []
 
+        root_key = str(Path(root_sch_path).resolve())
+        cached = self._cached_result(root_key)
+        if cached is not None:
+            print(f"DEBUG: BOM for {Path(root_sch_path).name} unchanged, using cached result")
+            return cached
+
         print(f"DEBUG: Generating BOM from root: {root_sch_path}")
         bom_data: Dict[Tuple[str, str, str], Dict[str, object]] = {}
-
-        def traverse(file_path: str, hierarchy_chain: List[str], uuid_path: str = "/", recursive: bool = True):
-            if file_path in hierarchy_chain or not os.path.exists(file_path):
+        # Per-generation memo: a sheet instantiated N times is looked up once
+        models: Dict[str, Dict] = {}
+        watched = set() # Missing sheets and fallback directories whose appearance/change must invalidate the result
+
+        def load(file_path: str) -> Dict:
+            key = str(Path(file_path).resolve())
+            if key not in models:
+                models[key] = self.logic.schematic_models.get(file_path) or {}
+            return models[key]
+
+        def traverse(file_path: str, hierarchy_chain: List[str], uuid_path: str = "", recursive: bool = True):
+            if file_path in hierarchy_chain:
+                return
+            if not os.path.exists(file_path):
+                watched.add(str(Path(file_path).resolve()))
                 return
 
+            sheets = []
             try:
-                comps, sheets = KiCadParser.parse_schematic(file_path)
-                comps = comps or []
-                sheets = sheets or []
+                model = load(file_path)
+                comps = model.get("components", [])
+                sheets = model.get("sheets", [])
                 sheet_name = Path(file_path).stem
+                if not hierarchy_chain and recursive:
+                    # Instance paths start at the root sheet: /<root uuid>/<sheet uuid>/...
+                    uuid_path = "/" + model.get("uuid", "") if model.get("uuid") else ""
 
                 for comp in comps:
                     ref = self._resolve_reference(comp, uuid_path)
@@ -41,17 +70,48 @@ class BOMService:
             current_dir = Path(file_path).parent
             for sheet in sheets:
                 sub_path = (current_dir / sheet["filename"]).resolve()
-                new_uuid = (uuid_path if uuid_path != "/" else "") + "/" + sheet["uuid"]
-                traverse(str(sub_path), hierarchy_chain + [file_path], new_uuid)
+                sub_uuid = uuid_path + "/" + sheet["uuid"] if uuid_path and sheet.get("uuid") else ""
+                traverse(str(sub_path), hierarchy_chain + [file_path], sub_uuid)
 
         traverse(root_sch_path, [])
 
         if not bom_data:
             project_dir = Path(root_sch_path).parent
+            watched.add(str(project_dir.resolve()))
             for sch_file in project_dir.rglob("*.kicad_sch"):
+                watched.add(str(sch_file.parent.resolve()))
                 traverse(str(sch_file), [], recursive=False)
 
-        return self._format_result(bom_data)
+        self.logic.schematic_models.save()
+        result = self._format_result(bom_data)
+        signature = stat_signature(set(models) | watched)
+        with self._lock:
+            self._results[root_key] = (signature, result)
+            self._results.move_to_end(root_key)
+            while len(self._results) > self.RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return [dict(row) for row in result]
+
+    def invalidate(self, root_sch_path: Optional[str] = None) -> None:
+        """Drops the cached BOM of one root schematic, or all of them."""
+        with self._lock:
+            if root_sch_path is None:
+                self._results.clear()
+            else:
+                self._results.pop(str(Path(root_sch_path).resolve()), None)
+
+    def _cached_result(self, root_key: str) -> Optional[List[Dict[str, object]]]:
+        with self._lock:
+            cached = self._results.get(root_key)
+        if cached is None:
+            return None
+        signature, result = cached
+        # Sheet references live in the sheets themselves, so if none of them changed the hierarchy did not either
+        if stat_signature(path for path, _, _ in signature) != signature:
+            with self._lock:
+                self._results.pop(root_key, None)
+            return None
+        return [dict(row) for row in result]
 
     def _record_component(
         self,
@@ -87,24 +147,11 @@ class BOMService:
         entry["sheets"].add(sheet_name)
 
     def _resolve_reference(self, component: Dict[str, object], uuid_path: str) -> str:
+        """The reference of this sheet instance of the component; the Reference property when unknown."""
         ref = component.get("ref", "?")
         instances = component.get("instances")
-        if not isinstance(instances, list):
-            return ref
-
-        for inst in instances:
-            if not isinstance(inst, list) or not inst:
-                continue
-            if inst[0] != "project":
-                continue
-            for attr in inst[2:]:
-                if not isinstance(attr, list) or attr[0] != "path" or len(attr) < 2:
-                    continue
-                if attr[1] != uuid_path:
-                    continue
-                for child in inst:
-                    if isinstance(child, list) and child[0] == "reference" and len(child) > 1:
-                        ref = child[1]
+        if uuid_path and isinstance(instances, dict):
+            return instances.get(uuid_path) or ref
         return ref
 
     def _format_result(
@@ -12,10 +12,27 @@ class CacheMetadata:
     cache_hash: str = ""
 
 
+@dataclass
+class ChangeCounts:
+    skipped: int = 0  # size and mtime unchanged
+    rehashed: int = 0  # stat changed but the content hash matched
+    reparsed: int = 0
+
+    def record(self, status: str) -> None:
+        if status == "skipped":
+            self.skipped += 1
+        elif status == "rehashed":
+            self.rehashed += 1
+        else:
+            self.reparsed += 1
+
+
 @dataclass
 class CacheDiagnostics:
     metadata: CacheMetadata
     warnings: List[str] = field(default_factory=list)
+    changes: ChangeCounts = field(default_factory=ChangeCounts)
+    timings: Dict[str, float] = field(default_factory=dict)  # seconds per scan phase
 
 
 @dataclass
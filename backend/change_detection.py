@@ -0,0 +1,70 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Tuple
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """blake2b digest of a file's contents, read in chunks so large files never load whole."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class FileCheck:
+    status: str  # "skipped" (stat unchanged), "rehashed" (stat changed, contents not), "changed" or "missing"
+    mtime: float = 0.0
+    size: int = 0
+    hash: str = ""
+
+    @property
+    def unchanged(self) -> bool:
+        return self.status in ("skipped", "rehashed")
+
+
+def check_file(path: Path, entry: Optional[Dict]) -> FileCheck:
+    """
+    Two-level change check against a cache entry holding "mtime", "size" and "hash".
+    Matching size+mtime skips the file; otherwise the contents are hashed, so a checkout or
+    restore that only touched mtimes does not force a reparse. A file that cannot be stat'ed
+    is "missing"; one that cannot be read is "changed".
+    """
+    try:
+        stat = Path(path).stat()
+    except Exception:
+        return FileCheck("missing")
+    mtime, size = stat.st_mtime, stat.st_size
+    entry = entry or {}
+    same_stat = bool(entry) and entry.get("mtime") == mtime and entry.get("size", size) == size
+    if same_stat and entry.get("hash"):
+        return FileCheck("skipped", mtime, size, entry["hash"])
+    try:
+        digest = content_hash(path)
+    except Exception:
+        return FileCheck("changed", mtime, size)
+    if entry.get("hash") == digest or (same_stat and not entry.get("hash")):
+        # Entries written before hashes were stored are trusted on their stat and backfilled
+        return FileCheck("rehashed", mtime, size, digest)
+    return FileCheck("changed", mtime, size, digest)
+
+
+def stat_signature(paths) -> FrozenSet[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Set of (path, mtime_ns, size) for `paths`; a path that cannot be stat'ed records (path, None, None),
+    so its later appearance changes the signature too. Used to validate caches derived from several files.
+    """
+    entries = set()
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            entries.add((path, None, None))
+            continue
+        entries.add((path, stat.st_mtime_ns, stat.st_size))
+    return frozenset(entries)
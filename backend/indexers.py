@@ -1,84 +1,205 @@
 import hashlib
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import asdict
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from pickle import PicklingError
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from backend.cache_models import CacheDiagnostics, CacheMetadata, IndexResult
+from backend.change_detection import check_file
+from backend.library_cache import LazyLibrary, ShardStore
+from backend.parser import KiCadParser
 from backend.path_utils import PathResolver
+from backend.symbol_db import SymbolDatabase
+from backend.symbol_graphics import normalize_graphics, normalize_property_labels
+from backend.symbol_models import PinTable, Symbol
+
+
+def _parse_library_compact(index_lib_symbols, file_path: str) -> Tuple[Tuple[str, ...], List[tuple]]:
+    """
+    Process-pool worker for SymbolIndexer. Returns (fields, rows): the header field names once and
+    one value tuple per symbol, without the fields every symbol of a file repeats (library name,
+    file path), so a single small record per file is pickled back instead of a dict per symbol.
+    _expand_compact rebuilds the header dicts in the parent.
+    """
+    symbols = index_lib_symbols(file_path)
+    fields = []
+    for symbol in symbols:
+        fields.extend(f for f in symbol if f not in fields and f not in SymbolIndexer.SHARED_FIELDS)
+    return tuple(fields), [tuple(symbol.get(f) for f in fields) for symbol in symbols]
+
+
+def _expand_compact(record: Tuple[Tuple[str, ...], List[tuple]]) -> List[Dict]:
+    fields, rows = record
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def _summarize_footprint(parse_footprint_full, file_path: str) -> Dict:
+    """Pool worker for FootprintIndexer: parses one .kicad_mod and returns only its metadata record."""
+    return FootprintIndexer._summarize(parse_footprint_full(file_path, log=False))
 
 
 class SymbolIndexer:
-    FORMAT_VERSION = 3
+    """
+    Indexes symbol libraries into header records (see KiCadParser.index_lib_symbols).
+    Pins and graphics are not kept; SymbolLoader expands a symbol from its recorded span on demand.
+
+    The cache is a small JSON manifest (path -> mtime/size/shard) next to one binary shard per
+    library file (see ShardStore). A warm start reads only the manifest; data_store libraries
+    load their shards on first access. An optional SymbolDatabase is kept in step file by file.
+    """
+
+    FORMAT_VERSION = 5
+    SCAN_BACKENDS = ("thread", "process", "serial")
+    SHARED_FIELDS = ("library", "file_path")
 
-    def __init__(self, parser, resolver: PathResolver, cache_path: Path):
+    def __init__(self, parser, resolver: PathResolver, cache_path: Path, database: Optional[SymbolDatabase] = None):
         self.parser = parser
         self.resolver = resolver
         self.cache_path = Path(cache_path)
+        self.shards = ShardStore(self.cache_path.parent / "shards")
+        self.database = database
 
-    def scan(self, roots: List[str], max_workers: int = 1) -> IndexResult:
+    def scan(self, roots: List[str], max_workers: Optional[int] = None, backend: str = "thread") -> IndexResult:
         diagnostics = CacheDiagnostics(metadata=CacheMetadata(format_version=self.FORMAT_VERSION))
         if not roots:
+            if self.database is not None:
+                self.database.ready = False
             return IndexResult(data_store={}, diagnostics=diagnostics)
         result = IndexResult()
         symbol_paths = list(self._expand_paths(roots))
         symbol_path_strings = [str(p) for p in symbol_paths]
         root_key = ";".join(symbol_path_strings)
-        lib_cache, meta, warnings = self._load_cache(root_key, "files", self.FORMAT_VERSION, "symbol_path")
+        manifest, meta, warnings = self._load_cache(root_key, "files", self.FORMAT_VERSION, "symbol_path")
         diagnostics.metadata = meta
         diagnostics.warnings.extend(warnings)
         cache_updated = False
         current_files = {str(p) for p in symbol_paths}
-        removed = set(lib_cache.keys()) - current_files
+        removed = set(manifest.keys()) - current_files
         if removed:
             for key in removed:
-                lib_cache.pop(key, None)
+                entry = manifest.pop(key, None) or {}
+                self.shards.remove(entry.get("shard", ""))
             cache_updated = True
 
         parse_targets = []
+        checks = {}
         for sym_file in symbol_paths:
             key = str(sym_file)
-            entry = lib_cache.get(key)
-            mtime = self._file_mtime(sym_file)
-            if entry and entry.get("mtime") == mtime and entry.get("symbols"):
+            entry = manifest.get(key)
+            check = checks[key] = check_file(sym_file, entry)
+            if entry and entry.get("shard") and check.unchanged:
+                diagnostics.changes.record(check.status)
+                if check.status == "rehashed":
+                    # Touched but identical (checkout, restore): refresh the stat, keep the shard
+                    entry.update(mtime=check.mtime, size=check.size, hash=check.hash)
+                    cache_updated = True
                 continue
-            parse_targets.append((sym_file, key, mtime))
+            parse_targets.append((sym_file, key, check.mtime))
+
+        fresh = {}
+        for key, mtime, symbols in self._parse_targets(parse_targets, max_workers, backend, diagnostics):
+            try:
+                shard = self.shards.write(key, symbols)
+            except Exception as exc:
+                diagnostics.warnings.append(f"Failed to write cache shard for {key}: {exc}")
+                shard = ""
+            check = checks[key]
+            manifest[key] = {"mtime": mtime, "size": check.size, "hash": check.hash, "shard": shard, "count": len(symbols)}
+            fresh[key] = symbols
+            diagnostics.changes.reparsed += 1
+            cache_updated = True
+        changes = diagnostics.changes
+        print(f"DEBUG: [Library] Scan: {changes.skipped} skipped, {changes.rehashed} rehashed, {changes.reparsed} reparsed")
+        result.data_store = self._build_data_store(manifest, fresh)
+        if self.database is not None:
+            self._sync_database(manifest, fresh, diagnostics)
+        if cache_updated:
+            diagnostics.metadata = self._write_library_cache(manifest, root_key)
+        else:
+            diagnostics.metadata = self._cache_metadata(manifest, root_key)
+        result.diagnostics = diagnostics
+        return result
+
+    def _parse_targets(self, parse_targets, max_workers, backend, diagnostics) -> Iterator[Tuple[str, float, List[Dict]]]:
+        """Parses the changed library files with the configured executor backend."""
+        if not parse_targets:
+            return
+        if backend not in self.SCAN_BACKENDS:
+            diagnostics.warnings.append(f"Unknown scan backend '{backend}', using 'thread'.")
+            backend = "thread"
+        worker_count = max(1, min(max_workers or os.cpu_count() or 1, len(parse_targets)))
+        if backend == "serial" or worker_count == 1:
+            for sym_file, key, mtime in parse_targets:
+                try:
+                    symbols = self.parser.index_lib_symbols(sym_file)
+                except Exception as exc:
+                    diagnostics.warnings.append(f"Failed to parse {key}: {exc}")
+                    continue
+                yield key, mtime, self._strip_shared_fields(symbols)
+            return
 
-        if parse_targets:
-            worker_count = max(1, min(max_workers, len(parse_targets)))
-            if worker_count > 1 and len(parse_targets) > 1:
-                with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        pending = {key: (sym_file, key, mtime) for sym_file, key, mtime in parse_targets}
+        if backend == "process":
+            try:
+                with ProcessPoolExecutor(max_workers=worker_count) as executor:
                     future_map = {
-                        executor.submit(self.parser.parse_lib_full, sym_file): (sym_file, key, mtime)
+                        executor.submit(_parse_library_compact, self.parser.index_lib_symbols, str(sym_file)): (sym_file, key, mtime)
                         for sym_file, key, mtime in parse_targets
                     }
                     for future in as_completed(future_map):
                         sym_file, key, mtime = future_map[future]
                         try:
-                            symbols = future.result()
+                            symbols = _expand_compact(future.result())
+                        except (BrokenProcessPool, PicklingError):
+                            raise
                         except Exception as exc:
+                            pending.pop(key, None)
                             diagnostics.warnings.append(f"Failed to parse {key}: {exc}")
                             continue
-                        lib_cache[key] = {"mtime": mtime, "symbols": symbols}
-                        cache_updated = True
-            else:
-                for sym_file, key, mtime in parse_targets:
-                    try:
-                        symbols = self.parser.parse_lib_full(sym_file)
-                    except Exception as exc:
-                        diagnostics.warnings.append(f"Failed to parse {key}: {exc}")
-                        continue
-                    lib_cache[key] = {"mtime": mtime, "symbols": symbols}
-                    cache_updated = True
-        result.data_store = self._build_data_store(lib_cache)
-        if cache_updated:
-            diagnostics.metadata = self._write_library_cache(lib_cache, root_key)
-        else:
-            diagnostics.metadata = self._cache_metadata(lib_cache, root_key)
-        result.diagnostics = diagnostics
-        return result
+                        pending.pop(key, None)
+                        yield key, mtime, symbols
+                return
+            except (OSError, BrokenProcessPool, PicklingError) as exc:
+                # Sandboxed or frozen environments may refuse to spawn workers; finish with threads.
+                diagnostics.warnings.append(f"Process scan backend unavailable ({exc}); falling back to threads.")
+
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            future_map = {
+                executor.submit(self.parser.index_lib_symbols, sym_file): (sym_file, key, mtime)
+                for sym_file, key, mtime in pending.values()
+            }
+            for future in as_completed(future_map):
+                sym_file, key, mtime = future_map[future]
+                try:
+                    symbols = future.result()
+                except Exception as exc:
+                    diagnostics.warnings.append(f"Failed to parse {key}: {exc}")
+                    continue
+                yield key, mtime, self._strip_shared_fields(symbols)
+
+    def _strip_shared_fields(self, symbols: List[Dict]) -> List[Dict]:
+        """Drops the fields every symbol of a file repeats; shards store them once, by path."""
+        for symbol in symbols:
+            for field in self.SHARED_FIELDS:
+                symbol.pop(field, None)
+        return symbols
+
+    def _restore_shared_fields(self, symbols: List[Dict], sym_file: Path) -> List[Dict]:
+        lib_name = Path(sym_file).stem
+        file_path = str(sym_file)
+        for symbol in symbols:
+            symbol["library"] = lib_name
+            symbol["file_path"] = file_path
+        return symbols
 
     def _expand_paths(self, roots: Iterable[str]) -> Iterable[Path]:
         for root in roots:
@@ -91,27 +212,53 @@ class SymbolIndexer:
             except Exception:
                 continue
 
-    def _file_mtime(self, path: Path) -> float:
-        try:
-            return path.stat().st_mtime
-        except Exception:
-            return 0.0
-
-    def _build_data_store(self, lib_cache: Dict[str, Dict]) -> Dict[str, Dict]:
+    def _build_data_store(self, manifest: Dict[str, Dict], fresh: Dict[str, List[Dict]]) -> Dict[str, LazyLibrary]:
         data_store = {}
-        for file_path, entry in lib_cache.items():
-            symbols = entry.get("symbols") or []
-            if not isinstance(symbols, list) or not symbols:
+        for file_path, entry in manifest.items():
+            if not entry.get("count"):
                 continue
             lib_name = Path(file_path).stem
-            lib_dict = data_store.setdefault(lib_name, {})
-            for symbol in symbols:
-                name = symbol.get("name")
-                if not name:
-                    continue
-                lib_dict[name] = symbol
+            library = data_store.setdefault(lib_name, LazyLibrary())
+            library.add_source(partial(self._load_source, file_path, entry, fresh.get(file_path)))
         return data_store
 
+    def _load_source(self, file_path: str, entry: Dict, symbols: Optional[List[Dict]] = None) -> List[Dict]:
+        """Reads one library file's headers from its shard; a missing or stale shard is rebuilt."""
+        if symbols is None:
+            symbols = self.shards.read(entry.get("shard", ""))
+        if symbols is None:
+            symbols = self._strip_shared_fields(self.parser.index_lib_symbols(file_path))
+            try:
+                entry["shard"] = self.shards.write(file_path, symbols)
+            except Exception as exc:
+                print(f"DEBUG: [Cache] Failed to rewrite shard for {file_path}: {exc}")
+        return self._restore_shared_fields(symbols, Path(file_path))
+
+    def _sync_database(self, manifest: Dict[str, Dict], fresh: Dict[str, List[Dict]], diagnostics: CacheDiagnostics) -> None:
+        """Re-syncs the SQLite index for files parsed this scan or whose content hash differs from the manifest."""
+        db = self.database
+        db.ready = False
+        try:
+            db_states = db.file_states()
+            with db.batch():
+                for file_path in set(db_states) - set(manifest):
+                    db.remove_file(file_path)
+                for file_path, entry in manifest.items():
+                    if file_path not in fresh and db_states.get(file_path) == entry.get("hash"):
+                        continue
+                    symbols = fresh.get(file_path)
+                    if symbols is None:
+                        symbols = self._load_source(file_path, entry)
+                    db.sync_file(
+                        file_path, Path(file_path).stem, entry.get("mtime", 0.0), entry.get("size", 0),
+                        entry.get("hash", ""), symbols,
+                    )
+                # Same order as _build_data_store merges the files in
+                db.set_file_order(manifest)
+            db.ready = True
+        except Exception as exc:
+            diagnostics.warnings.append(f"Failed to update symbol index database: {exc}")
+
     def _load_cache(self, root_key, section_key, expected_version, root_field) -> Tuple[Dict, CacheMetadata, List[str]]:
         metadata = CacheMetadata(format_version=expected_version)
         warnings = []
@@ -132,6 +279,7 @@ class SymbolIndexer:
         metadata.symbol_path = meta_payload.get(root_field, "")
         if metadata.format_version != expected_version:
             warnings.append(f"Cache version mismatch (got {metadata.format_version}, expected {expected_version}).")
+            return {}, metadata, warnings
         if metadata.symbol_path and root_key and metadata.symbol_path != root_key:
             warnings.append(f"Cache root changed: {metadata.symbol_path} -> {root_key}.")
         entries = payload.get(section_key)
@@ -140,17 +288,31 @@ class SymbolIndexer:
             return {}, metadata, warnings
         return entries, metadata, warnings
 
-    def _write_library_cache(self, lib_cache: Dict[str, Dict], root_key: str) -> CacheMetadata:
-        metadata = self._cache_metadata(lib_cache, root_key)
-        payload = {"__meta__": asdict(metadata), "files": lib_cache}
+    def _write_library_cache(self, manifest: Dict[str, Dict], root_key: str) -> CacheMetadata:
+        """Writes the manifest only; shards were written as their libraries were parsed."""
+        metadata = self._cache_metadata(manifest, root_key)
+        payload = {"__meta__": asdict(metadata), "files": manifest}
         try:
             self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_path, "w", encoding="utf-8") as f:
+            tmp = self.cache_path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
                 json.dump(payload, f)
+            os.replace(tmp, self.cache_path)
+            self.shards.prune(entry.get("shard") for entry in manifest.values())
+            self._remove_legacy_cache()
         except Exception as exc:
             metadata.warnings = [f"Failed to write cache: {exc}"]
         return metadata
 
+    def _remove_legacy_cache(self) -> None:
+        """Drops the monolithic library_cache.json written before the sharded format."""
+        legacy = self.cache_path.parent.with_suffix(".json")
+        if legacy.name == "library_cache.json" and legacy.is_file():
+            try:
+                legacy.unlink()
+            except Exception:
+                pass
+
     def _cache_metadata(self, lib_cache: Dict[str, Dict], root_key: str) -> CacheMetadata:
         metadata = CacheMetadata(
             symbol_path=root_key,
@@ -165,41 +327,355 @@ class SymbolIndexer:
         digest = hashlib.sha1()
         for key in sorted(entries.keys()):
             entry = entries[key]
-            digest.update(f"{key}:{entry.get('mtime', 0)}".encode("utf-8"))
+            digest.update(f"{key}:{entry.get('hash') or entry.get('mtime', 0)}".encode("utf-8"))
         return digest.hexdigest()
 
 
+class SymbolLoader:
+    """
+    Expands indexed symbols (pins, shapes, display flags) on demand and keeps the most
+    recently used ones in a bounded LRU, so memory follows what the UI looks at rather
+    than the size of the libraries.
+    """
+
+    DEFAULT_CAPACITY = 256
+    EXPANDED_FIELDS = ("pins", "show_pin_numbers", "show_pin_names", "pin_names_offset")
+
+    def __init__(self, parser, capacity: Optional[int] = None):
+        self.parser = parser
+        self.capacity = capacity or self.DEFAULT_CAPACITY
+        self._cache: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, header: Dict) -> Optional[Dict]:
+        """
+        Returns the full record for an index header. Header fields (properties, file path) win
+        over the file so in-memory edits and resolved paths carry over to the expanded record.
+        """
+        if not header:
+            return None
+        if "pins" in header:
+            return header  # already a full record
+        file_path = header.get("file_path", "")
+        name = header.get("name", "")
+        key = (file_path, name)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._merge(header, cached)
+        self.misses += 1
+
+        symbol = None
+        span = header.get("span")
+        if span and len(span) == 2:
+            symbol = self.parser.parse_lib_symbol_at(file_path, span[0], span[1], name)
+        if symbol is None:
+            # The file changed since it was indexed; re-index it to find the symbol's new span.
+            for entry in self.parser.index_lib_symbols(file_path):
+                if entry.get("name") == name:
+                    header["span"] = entry.get("span")
+                    symbol = self.parser.parse_lib_symbol_at(file_path, header["span"][0], header["span"][1], name)
+                    break
+        if symbol is None:
+            return None
+
+        expanded = {field: symbol.get(field) for field in self.EXPANDED_FIELDS}
+        expanded["pins"] = PinTable.from_dicts(expanded["pins"] or [])
+        # Graphics are kept only in their normalized form (see backend.symbol_graphics)
+        expanded["shapes"] = normalize_graphics(symbol.get("graphics"))
+        expanded["property_labels"] = normalize_property_labels(symbol.get("visual_properties"))
+        self._cache[key] = expanded
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+        return self._merge(header, expanded)
+
+    def invalidate(self, file_path: Optional[str] = None) -> None:
+        """Drops expanded symbols of one library file, or all of them."""
+        if file_path is None:
+            self._cache.clear()
+            return
+        for key in [k for k in self._cache if k[0] == file_path]:
+            self._cache.pop(key, None)
+
+    def _merge(self, header: Dict, expanded: Dict) -> Symbol:
+        record = Symbol(header)
+        record.update(expanded)
+        return record
+
+
+class FootprintGeometryCache:
+    """
+    App-wide LRU of parsed footprint geometry (parse_footprint_full output) keyed by resolved
+    path, mtime and size, so an edited file is re-parsed and an unchanged one never is.
+    Shared by the explorer viewer, pin-to-pad mapping and validation.
+    """
+
+    DEFAULT_CAPACITY = 128
+
+    def __init__(self, parser, capacity: Optional[int] = None):
+        self.parser = parser
+        self.capacity = capacity or self.DEFAULT_CAPACITY
+        self._cache: "OrderedDict[str, Tuple[float, int, Dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path) -> Dict:
+        """Parsed geometry of a .kicad_mod; treat it as read-only, it is shared between callers."""
+        try:
+            path = Path(file_path).resolve()
+            stat = path.stat()
+        except Exception:
+            self.misses += 1
+            return self.parser.parse_footprint_full(file_path)
+        key = str(path)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached[2]
+        self.misses += 1
+        geom = self.parser.parse_footprint_full(path)
+        self._cache[key] = (stat.st_mtime, stat.st_size, geom)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+        return geom
+
+    def invalidate(self, file_path=None) -> None:
+        if file_path is None:
+            self._cache.clear()
+            return
+        try:
+            self._cache.pop(str(Path(file_path).resolve()), None)
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._cache), "capacity": self.capacity, "hits": self.hits, "misses": self.misses}
+
+
 class FootprintIndexer:
-    FORMAT_VERSION = 1
+    """
+    Indexes footprint libraries: library name -> .pretty path, plus one metadata record per
+    .kicad_mod (pad count and numbers, pad sizes, 3D model, bounding box, layers) so the
+    footprint table and validation never re-read unchanged files. Records are refreshed with
+    the same size/mtime/hash check as the symbol cache.
+    """
+
+    FORMAT_VERSION = 2
 
-    def __init__(self, resolver: PathResolver, cache_path: Path):
+    def __init__(self, resolver: PathResolver, cache_path: Path, parser=None):
         self.resolver = resolver
         self.cache_path = Path(cache_path)
+        self.parser = parser or KiCadParser
+        self.footprints: Dict[str, Dict] = {}  # .kicad_mod path -> metadata record
+        self._by_library: Dict[str, List[str]] = {}
+        self._by_name: Dict[str, List[str]] = {}  # footprint name -> .kicad_mod paths (libraries and loose files)
+        self._cached_records: Dict[str, Dict] = {}  # records read by _load_cache
+        self._written: Optional[Tuple[str, Dict[str, str]]] = None  # (root key, library map) last in the cache file
+        self._loose: List[str] = []
+        self._dirty = False  # Records refreshed by refresh_libraries since the cache file was written
 
-    def scan(self, roots: List[str]) -> Tuple[Dict[str, str], CacheDiagnostics]:
+    def scan(self, roots: List[str], max_workers: Optional[int] = None, backend: str = "thread") -> Tuple[Dict[str, str], CacheDiagnostics]:
         diagnostics = CacheDiagnostics(metadata=CacheMetadata(format_version=self.FORMAT_VERSION))
         if not roots:
+            self._set_footprints({}, [])
             return {}, diagnostics
         root_key = ";".join(roots)
-        existing, meta, warnings = self._load_cache(root_key, "libraries", self.FORMAT_VERSION, "footprint_path")
-        diagnostics.metadata = meta
-        diagnostics.warnings.extend(warnings)
+        if self._written is None:
+            existing, meta, warnings = self._load_cache(root_key, "libraries", self.FORMAT_VERSION, "footprint_path")
+            diagnostics.metadata = meta
+            diagnostics.warnings.extend(warnings)
+        else:
+            # The cache file matches what the last scan wrote; only the first scan of a session reads it
+            written_root, existing = self._written
+            if written_root != root_key:
+                existing = None
         new_map = {}
+        loose = []
         for root in roots:
             try:
-                for pretty in Path(root).rglob("*.pretty"):
-                    if pretty.is_dir():
-                        new_map[pretty.stem] = str(pretty)
+                self._walk_root(root, new_map, loose)
             except Exception as exc:
                 diagnostics.warnings.append(f"Failed to scan footprints in {root}: {exc}")
         if not new_map:
+            self._set_footprints({}, loose)
             return {}, diagnostics
-        if new_map != existing:
+        known = self.footprints or self._cached_records
+        self._cached_records = {}
+        records, changed = self._scan_footprints(new_map, known, diagnostics, max_workers, backend)
+        self._set_footprints(records, loose)
+        self._written = (root_key, new_map)
+        if changed or self._dirty or new_map != existing:
             diagnostics.metadata = self._write_cache(new_map, root_key)
+            self._dirty = False
         else:
             diagnostics.metadata = self._cache_metadata(new_map, root_key, root_field="footprint_path")
         return new_map, diagnostics
 
+    def library_footprints(self, lib: str) -> List[Dict]:
+        """Metadata records of one library's footprints, in scan order."""
+        return [self.footprints[path] for path in self._by_library.get(lib, [])]
+
+    def refresh_libraries(self, lib_map: Dict[str, str], max_workers: Optional[int] = None, backend: str = "thread") -> Dict[str, List[Dict]]:
+        """
+        Brings the records of the libraries in `lib_map` up to date with the files on disk (stat per
+        file, hash and reparse only on change) in one pass: the changed files of every library share
+        one parse pool and the index is rebuilt once. Returns lib -> records like library_footprints.
+        The cache file is rewritten by the next scan.
+        """
+        diagnostics = CacheDiagnostics(metadata=CacheMetadata(format_version=self.FORMAT_VERSION))
+        known = {path: self.footprints[path] for lib in lib_map for path in self._by_library.get(lib, [])}
+        lib_records, changed = self._scan_footprints(lib_map, known, diagnostics, max_workers, backend)
+        if changed:
+            records = {path: record for path, record in self.footprints.items() if path not in known}
+            records.update(lib_records)
+            self._set_footprints(records, self._loose)
+            self._dirty = True
+        by_library = {lib: [] for lib in lib_map}
+        for record in lib_records.values():
+            by_library[record.get("library", "")].append(record)
+        return by_library
+
+    def get(self, file_path) -> Optional[Dict]:
+        return self.footprints.get(str(file_path))
+
+    def find_by_name(self, name: str) -> List[str]:
+        """Paths of every .kicad_mod named `name` under the roots, library footprints first."""
+        return list(self._by_name.get(name, ()))
+
+    def _walk_root(self, root: str, lib_map: Dict[str, str], loose: List[str]) -> None:
+        """One walk per root: collects .pretty libraries and .kicad_mod files that sit outside them."""
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            if dirpath.endswith(".pretty") and os.path.isdir(dirpath):
+                lib_map[Path(dirpath).stem] = dirpath
+            if any(part.endswith(".pretty") for part in Path(dirpath).parts):
+                continue
+            loose.extend(os.path.join(dirpath, f) for f in sorted(filenames) if f.endswith(".kicad_mod"))
+
+    def _set_footprints(self, records: Dict[str, Dict], loose: List[str]) -> None:
+        self.footprints = records
+        self._loose = loose
+        by_library = {}
+        by_name = {}
+        for path, record in records.items():
+            by_library.setdefault(record.get("library", ""), []).append(path)
+            by_name.setdefault(record.get("name", ""), []).append(path)
+        for path in loose:
+            by_name.setdefault(Path(path).stem, []).append(path)
+        self._by_library = by_library
+        self._by_name = by_name
+
+    def _scan_footprints(self, lib_map: Dict[str, str], known: Dict[str, Dict], diagnostics: CacheDiagnostics, max_workers=None, backend="thread"):
+        records = {}
+        changed = False
+        parse_targets = []
+        for lib, lib_path in lib_map.items():
+            try:
+                fp_files = list(Path(lib_path).rglob("*.kicad_mod"))
+            except Exception as exc:
+                diagnostics.warnings.append(f"Failed to list footprints in {lib_path}: {exc}")
+                continue
+            for fp_file in fp_files:
+                key = str(fp_file)
+                record = known.get(key)
+                check = check_file(fp_file, record)
+                if check.status == "missing":
+                    continue
+                if record and check.unchanged and record.get("library") == lib:
+                    diagnostics.changes.record(check.status)
+                    if check.status == "rehashed":
+                        record.update(mtime=check.mtime, size=check.size, hash=check.hash)
+                        changed = True
+                    records[key] = record
+                else:
+                    records[key] = None # Placeholder keeps scan order
+                    parse_targets.append((key, lib, check))
+        for (key, lib, check), record in zip(parse_targets, self._parse_footprints([t[0] for t in parse_targets], max_workers, backend)):
+            record.update(
+                library=lib, name=Path(key).stem, file_path=key, mtime=check.mtime, size=check.size, hash=check.hash,
+            )
+            records[key] = record
+            diagnostics.changes.reparsed += 1
+            changed = True
+        if set(records) != set(known):
+            changed = True
+        changes = diagnostics.changes
+        print(f"DEBUG: [Footprint] Index: {changes.skipped} skipped, {changes.rehashed} rehashed, {changes.reparsed} reparsed")
+        return records, changed
+
+    def _parse_footprints(self, paths: List[str], max_workers, backend) -> List[Dict]:
+        """Summaries of `paths`, in order, parsed with the library scan backend ("process", "thread" or "serial")."""
+        worker_count = max(1, min(max_workers or os.cpu_count() or 1, len(paths)))
+        parse = self.parser.parse_footprint_full
+        if backend == "serial" or worker_count == 1:
+            return [_summarize_footprint(parse, path) for path in paths]
+        chunksize = max(1, len(paths) // (worker_count * 4))
+        if backend == "process":
+            try:
+                with ProcessPoolExecutor(max_workers=worker_count) as executor:
+                    return list(executor.map(partial(_summarize_footprint, parse), paths, chunksize=chunksize))
+            except (OSError, BrokenProcessPool, PicklingError) as exc:
+                print(f"DEBUG: [Footprint] Process pool unavailable ({exc}); parsing with threads")
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            return list(executor.map(partial(_summarize_footprint, parse), paths))
+
+    @staticmethod
+    def _summarize(geom: Dict) -> Dict:
+        """Reduces parse_footprint_full output to the fields the explorer and validator read."""
+        pads = geom.get("pads") or []
+        pad_sizes = []
+        layers = set()
+        points = []
+        for pad in pads:
+            size = pad.get("size") or []
+            drill = pad.get("drill")
+            drill_size = drill.get("size") if isinstance(drill, dict) else None
+            pad_sizes.append([
+                float(size[0]) if len(size) > 0 else 0.0,
+                float(size[1]) if len(size) > 1 else 0.0,
+                max(drill_size) if drill_size else 0.0,
+            ])
+            layers.update(layer for layer in pad.get("layers") or () if isinstance(layer, str) and "*" not in layer)
+            at = pad.get("at") or [0.0, 0.0]
+            if len(size) >= 2 and len(at) >= 2:
+                w, h = size[0] / 2, size[1] / 2
+                rot = at[2] % 180 if len(at) > 2 else 0
+                if rot == 90:
+                    w, h = h, w
+                elif rot:
+                    w = h = (w * w + h * h) ** 0.5
+                points.extend([(at[0] - w, at[1] - h), (at[0] + w, at[1] + h)])
+        for line in geom.get("lines") or []:
+            if line.get("layer"):
+                layers.add(line["layer"])
+            for key in ("start", "end"):
+                if len(line.get(key) or ()) >= 2:
+                    points.append(tuple(line[key][:2]))
+            points.extend(tuple(pt[:2]) for pt in line.get("pts") or () if len(pt) >= 2)
+            if line.get("type") == "fp_circle" and len(line.get("center") or ()) >= 2 and len(line.get("end") or ()) >= 2:
+                cx, cy = line["center"][:2]
+                r = ((line["end"][0] - cx) ** 2 + (line["end"][1] - cy) ** 2) ** 0.5
+                points.extend([(cx - r, cy - r), (cx + r, cy + r)])
+        bbox = None
+        if points:
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            bbox = [min(xs), min(ys), max(xs), max(ys)]
+        model = geom.get("model_path")
+        return {
+            "pad_count": len(pads),
+            "pad_numbers": [str(pad.get("number", "")) for pad in pads],
+            "pad_sizes": pad_sizes,  # [width, height, largest drill or 0] per pad
+            "has_model": bool(model),
+            "model": model or "",
+            "bbox": bbox,
+            "layers": sorted(layers),
+        }
+
     def _load_cache(self, root_key, section_key, expected_version, root_field) -> Tuple[Dict[str, str], CacheMetadata, List[str]]:
         metadata = CacheMetadata(format_version=expected_version)
         warnings = []
@@ -220,6 +696,9 @@ class FootprintIndexer:
         metadata.footprint_path = meta_payload.get(root_field, "")
         if metadata.format_version != expected_version:
             warnings.append(f"Footprint cache version mismatch (got {metadata.format_version}).")
+        else:
+            records = payload.get("footprints")
+            self._cached_records = records if isinstance(records, dict) else {}
         if metadata.footprint_path and root_key and metadata.footprint_path != root_key:
             warnings.append(f"Footprint cache root changed: {metadata.footprint_path} -> {root_key}.")
         entries = payload.get(section_key)
@@ -230,11 +709,13 @@ class FootprintIndexer:
 
     def _write_cache(self, lib_map: Dict[str, str], root_key: str) -> CacheMetadata:
         metadata = self._cache_metadata(lib_map, root_key, root_field="footprint_path")
-        payload = {"__meta__": asdict(metadata), "libraries": lib_map}
+        payload = {"__meta__": asdict(metadata), "libraries": lib_map, "footprints": self.footprints}
         try:
             self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_path, "w", encoding="utf-8") as f:
+            tmp = self.cache_path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
                 json.dump(payload, f)
+            os.replace(tmp, self.cache_path)
         except Exception as exc:
             metadata.warnings = [f"Failed to write footprint cache: {exc}"]
         return metadata
@@ -253,3 +734,124 @@ class FootprintIndexer:
         for key in sorted(entries.keys()):
             digest.update(f"{key}:{entries[key]}".encode("utf-8"))
         return digest.hexdigest()
+
+
+class ModelIndexer:
+    """
+    Index of 3D model files under the footprint roots: lowercase filename and stem -> paths.
+    Directory listings are cached with the directory mtime, so a refresh costs one stat per
+    unchanged directory. Built on a background thread; lookups read whatever index is current.
+    """
+
+    FORMAT_VERSION = 1
+    MODEL_EXTENSIONS = (".step", ".stp", ".wrl", ".wrz")
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+        self._dirs: Dict[str, Dict] = {}  # dir -> {"mtime", "files", "subdirs"}
+        self._by_name: Dict[str, List[str]] = {}
+        self._by_stem: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.ready = False  # True once an index is available (loaded from the cache or rebuilt)
+        self.last_scan_seconds = 0.0
+        self._load_cache()
+
+    def refresh_async(self, roots: Iterable[str]) -> None:
+        """Starts a background refresh unless one is already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self.refresh, args=(list(roots),), name="model-index", daemon=True)
+            self._thread.start()
+
+    def refresh(self, roots: Iterable[str]) -> int:
+        """Rescans the roots, re-listing only directories whose mtime changed. Returns the model count."""
+        start = time.perf_counter()
+        previous = self._dirs
+        dirs = {}
+        listed = 0
+        pending = [os.path.normpath(str(root)) for root in roots if root and os.path.isdir(root)]
+        while pending:
+            directory = pending.pop()
+            if directory in dirs:
+                continue
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            entry = previous.get(directory)
+            if not entry or entry.get("mtime") != mtime:
+                entry = self._list_dir(directory, mtime)
+                listed += 1
+            dirs[directory] = entry
+            pending.extend(os.path.join(directory, sub) for sub in entry["subdirs"])
+        self._dirs = dirs
+        self._rebuild_lookup()
+        self.ready = True
+        self.last_scan_seconds = time.perf_counter() - start
+        if listed:
+            self._write_cache()
+        print(f"DEBUG: [Models] Indexed {sum(len(e['files']) for e in dirs.values())} models in {len(dirs)} folders ({listed} re-listed, {self.last_scan_seconds:.2f}s)")
+        return sum(len(e["files"]) for e in dirs.values())
+
+    def find(self, filename: str) -> List[str]:
+        """Paths of models named `filename` (case-insensitive)."""
+        return list(self._by_name.get(filename.lower(), ()))
+
+    def find_stem(self, stem: str) -> List[str]:
+        """Paths of models with this stem in any of MODEL_EXTENSIONS (case-insensitive)."""
+        return list(self._by_stem.get(stem.lower(), ()))
+
+    def _list_dir(self, directory: str, mtime: float) -> Dict:
+        files, subdirs = [], []
+        try:
+            with os.scandir(directory) as it:
+                for item in it:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            subdirs.append(item.name)
+                        elif item.name.lower().endswith(self.MODEL_EXTENSIONS):
+                            files.append(item.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return {"mtime": mtime, "files": files, "subdirs": subdirs}
+
+    def _rebuild_lookup(self) -> None:
+        by_name, by_stem = {}, {}
+        for directory, entry in self._dirs.items():
+            for name in entry["files"]:
+                path = os.path.join(directory, name)
+                by_name.setdefault(name.lower(), []).append(path)
+                by_stem.setdefault(os.path.splitext(name)[0].lower(), []).append(path)
+        self._by_name, self._by_stem = by_name, by_stem
+
+    def _load_cache(self) -> None:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except Exception:
+            return
+        if payload.get("__meta__", {}).get("format_version") != self.FORMAT_VERSION:
+            return
+        dirs = payload.get("dirs")
+        if isinstance(dirs, dict):
+            self._dirs = dirs
+            self._rebuild_lookup()
+            self.ready = True
+
+    def _write_cache(self) -> None:
+        payload = {
+            "__meta__": {"format_version": self.FORMAT_VERSION, "generated_at": datetime.utcnow().isoformat()},
+            "dirs": self._dirs,
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp, self.cache_path)
+        except Exception as exc:
+            print(f"DEBUG: [Models] Failed to write model index: {exc}")
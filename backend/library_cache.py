@@ -0,0 +1,125 @@
+import hashlib
+import os
+import pickle
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from backend.symbol_models import Symbol
+
+
+class ShardStore:
+    """
+    Binary per-file shards of the symbol index. Each shard holds the symbol headers of one
+    library file, so a changed library rewrites only its own shard. Shards are written
+    atomically and start with a magic/version header; a shard that fails the check reads as None.
+    """
+
+    MAGIC = b"KPMSYM"
+    VERSION = 1
+    SUFFIX = ".bin"
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def shard_name(self, file_path: str) -> str:
+        return hashlib.sha1(file_path.encode("utf-8")).hexdigest()[:20] + self.SUFFIX
+
+    def write(self, file_path: str, symbols: List[Dict]) -> str:
+        """Writes the headers of one library file and returns the shard name."""
+        shard = self.shard_name(file_path)
+        payload = pickle.dumps(symbols, protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.directory / shard
+        tmp = target.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(self.MAGIC + bytes([self.VERSION]))
+            f.write(payload)
+        os.replace(tmp, target)
+        return shard
+
+    def read(self, shard: str) -> Optional[List[Dict]]:
+        try:
+            with open(self.directory / shard, "rb") as f:
+                header = f.read(len(self.MAGIC) + 1)
+                if header != self.MAGIC + bytes([self.VERSION]):
+                    return None
+                symbols = pickle.loads(f.read())
+        except Exception:
+            return None
+        return symbols if isinstance(symbols, list) else None
+
+    def remove(self, shard: str) -> None:
+        if not shard:
+            return
+        try:
+            (self.directory / shard).unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as exc:
+            print(f"DEBUG: [Cache] Failed to remove shard {shard}: {exc}")
+
+    def prune(self, keep) -> None:
+        """Deletes shards not referenced by the manifest (left over from older runs)."""
+        if not self.directory.is_dir():
+            return
+        keep = set(keep)
+        for shard in self.directory.glob(f"*{self.SUFFIX}"):
+            if shard.name not in keep:
+                self.remove(shard.name)
+
+
+class LazyLibrary(MutableMapping):
+    """
+    One library's entry in AppLogic.data_store (symbol name -> Symbol). Its sources are only
+    read the first time the library is accessed, so a warm start costs one manifest read.
+    """
+
+    def __init__(self):
+        self._sources: List[Callable[[], List[Dict]]] = []
+        self._symbols: Optional[Dict[str, Symbol]] = None
+
+    def add_source(self, load: Callable[[], List[Dict]]) -> None:
+        """Adds a callable returning the symbol records of one library file."""
+        self._sources.append(load)
+        if self._symbols is not None:
+            self._load()
+
+    @property
+    def loaded(self) -> bool:
+        return self._symbols is not None
+
+    def _load(self) -> Dict[str, Symbol]:
+        if self._symbols is None or self._sources:
+            symbols = self._symbols if self._symbols is not None else {}
+            # Sources are dropped once read so they do not pin freshly parsed records in memory
+            sources, self._sources = self._sources, []
+            for load in sources:
+                for record in load() or []:
+                    name = record.get("name")
+                    if name:
+                        symbols[name] = record if isinstance(record, Symbol) else Symbol.from_record(record)
+            self._symbols = symbols
+        return self._symbols
+
+    def __getitem__(self, name):
+        return self._load()[name]
+
+    def __setitem__(self, name, symbol) -> None:
+        self._load()[name] = symbol
+
+    def __delitem__(self, name) -> None:
+        del self._load()[name]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __contains__(self, name) -> bool:
+        return name in self._load()
+
+    def __repr__(self) -> str:
+        state = f"{len(self._symbols)} symbols" if self._symbols is not None else f"{len(self._sources)} unloaded sources"
+        return f"LazyLibrary({state})"
@@ -4,6 +4,8 @@ import json
 import shutil
 import copy
 import hashlib
+import time
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
@@ -113,7 +115,10 @@ try:
     from .validator import Validator
     from .pricing_manager import PricingManager
     from .bom_manager import BOMService
-    from .indexers import SymbolIndexer, FootprintIndexer
+    from .indexers import SymbolIndexer, SymbolLoader, FootprintIndexer, FootprintGeometryCache, ModelIndexer
+    from .symbol_db import SymbolDatabase
+    from .schematic_cache import SchematicModelCache
+    from .sheet_hierarchy import SheetHierarchy
 except ImportError:
     from parser import KiCadParser
     from backup_manager import BackupManager
@@ -121,7 +126,10 @@ except ImportError:
     from validator import Validator
     from pricing_manager import PricingManager
     from bom_manager import BOMService
-    from indexers import SymbolIndexer, FootprintIndexer
+    from indexers import SymbolIndexer, SymbolLoader, FootprintIndexer, FootprintGeometryCache, ModelIndexer
+    from symbol_db import SymbolDatabase
+    from schematic_cache import SchematicModelCache
+    from sheet_hierarchy import SheetHierarchy
 try:
     from .path_utils import PathResolver
     from .validation_service import ValidationService
@@ -138,7 +146,10 @@ class AppLogic:
     """
     LIB_CACHE_VERSION = 3
     FOOTPRINT_CACHE_VERSION = 1
-    LIBRARY_SCAN_WORKERS = 4
+    LIBRARY_SCAN_WORKERS = None # None sizes the pool to the CPU count
+    LIBRARY_SCAN_BACKEND = "process" # "process", "thread" or "serial"; parsing is GIL-bound, so processes scale
+    SYMBOL_CACHE_SIZE = 256 # Fully expanded symbols kept in memory (LRU)
+    FOOTPRINT_CACHE_SIZE = 128 # Parsed footprint geometries kept in memory (LRU)
 
     def __init__(
         self,
@@ -169,10 +180,13 @@ class AppLogic:
         self.time_tracker_file = self.time_dir / "time_tracker.json"
         self.time_data_file = self.time_dir / "time_data.json"
         self.task_library_path = self.time_dir / "task_library.json"
-        self.library_cache_path = self.cache_dir / "library_cache.json"
+        self.library_cache_path = self.cache_dir / "library_cache" / "manifest.json" # Shards live beside it
         self.footprint_cache_path = self.cache_dir / "footprint_cache.json"
+        self.schematic_cache_path = self.cache_dir / "schematic_cache.json"
+        self.model_index_path = self.cache_dir / "model_index.json" # 3D model filename index
+        self.symbol_db_path = self.cache_dir / "symbol_index.sqlite3" # Searchable index, synced by SymbolIndexer
         self.parts_db_path = self.config_dir / "parts_db.json"
-        self.data_store = {} # Stores parsed symbol data (library_name -> part_name -> data)
+        self.data_store = {} # Stores indexed symbol headers (library_name -> part_name -> data); see get_symbol_data
         self.settings = {
             "symbol_path": "", # Path to KiCad symbol libraries
             "footprint_path": "", # Path to KiCad footprint libraries
@@ -232,14 +246,25 @@ class AppLogic:
         self.library_rules = {} # Per-library required properties
         self.exemptions = {"libraries": {}, "parts": {}, "fp_libraries": {}, "footprints": {}} # Rules exempted for specific libraries/parts/footprints
         self.footprint_lib_map = {} # Map lib_name -> path to .pretty folder
+        self._missing_footprints = set() # Footprint refs not found since the last footprint scan
+        self._footprint_roots_memo = None # ((footprint_path, path_root, resolved root), roots)
+        self._footprint_scanned_roots = None # Roots of the last footprint scan
+        self.footprint_roots_seconds = 0.0 # Cost of the last uncached root discovery
         self.path_resolver = PathResolver(lambda: self.settings.get("path_root", "")) # Shared resolver for relative tokens
         self.paths_config = PathsConfig(self.path_resolver, self.settings)
         self.parser = parser or KiCadParser()
-        self.symbol_indexer = SymbolIndexer(self.parser, self.path_resolver, self.library_cache_path)
-        self.footprint_indexer = FootprintIndexer(self.path_resolver, self.footprint_cache_path)
+        self.symbol_db = self._open_symbol_db()
+        self.symbol_indexer = SymbolIndexer(self.parser, self.path_resolver, self.library_cache_path, self.symbol_db)
+        self.symbol_loader = SymbolLoader(self.parser, self.SYMBOL_CACHE_SIZE)
+        self.footprint_indexer = FootprintIndexer(self.path_resolver, self.footprint_cache_path, self.parser)
+        self.footprint_geometry = FootprintGeometryCache(self.parser, self.FOOTPRINT_CACHE_SIZE)
+        self.model_indexer = ModelIndexer(self.model_index_path)
+        self.schematic_models = SchematicModelCache(self.schematic_cache_path, self.normalize_path)
+        self.sheet_hierarchy = SheetHierarchy(self.schematic_models)
         self.cache_diagnostics = {
             "library": {"warnings": [], "metadata": {}},
             "footprint": {"warnings": [], "metadata": {}},
+            "schematic": {"changes": {}},
         }
         self.load_settings() # Load application settings from file
         self._load_project_registry_store()
@@ -521,33 +546,98 @@ class AppLogic:
             self.settings["symbol_path"] = sym_path_str
             self.save_settings()
 
-        result = self.symbol_indexer.scan(roots, max_workers=self.LIBRARY_SCAN_WORKERS)
+        result = self.symbol_indexer.scan(
+            roots,
+            max_workers=self.settings.get("library_scan_workers") or self.LIBRARY_SCAN_WORKERS,
+            backend=self.settings.get("library_scan_backend") or self.LIBRARY_SCAN_BACKEND,
+        )
         self.data_store = result.data_store
+        self.symbol_loader.invalidate()
         self.cache_diagnostics["library"] = result.diagnostics
         self.project_manager.index_projects()
+        self.cache_diagnostics["schematic"] = {"changes": asdict(self.project_manager.index_changes)}
         return len(self.data_store)
 
+    def get_symbol_data(self, lib, name):
+        """Returns the full symbol record (pins, graphics) for a data_store entry, parsing it on demand."""
+        header = self.data_store.get(lib, {}).get(name)
+        if not header:
+            return None
+        return self.symbol_loader.load(header)
+
+    def _open_symbol_db(self):
+        try:
+            return SymbolDatabase(self.symbol_db_path)
+        except Exception as e:
+            print(f"DEBUG: [SymbolDB] Index database unavailable, falling back to in-memory search: {e}")
+            return None
+
+    def search_symbols(self, text, library=None):
+        """
+        Full-text search over symbol name, description, keywords, value and MPN.
+        Returns a set of "lib:name" ids, or None when the index database is not available or
+        the text is too short to use it. Callers still match library/name substrings themselves
+        and treat these ids as additional hits.
+        """
+        if not self.symbol_db or not self.symbol_db.ready or not self.symbol_db.is_selective(text):
+            return None
+        return {f"{lib}:{name}" for lib, name in self.symbol_db.search(text, library)}
+
     def scan_footprint_libraries(self, force=False):
         """Recursively scans the footprint path(s) for .pretty folders and indexes them."""
+        if force:
+            self.invalidate_footprint_roots()
+        roots_cached = self._footprint_roots_memo is not None
         roots = self._get_footprint_roots()
+        self._footprint_scanned_roots = roots
         if not roots:
             self.footprint_lib_map = {}
             return 0
 
-        new_map, diagnostics = self.footprint_indexer.scan(roots)
+        new_map, diagnostics = self.footprint_indexer.scan(
+            roots,
+            max_workers=self.settings.get("library_scan_workers") or self.LIBRARY_SCAN_WORKERS,
+            backend=self.settings.get("library_scan_backend") or self.LIBRARY_SCAN_BACKEND,
+        )
+        if self.footprint_lib_map and (new_map or {}) != self.footprint_lib_map:
+            # Libraries appeared or disappeared; the fallback decision may change
+            self.invalidate_footprint_roots()
         self.footprint_lib_map = new_map or {}
+        self._missing_footprints.clear()
+        diagnostics.timings["root_discovery"] = 0.0 if roots_cached else self.footprint_roots_seconds
         self.cache_diagnostics["footprint"] = diagnostics
+        self.model_indexer.refresh_async(self._model_roots(roots))
         return len(self.footprint_lib_map)
 
+    def _model_roots(self, roots):
+        """Footprint roots plus the folders holding each .pretty (where .3dshapes usually live)."""
+        model_roots = [os.path.normpath(r) for r in roots]
+        for lib_path in self.footprint_lib_map.values():
+            lib_dir = os.path.dirname(os.path.normpath(lib_path))
+            if not any(self._is_within(lib_dir, r) for r in model_roots):
+                model_roots.append(lib_dir)
+        return model_roots
+
+    @staticmethod
+    def _is_within(path, root):
+        path = os.path.normcase(path)
+        root = os.path.normcase(root).rstrip("\\/")
+        return path == root or path.startswith(root + os.sep)
+
     def get_footprint_data(self, fp_ref):
         """Retrieves parsed footprint data for a given footprint reference (e.g., 'Resistor_SMD:R_0805_2012Metric')."""
         if not fp_ref: return None
         
-        # Ensure index is built if empty
-        if not hasattr(self, 'footprint_lib_map') or not self.footprint_lib_map:
+        roots = self._get_footprint_roots()
+        # Ensure index is built if empty (once per set of roots; an empty result is not rescanned)
+        if not self.footprint_lib_map and self._footprint_scanned_roots != roots:
             self.scan_footprint_libraries()
+            roots = self._get_footprint_roots()
+
+        # References already known to be missing (cleared by the next footprint scan)
+        if fp_ref in self._missing_footprints:
+            return None
 
-        roots = self._get_footprint_roots()
         if not roots:
             return None
         
@@ -576,27 +666,44 @@ class AppLogic:
                 target = c
                 break
         
-        # 3. Deep Search Fallback (Slow, but finds orphans)
+        # 3. Name index from the footprint scan (finds orphans and footprints filed under another library)
         if not target and name:
-            for root in roots:
-                try:
-                    found = list(Path(root).rglob(f"{name}.kicad_mod"))
-                    if found:
-                        target = found[0]
-                        break
-                except Exception:
-                    pass
+            for path in self.footprint_indexer.find_by_name(name):
+                if os.path.isfile(path):
+                    target = Path(path)
+                    break
 
-        if not target: return None
+        if not target:
+            self._missing_footprints.add(fp_ref)
+            return None
 
-        geom = KiCadParser.parse_footprint_full(target)
+        # Shared LRU; copy before adding per-call fields so the cached geometry stays untouched
+        geom = dict(self.footprint_geometry.get(target))
         # Best-effort: resolve model reference to an on-disk file (many footprints store stale/portable paths).
-        if isinstance(geom, dict) and geom.get("model_path"):
+        if geom.get("model_path"):
             geom["model_file"] = self._resolve_3d_model_file(geom.get("model_path"), geom.get("file_path") or str(target))
         return geom
 
+    def invalidate_footprint_roots(self):
+        """Forgets the memoized footprint roots (see _get_footprint_roots)."""
+        self._footprint_roots_memo = None
+
     def _get_footprint_roots(self):
-        """Return valid footprint roots with a safe fallback to BASE_DIR/footprints."""
+        """
+        Return valid footprint roots with a safe fallback to BASE_DIR/footprints.
+        Memoized per footprint_path/path_root; scan_footprint_libraries invalidates it when libraries change.
+        """
+        key = (self.settings.get("footprint_path", ""), self.settings.get("path_root", ""), self.get_path_root())
+        memo = self._footprint_roots_memo
+        if memo is not None and memo[0] == key:
+            return list(memo[1])
+        start = time.perf_counter()
+        roots = self._discover_footprint_roots()
+        self.footprint_roots_seconds = time.perf_counter() - start
+        self._footprint_roots_memo = (key, roots)
+        return list(roots)
+
+    def _discover_footprint_roots(self):
         roots = self.resolve_path_list(self.settings.get("footprint_path", ""))
         valid = [p for p in roots if p and os.path.isdir(p)]
         if valid:
@@ -710,6 +817,9 @@ class AppLogic:
         if not names:
             return ""
 
+        shapes_dir = pretty_dir.with_suffix(".3dshapes") if pretty_dir.name.lower().endswith(".pretty") else None
+
+        # Check the usual model folders next to the library first (no recursive search)
         search_dirs = [
             pretty_dir,
             lib_dir,
@@ -722,8 +832,8 @@ class AppLogic:
             pretty_dir / "3D Model",
             pretty_dir / "3D Models",
         ]
-        if pretty_dir.name.lower().endswith(".pretty"):
-            search_dirs.append(pretty_dir.with_suffix(".3dshapes"))
+        if shapes_dir is not None:
+            search_dirs.append(shapes_dir)
 
         for d in search_dirs:
             try:
@@ -739,15 +849,19 @@ class AppLogic:
                 except Exception:
                     continue
 
-        # Last resort: recursive search inside the library directory.
-        try:
-            if lib_dir.exists():
-                for name in names:
-                    found = next((p for p in lib_dir.rglob(name) if p.is_file()), None)
-                    if found:
-                        return self.normalize_path(str(found))
-        except Exception:
-            pass
+        # Then the model index in place of a recursive search: hits inside the library folder first,
+        # any other root only as a last resort. The index may predate a move or delete, so hits are re-checked.
+        if self.model_indexer.ready:
+            elsewhere = []
+            for name in names:
+                for p in self.model_indexer.find(name):
+                    if not os.path.isfile(p):
+                        continue
+                    if self._is_within(p, str(lib_dir)):
+                        return self.normalize_path(p)
+                    elsewhere.append(p)
+            if elsewhere:
+                return self.normalize_path(elsewhere[0])
 
         return ""
 
@@ -756,14 +870,30 @@ class AppLogic:
         """Delegates to Validator to perform property validation and get statistics."""
         return self.validator.validate_and_get_stats(scope, target_lib)
 
+    def validate_all(self, scope="all", target_lib=None):
+        """Delegates to Validator; returns (failures, stats, exempted failures) from a single pass."""
+        return self.validator.validate_all(scope, target_lib)
+
     def run_validation_summary(self, scope="all", target_lib=None):
         """Runs validation and returns structured summary (cached)."""
         return self.validation_service.run_validation(scope, target_lib)
 
+    def stream_validation(self, scope="all", target_lib=None, cancel=None):
+        """Yields per-library ValidationBatch results; see ValidationService.stream_validation."""
+        return self.validation_service.stream_validation(scope, target_lib, cancel)
+
     def get_cached_validation_summary(self):
         """Returns the last cached validation summary."""
         return self.validation_service.get_cached_summary()
 
+    def get_validation_failures_since(self, since, lib=None, open_only=False):
+        """Failures first reported at or after `since`; see ValidationService.failures_introduced_since."""
+        return self.validation_service.failures_introduced_since(since, lib, open_only)
+
+    def get_validation_trends(self, libs=None, since=None):
+        """Per-library failure counts over recorded validation runs."""
+        return self.validation_service.get_library_trends(libs, since)
+
     def get_exempted_failures(self, scope="all", target_lib=None):
         """Delegates to Validator to get a list of exempted failures."""
         return self.validator.get_exempted_failures(scope, target_lib)
@@ -796,6 +926,10 @@ class AppLogic:
         """Delegates to Validator to bulk edit a symbol property."""
         return self.validator.bulk_edit_property(lib, name, key, new_val)
 
+    def bulk_edit_properties(self, edits):
+        """Delegates to Validator; applies many (lib, name, key, value) edits with one rewrite per file."""
+        return self.validator.bulk_edit_properties(edits)
+
     def add_part_exemption(self, lib, name, rule):
         """Adds an exemption for a specific part from a given rule."""
         uid = f"{lib}:{name}"
@@ -813,87 +947,19 @@ class AppLogic:
 
     def get_subsheets(self, root_path):
         """
-        Recursively finds all sub-schematic files starting from a root schematic path.
-        Uses a robust regex to find sheet references within KiCad schematic files.
+        Returns every schematic file of the hierarchy below a root schematic (root included),
+        from the cached sheet graph.
         """
-        if not root_path or not os.path.exists(root_path): return []
-        
-        found_sheets = set()
-        to_scan = [str(Path(root_path).resolve())]
-        
-        while to_scan:
-            current = to_scan.pop(0)
-            if current in found_sheets: continue
-            found_sheets.add(current)
-            
-            try:
-                with open(current, 'r', encoding='utf-8', errors='replace') as f:
-                    content = f.read()
-                
-                # Robust Regex for KiCad 6/7/8 Sheetfiles
-                # Matches: (property "Sheetfile" "sub.kicad_sch")
-                # Matches: (property "Sheet file" "sub.kicad_sch")
-                # Captures the filename inside the quotes
-                sheets = re.findall(r'\(property\s+"Sheet(?:file| file)"\s+"([^"]+)"', content)
-                
-                # Fallback for older formats or alternative definitions (e.g., (file "sub.kicad_sch"))
-                sheets += re.findall(r'\(file\s+"([^"]+)")', content)
-
-                for s in sheets:
-                    # Resolve relative path to the current schematic file
-                    sub_path = (Path(current).parent / s).resolve()
-                    if sub_path.exists():
-                        to_scan.append(str(sub_path))
-            except: pass
-            
-        return sorted(list(found_sheets))
+        graph = self.sheet_hierarchy.graph(root_path)
+        return graph.files() if graph else []
 
     def get_subsheets_hierarchy(self, root_path):
         """
-        Recursively builds a hierarchical (tree) structure of schematic files
-        starting from a root schematic.
+        Builds a hierarchical (tree) structure of schematic files starting from a root schematic.
         Each node in the tree includes the sheet name, full path, part count, and children.
         """
-        if not root_path or not os.path.exists(root_path): return None
-        
-        def build_tree(path, visited):
-            abs_path = str(Path(path).resolve())
-            # Prevent infinite recursion for cyclic sheet references
-            if abs_path in visited: 
-                return {"name": Path(path).name + " (Recursive)", "path": abs_path, "children": [], "part_count": 0}
-            
-            visited.add(abs_path)
-            
-            # Count parts directly within this specific schematic sheet
-            part_count = 0
-            try:
-                comps, _ = KiCadParser.parse_schematic(path)
-                part_count = len(comps)
-            except: pass
-            
-            node = {"name": Path(path).name, "path": abs_path, "children": [], "part_count": part_count}
-            
-            try:
-                with open(path, 'r', encoding='utf-8', errors='replace') as f:
-                    content = f.read()
-                
-                # Use the same robust regex to find sub-sheets
-                sheets = re.findall(r'\(property\s+"Sheet(?:file| file)"\s+"([^"]+)"', content)
-                sheets += re.findall(r'\(file\s+"([^"]+)")', content)
-                
-                for s in sheets:
-                    sub_path = (Path(path).parent / s).resolve()
-                    if sub_path.exists():
-                        child = build_tree(str(sub_path), visited.copy()) # Recursive call
-                        if child: node["children"].append(child)
-            except: pass
-            
-            # Sort children alphabetically
-            node["children"].sort(key=lambda x: x["name"].lower())
-            
-            return node
-
-        return build_tree(root_path, set())
+        graph = self.sheet_hierarchy.graph(root_path)
+        return graph.tree() if graph else None
 
     def generate_bom(self, root_sch_path):
         """Delegates BOM generation to BOMService for consistent caching."""
@@ -977,6 +1043,8 @@ class AppLogic:
             str(self.parts_db_path),
             str(self.library_cache_path),
             str(self.footprint_cache_path),
+            str(self.model_index_path),
+            str(self.schematic_cache_path),
         ]
 
     def get_git_repositories(self):
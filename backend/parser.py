@@ -1,36 +1,67 @@
+import os
 import re
+import mmap
 import shutil
 import logging
+from contextlib import closing, contextmanager
 from pathlib import Path
 from datetime import datetime
 
+from backend.sexpr import (
+    BYTES_SOURCES,
+    EVENT_ATOM,
+    EVENT_CLOSE,
+    EVENT_OPEN,
+    TOKEN_CLOSE,
+    TOKEN_OPEN,
+    BytesSExprTokenizer,
+    SExprTokenizer,
+    list_end,
+    make_tokenizer,
+)
+from backend.sexpr_writer import SpanEditor, edit_symbol_properties, index_symbol_spans
+
 class KiCadParser:
     # Regex to capture S-expression tokens: parentheses, quoted strings, or plain symbols
     TOKEN_RE = re.compile(r'\(|\)|"(?:\\.|[^"\\])*"|[^\s()]+')
+    # Top-level footprint forms that parse_footprint_full turns into geometry
+    FOOTPRINT_FORM_HEADS = ('pad', 'fp_line', 'fp_rect', 'fp_circle', 'fp_arc', 'fp_poly', 'zone', 'model')
+    # Schematic blocks that never contribute placed components or sheets. lib_symbols embeds a copy
+    # of every used library symbol and usually holds most of a schematic's bytes.
+    SCHEMATIC_SKIP_HEADS = ('lib_symbols',)
+    # File entry points tokenize mmapped bytes; set False to use the chunked str tokenizer instead.
+    USE_BYTES_TOKENIZER = True
 
     @staticmethod
-    def parse_s_expression(content):
-        """Parses KiCad S-Expression strings into a nested list structure."""
-        if not content.strip():
+    def parse_s_expression(content, use_bytes=None):
+        """
+        Parses KiCad S-Expression strings into a nested list structure.
+        Bytes-like content (bytes, mmap) goes through the byte tokenizer; use_bytes forces either path.
+        """
+        if use_bytes is None:
+            use_bytes = isinstance(content, BYTES_SOURCES)
+        if use_bytes and isinstance(content, str):
+            content = content.encode('utf-8')
+        elif not use_bytes and isinstance(content, BYTES_SOURCES):
+            content = bytes(content).decode('utf-8')
+        if not (content.strip() if isinstance(content, (str, bytes, bytearray)) else len(content)):
             print("DEBUG: [S-Expr] Content is empty.")
             return []
 
+        tokens = BytesSExprTokenizer(content) if use_bytes else SExprTokenizer(content)
         stack = [[]]
-        for match in KiCadParser.TOKEN_RE.finditer(content):
-            token = match.group(0)
-            if token == '(':
+        for token in tokens:
+            if token is TOKEN_OPEN:
                 new_list = []
                 stack[-1].append(new_list)
                 stack.append(new_list)
-            elif token == ')':
+            elif token is TOKEN_CLOSE:
                 if len(stack) > 1:
                     stack.pop()
                 else:
                     print("DEBUG: [S-Expr] Warning: Unbalanced closing parenthesis.")
-            elif token.startswith('"'):
-                # Strip quotes and handle escaped internal quotes
-                stack[-1].append(token[1:-1].replace('\\"', '"'))
             else:
+                # Quoted tokens arrive already stripped and unescaped
                 stack[-1].append(token)
 
         if len(stack) != 1:
@@ -38,6 +69,206 @@ class KiCadParser:
 
         return stack[0][0] if stack[0] else []
 
+    @staticmethod
+    @contextmanager
+    def open_source(file_path, binary=None):
+        """
+        Opens a KiCad file for the streaming readers: a read-only mmap for the byte tokenizer
+        (USE_BYTES_TOKENIZER) or a UTF-8 text handle for the str tokenizer.
+        `binary` overrides the setting for readers that need byte offsets.
+        """
+        if binary is None:
+            binary = KiCadParser.USE_BYTES_TOKENIZER
+        if not binary:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                yield f
+            return
+        with open(file_path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                yield b""
+                return
+            try:
+                yield mapped
+            finally:
+                try:
+                    mapped.close()
+                except BufferError:
+                    # A reader still holds the buffer; it is released when collected.
+                    pass
+
+    @staticmethod
+    def iter_s_expression_events(source, skip_heads=None):
+        """
+        Streams a KiCad S-expression as (kind, value, depth) events without building the tree.
+        `source` may be a string, a text file handle or a bytes-like buffer such as an mmap;
+        kind is EVENT_OPEN, EVENT_ATOM or EVENT_CLOSE, and depth is the nesting level of the
+        list being opened, closed or holding the atom (root = 0).
+        Lists whose head token is in `skip_heads` produce no events: the tokenizer bracket-matches
+        past them without tokenizing their contents.
+        """
+        tokenizer = make_tokenizer(source)
+        skip_heads = frozenset(skip_heads or ())
+        depth = -1
+        pending = False  # '(' seen, head token not yet known
+        for token in tokenizer:
+            if pending:
+                pending = False
+                if token in skip_heads:
+                    tokenizer.skip_balanced()
+                    depth -= 1
+                    continue
+                yield (EVENT_OPEN, None, depth)
+            if token is TOKEN_OPEN:
+                depth += 1
+                if skip_heads:
+                    pending = True
+                else:
+                    yield (EVENT_OPEN, None, depth)
+            elif token is TOKEN_CLOSE:
+                if depth < 0:
+                    print("DEBUG: [S-Expr] Warning: Unbalanced closing parenthesis.")
+                    continue
+                yield (EVENT_CLOSE, None, depth)
+                depth -= 1
+            else:
+                yield (EVENT_ATOM, token, depth)
+
+        if pending:
+            yield (EVENT_OPEN, None, depth)
+        if depth >= 0:
+            print(f"DEBUG: [S-Expr] Warning: Unbalanced nesting level ({depth + 1}).")
+
+    @staticmethod
+    def read_root_head(events):
+        """Consumes events up to the root list's head token (e.g. 'kicad_sch') and returns it."""
+        for kind, value, depth in events:
+            if kind == EVENT_ATOM and depth == 0:
+                return value
+            if kind != EVENT_OPEN or depth != 0:
+                return None
+        return None
+
+    @staticmethod
+    def iter_s_expression_forms(events, heads=None, depth=1):
+        """
+        Builds and yields, one at a time, the lists found at `depth` in an event stream.
+        When `heads` is given, lists whose head token is not in it are skipped without being built.
+        """
+        heads = set(heads) if heads else None
+        stack = None
+        pending = False
+        skipping = False
+        for kind, value, level in events:
+            if stack is not None:
+                if kind == EVENT_OPEN:
+                    child = []
+                    stack[-1].append(child)
+                    stack.append(child)
+                elif kind == EVENT_ATOM:
+                    stack[-1].append(value)
+                else:
+                    form = stack.pop()
+                    if not stack:
+                        stack = None
+                        yield form
+                continue
+
+            if skipping:
+                if kind == EVENT_CLOSE and level == depth:
+                    skipping = False
+                continue
+
+            if pending:
+                pending = False
+                if kind == EVENT_ATOM and value in heads:
+                    stack = [[value]]
+                elif kind != EVENT_CLOSE:
+                    skipping = True
+                continue
+
+            if kind == EVENT_OPEN and level == depth:
+                if heads is None:
+                    stack = [[]]
+                else:
+                    pending = True
+
+    @staticmethod
+    def read_top_level_forms(source, heads=None, skip_heads=None):
+        """
+        Fast path for the file entry points: returns (root_head, forms), where forms lazily yields the
+        root's child lists whose head is in `heads`. Unwanted children, and nested lists headed by a
+        token in `skip_heads`, are bracket-skipped by the tokenizer instead of being tokenized.
+        """
+        tokenizer = make_tokenizer(source)
+        tokens = iter(tokenizer)
+        root = next(tokens, None) is TOKEN_OPEN and next(tokens, None)
+        if not isinstance(root, str):
+            return None, KiCadParser._iter_child_forms(tokenizer, iter(()), heads, skip_heads)
+        return root, KiCadParser._iter_child_forms(tokenizer, tokens, heads, skip_heads)
+
+    @staticmethod
+    def _iter_child_forms(tokenizer, tokens, heads, skip_heads):
+        heads = frozenset(heads) if heads else None
+        skip_heads = frozenset(skip_heads or ())
+        for token in tokens:
+            if token is TOKEN_CLOSE:
+                return
+            if token is not TOKEN_OPEN:
+                continue
+            head = next(tokens, None)
+            if head is None:
+                return
+            if head is TOKEN_CLOSE:
+                if heads is None:
+                    yield []
+                continue
+            if heads is not None and head not in heads:
+                if head is not TOKEN_OPEN:
+                    tokenizer.skip_balanced()
+                    continue
+                # List-headed child (never seen in KiCad files): walk it token by token.
+                depth = 2
+                while depth:
+                    token = next(tokens, None)
+                    if token is None:
+                        return
+                    if token is TOKEN_OPEN:
+                        depth += 1
+                    elif token is TOKEN_CLOSE:
+                        depth -= 1
+                continue
+
+            form = []
+            stack = [form]
+            pending = head
+            while True:
+                if pending is not None:
+                    token, pending = pending, None
+                else:
+                    token = next(tokens, None)
+                    if token is None:
+                        yield form
+                        return
+                if token is TOKEN_OPEN:
+                    child_head = next(tokens, None)
+                    if child_head in skip_heads:
+                        tokenizer.skip_balanced()
+                        continue
+                    child = []
+                    stack[-1].append(child)
+                    stack.append(child)
+                    pending = child_head
+                elif token is TOKEN_CLOSE:
+                    stack.pop()
+                    if not stack:
+                        break
+                else:
+                    stack[-1].append(token)
+            yield form
+
     @staticmethod
     def parse_libraries(root_paths):
         file_cache = {}
@@ -58,114 +289,16 @@ class KiCadParser:
         print(f"DEBUG: [Library] --- Parsing: {lib_name} ---")
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            data = KiCadParser.parse_s_expression(content)
-            
-            if not data or data[0] != 'kicad_symbol_lib':
-                print(f"DEBUG: [Library] Header mismatch in {lib_name}. (Found: {data[0] if data else 'None'})")
-                return []
-
-            for item in data[1:]:
-                if isinstance(item, list) and item[0] == 'symbol':
-                    sym_data = {
-                        "library": lib_name,
-                        "name": item[1],
-                            "extends": None,
-                        "file_path": str(file_path),
-                        "properties": {},
-                        "pins": [],
-                        "graphics": [],
-                        "show_pin_numbers": None,
-                        "show_pin_names": None,
-                        "pin_names_offset": None,
-                        "visual_properties": []
-                    }
-
-                    def recursive_extract(node_list):
-                        for node in node_list:
-                            if not isinstance(node, list) or not node:
-                                continue
-                            
-                            head = node[0]
-                            if head == "property" and len(node) >= 3:
-                                sym_data["properties"][node[1]] = node[2]
-                                if node[1] in ["Reference", "Value"]:
-                                    sym_data["visual_properties"].append(node)
-                            elif head == "symbol":
-                                recursive_extract(node)
-                            elif head == "extends":
-                                sym_data["extends"] = node[1]
-                            elif head == "pin_numbers":
-                                sym_data["show_pin_numbers"] = True
-                                for attr in node[1:]:
-                                    if attr == "hide" or (isinstance(attr, list) and len(attr) > 0 and attr[0] == "hide"):
-                                        sym_data["show_pin_numbers"] = False
-                            elif head == "pin_names":
-                                sym_data["show_pin_names"] = True
-                                for attr in node[1:]:
-                                    if attr == "hide" or (isinstance(attr, list) and len(attr) > 0 and attr[0] == "hide"):
-                                        sym_data["show_pin_names"] = False
-                                    elif isinstance(attr, list) and attr[0] == "offset":
-                                        try:
-                                            sym_data["pin_names_offset"] = float(attr[1])
-                                        except: pass
-                            # Inside parser.py -> parse_lib_full -> extract function
-                            elif head == "pin":
-                                # Initialize with a default length of 2.54mm (100 mils) if not found
-                                pin = {"type": node[1], "at": [0,0,0], "number": "?", "name": "", "length": 2.54, "visible": True, "name_visible": True, "num_visible": True, "name_text_size": 1.27, "num_text_size": 1.27, "stroke_width": None}
-                                for attr in node:
-                                    if attr == "hide" or (isinstance(attr, list) and len(attr) > 0 and attr[0] == "hide"):
-                                        pin["visible"] = False
-                                    elif isinstance(attr, list):
-                                        if attr[0] == "at": 
-                                            pin["at"] = [float(x) for x in attr[1:]]
-                                        elif attr[0] == "number": 
-                                            pin["number"] = attr[1]
-                                            for sub in attr[2:]:
-                                                if isinstance(sub, list) and sub[0] == "effects":
-                                                    for effect in sub[1:]:
-                                                        if effect == "hide" or (isinstance(effect, list) and len(effect) > 0 and effect[0] == "hide"):
-                                                            pin["num_visible"] = False
-                                                        elif isinstance(effect, list) and effect[0] == "font":
-                                                            for f in effect[1:]:
-                                                                if isinstance(f, list) and f[0] == "size":
-                                                                    try:
-                                                                        if len(f) > 1: pin["num_text_size"] = float(f[1])
-                                                                    except: pass
-                                        elif attr[0] == "name":
-                                            pin["name"] = attr[1]
-                                            for sub in attr[2:]:
-                                                if isinstance(sub, list) and sub[0] == "effects":
-                                                    for effect in sub[1:]:
-                                                        if effect == "hide" or (isinstance(effect, list) and len(effect) > 0 and effect[0] == "hide"):
-                                                            pin["name_visible"] = False
-                                                        elif isinstance(effect, list) and effect[0] == "font":
-                                                            for f in effect[1:]:
-                                                                if isinstance(f, list) and f[0] == "size":
-                                                                    try:
-                                                                        if len(f) > 1: pin["name_text_size"] = float(f[1])
-                                                                    except: pass
-                                        elif attr[0] == "length":  # Add this check
-                                            pin["length"] = float(attr[1])
-                                        elif attr[0] == "stroke":
-                                            for s_attr in attr[1:]:
-                                                if isinstance(s_attr, list) and s_attr[0] == "width" and len(s_attr) > 1:
-                                                    try:
-                                                        pin["stroke_width"] = float(s_attr[1])
-                                                    except: pass
-                                        elif attr[0] == "width" and len(attr) > 1:
-                                            # Some legacy formats may store width directly
-                                            try:
-                                                pin["stroke_width"] = float(attr[1])
-                                            except: pass
-                                sym_data["pins"].append(pin)
-                            elif head in ["rectangle", "polyline", "circle", "arc", "text"]:
-                                sym_data["graphics"].append(node)
+            # Stream top-level forms so only one symbol is expanded in memory at a time.
+            with KiCadParser.open_source(file_path) as src:
+                root, forms = KiCadParser.read_top_level_forms(src, heads=("symbol",))
+                with closing(forms):
+                    if root != 'kicad_symbol_lib':
+                        print(f"DEBUG: [Library] Header mismatch in {lib_name}. (Found: {root})")
+                        return []
 
-                    recursive_extract(item)
-                    symbols.append(sym_data)
+                    for item in forms:
+                        symbols.append(KiCadParser._extract_lib_symbol(item, lib_name, file_path))
 
             print(f"DEBUG: [Library] {lib_name} parsed. Symbols found: {len(symbols)}")
             
@@ -175,93 +308,343 @@ class KiCadParser:
         return symbols
 
     @staticmethod
-    def parse_footprint_full(file_path):
+    def index_lib_symbols(file_path):
+        """
+        Indexes a symbol library without expanding pins or graphics. Each entry holds the header
+        fields (name, extends, properties, pin numbers) plus `span`, the symbol's [offset, length]
+        in bytes, which parse_lib_symbol_at uses to expand the symbol on demand.
+        """
+        entries = []
+        path = Path(file_path)
+        lib_name = path.stem
+        print(f"DEBUG: [Library] --- Indexing: {lib_name} ---")
+
+        try:
+            # Offsets only make sense for bytes, so this always maps the file.
+            with KiCadParser.open_source(file_path, binary=True) as src:
+                tokenizer = BytesSExprTokenizer(src)
+                tokens = iter(tokenizer)
+                with closing(tokens):
+                    root = next(tokens, None) is TOKEN_OPEN and next(tokens, None)
+                    if root != 'kicad_symbol_lib':
+                        print(f"DEBUG: [Library] Header mismatch in {lib_name}. (Found: {root})")
+                        return []
+
+                    for token in tokens:
+                        if token is TOKEN_CLOSE:
+                            break
+                        if token is not TOKEN_OPEN:
+                            continue
+                        start = tokenizer.offset - 1
+                        head = next(tokens, None)
+                        if head != "symbol":
+                            KiCadParser._finish_list(tokenizer, tokens, head)
+                            continue
+                        entry = KiCadParser._index_lib_symbol(tokenizer, tokens, lib_name, file_path)
+                        if entry:
+                            entry["span"] = [start, tokenizer.offset - start]
+                            entries.append(entry)
+
+            print(f"DEBUG: [Library] {lib_name} indexed. Symbols found: {len(entries)}")
+
+        except Exception as e:
+            print(f"DEBUG: [Library] CRITICAL ERROR in {lib_name}: {e}")
+
+        return entries
+
+    @staticmethod
+    def _index_lib_symbol(tokenizer, tokens, lib_name, file_path):
+        """Reads the header fields of one top-level symbol; everything else is bracket-skipped."""
+        name = next(tokens, None)
+        if not isinstance(name, str):
+            KiCadParser._finish_list(tokenizer, tokens, name)
+            return None
+        entry = {
+            "library": lib_name,
+            "name": name,
+            "extends": None,
+            "file_path": str(file_path),
+            "properties": {},
+            "pin_count": 0,
+            "pin_numbers": [],
+        }
+        depth = 1
+        for token in tokens:
+            if token is TOKEN_CLOSE:
+                depth -= 1
+                if not depth:
+                    break
+                continue
+            if token is not TOKEN_OPEN:
+                continue
+            head = next(tokens, None)
+            if head == "symbol":
+                # Unit sub-symbol: its properties and pins belong to this symbol, as in parse_lib_full
+                depth += 1
+            elif head == "property":
+                key = next(tokens, None)
+                value = next(tokens, None) if isinstance(key, str) else key
+                if isinstance(value, str):
+                    entry["properties"][key] = value
+                KiCadParser._finish_list(tokenizer, tokens, value)
+            elif head == "extends":
+                value = next(tokens, None)
+                if isinstance(value, str):
+                    entry["extends"] = value
+                KiCadParser._finish_list(tokenizer, tokens, value)
+            elif head == "pin":
+                entry["pin_count"] += 1
+                entry["pin_numbers"].append(KiCadParser._read_pin_number(tokenizer, tokens))
+            else:
+                KiCadParser._finish_list(tokenizer, tokens, head)
+        return entry
+
+    @staticmethod
+    def _read_pin_number(tokenizer, tokens):
+        number = "?"
+        for token in tokens:
+            if token is TOKEN_CLOSE:
+                break
+            if token is not TOKEN_OPEN:
+                continue
+            head = next(tokens, None)
+            if head == "number":
+                value = next(tokens, None)
+                if isinstance(value, str):
+                    number = value
+                KiCadParser._finish_list(tokenizer, tokens, value)
+            else:
+                KiCadParser._finish_list(tokenizer, tokens, head)
+        return number
+
+    @staticmethod
+    def _finish_list(tokenizer, tokens, token):
+        """Consumes the rest of the list that `token`, the last token read, belongs to."""
+        if token is TOKEN_CLOSE or token is None:
+            return
+        if token is not TOKEN_OPEN:
+            tokenizer.skip_balanced()
+            return
+        # The list opens with a nested list: walk it token by token.
+        depth = 2
+        for token in tokens:
+            if token is TOKEN_OPEN:
+                depth += 1
+            elif token is TOKEN_CLOSE:
+                depth -= 1
+                if not depth:
+                    return
+
+    @staticmethod
+    def parse_lib_symbol_at(file_path, offset, length, name=None):
+        """
+        Fully expands one library symbol from the byte span recorded by index_lib_symbols.
+        Returns None when the span no longer holds the symbol `name` (the file changed since indexing).
+        """
+        path = Path(file_path)
+        try:
+            with open(file_path, 'rb') as f:
+                f.seek(offset)
+                content = f.read(length)
+            # A stale span no longer covers exactly one balanced list.
+            if list_end(content) != len(content):
+                return None
+            item = KiCadParser.parse_s_expression(content, use_bytes=True)
+        except Exception as e:
+            print(f"DEBUG: [Library] Failed to expand {name} from {path.name}: {e}")
+            return None
+        if not isinstance(item, list) or len(item) < 2 or item[0] != "symbol":
+            return None
+        if name is not None and item[1] != name:
+            return None
+        return KiCadParser._extract_lib_symbol(item, path.stem, file_path)
+
+    @staticmethod
+    def _extract_lib_symbol(item, lib_name, file_path):
+        """Builds the symbol record (properties, pins, graphics) for one top-level library symbol."""
+        sym_data = {
+            "library": lib_name,
+            "name": item[1],
+            "extends": None,
+            "file_path": str(file_path),
+            "properties": {},
+            "pins": [],
+            "graphics": [],
+            "show_pin_numbers": None,
+            "show_pin_names": None,
+            "pin_names_offset": None,
+            "visual_properties": []
+        }
+
+        def recursive_extract(node_list):
+            for node in node_list:
+                if not isinstance(node, list) or not node:
+                    continue
+                
+                head = node[0]
+                if head == "property" and len(node) >= 3:
+                    sym_data["properties"][node[1]] = node[2]
+                    if node[1] in ["Reference", "Value"]:
+                        sym_data["visual_properties"].append(node)
+                elif head == "symbol":
+                    recursive_extract(node)
+                elif head == "extends":
+                    sym_data["extends"] = node[1]
+                elif head == "pin_numbers":
+                    sym_data["show_pin_numbers"] = True
+                    for attr in node[1:]:
+                        if attr == "hide" or (isinstance(attr, list) and len(attr) > 0 and attr[0] == "hide"):
+                            sym_data["show_pin_numbers"] = False
+                elif head == "pin_names":
+                    sym_data["show_pin_names"] = True
+                    for attr in node[1:]:
+                        if attr == "hide" or (isinstance(attr, list) and len(attr) > 0 and attr[0] == "hide"):
+                            sym_data["show_pin_names"] = False
+                        elif isinstance(attr, list) and attr[0] == "offset":
+                            try:
+                                sym_data["pin_names_offset"] = float(attr[1])
+                            except: pass
+                # Inside parser.py -> parse_lib_full -> extract function
+                elif head == "pin":
+                    # Initialize with a default length of 2.54mm (100 mils) if not found
+                    pin = {"type": node[1], "at": [0,0,0], "number": "?", "name": "", "length": 2.54, "visible": True, "name_visible": True, "num_visible": True, "name_text_size": 1.27, "num_text_size": 1.27, "stroke_width": None}
+                    for attr in node:
+                        if attr == "hide" or (isinstance(attr, list) and len(attr) > 0 and attr[0] == "hide"):
+                            pin["visible"] = False
+                        elif isinstance(attr, list):
+                            if attr[0] == "at": 
+                                pin["at"] = [float(x) for x in attr[1:]]
+                            elif attr[0] == "number": 
+                                pin["number"] = attr[1]
+                                for sub in attr[2:]:
+                                    if isinstance(sub, list) and sub[0] == "effects":
+                                        for effect in sub[1:]:
+                                            if effect == "hide" or (isinstance(effect, list) and len(effect) > 0 and effect[0] == "hide"):
+                                                pin["num_visible"] = False
+                                            elif isinstance(effect, list) and effect[0] == "font":
+                                                for f in effect[1:]:
+                                                    if isinstance(f, list) and f[0] == "size":
+                                                        try:
+                                                            if len(f) > 1: pin["num_text_size"] = float(f[1])
+                                                        except: pass
+                            elif attr[0] == "name":
+                                pin["name"] = attr[1]
+                                for sub in attr[2:]:
+                                    if isinstance(sub, list) and sub[0] == "effects":
+                                        for effect in sub[1:]:
+                                            if effect == "hide" or (isinstance(effect, list) and len(effect) > 0 and effect[0] == "hide"):
+                                                pin["name_visible"] = False
+                                            elif isinstance(effect, list) and effect[0] == "font":
+                                                for f in effect[1:]:
+                                                    if isinstance(f, list) and f[0] == "size":
+                                                        try:
+                                                            if len(f) > 1: pin["name_text_size"] = float(f[1])
+                                                        except: pass
+                            elif attr[0] == "length":  # Add this check
+                                pin["length"] = float(attr[1])
+                            elif attr[0] == "stroke":
+                                for s_attr in attr[1:]:
+                                    if isinstance(s_attr, list) and s_attr[0] == "width" and len(s_attr) > 1:
+                                        try:
+                                            pin["stroke_width"] = float(s_attr[1])
+                                        except: pass
+                            elif attr[0] == "width" and len(attr) > 1:
+                                # Some legacy formats may store width directly
+                                try:
+                                    pin["stroke_width"] = float(attr[1])
+                                except: pass
+                    sym_data["pins"].append(pin)
+                elif head in ["rectangle", "polyline", "circle", "arc", "text"]:
+                    sym_data["graphics"].append(node)
+
+        recursive_extract(item)
+        return sym_data
+
+    @staticmethod
+    def parse_footprint_full(file_path, log=True):
         """Parses a KiCad footprint (.kicad_mod) for geometry and 3D model paths."""
         path = Path(file_path)
         geom = {"pads": [], "lines": [], "model_path": None, "file_path": str(file_path)}
-        print(f"DEBUG: [Footprint] Parsing: {path.name}")
+        if log:
+            print(f"DEBUG: [Footprint] Parsing: {path.name}")
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            data = KiCadParser.parse_s_expression(content)
-
             # The top level is ['footprint', 'name', [...sub-elements]]
-            # We need to iterate through the sub-elements
-            elements = []
-            if data and data[0] == 'footprint':
-                elements = data[2:] # Skip 'footprint' and the name
-
-            for item in elements:
-                if not isinstance(item, list) or not item: continue
-                head = item[0]
-                if head == 'pad' and len(item) >= 3:
-                    pad_shape = item[3] if len(item) > 3 and isinstance(item[3], str) else "rect"
-                    pad = {"number": str(item[1]), "type": item[2], "shape": pad_shape, "layers": [], "at": [0.0, 0.0], "size": [0.0, 0.0], "drill": 0.0, "anchor_shape": "rect", "roundrect_rratio": 0.25}
-                    for attr in item:
-                        if isinstance(attr, list):
-                            if attr[0] == 'at': pad['at'] = [float(x) for x in attr[1:]]
-                            elif attr[0] == 'size': pad['size'] = [float(attr[1]), float(attr[2])]
-                            elif attr[0] == 'layers': 
-                                pad['layers'] = attr[1:]
-                                # Expand wildcards for easier UI handling
-                                if "*.Cu" in pad['layers']:
-                                    pad['layers'].extend(["F.Cu", "B.Cu"])
-                                if "*.Mask" in pad['layers']:
-                                    pad['layers'].extend(["F.Mask", "B.Mask"])
-                            elif attr[0] == 'drill':
-                                # Handle (drill 0.8) or (drill oval 1.2 0.8)
-                                if len(attr) == 2:
-                                    try:
-                                        d = float(attr[1])
-                                        pad['drill'] = {'shape': 'circle', 'size': [d, d]}
-                                    except: pass
-                                elif len(attr) >= 3 and attr[1] == 'oval':
-                                    try:
-                                        w = float(attr[2])
-                                        h = float(attr[3]) if len(attr) > 3 else w
-                                        pad['drill'] = {'shape': 'oval', 'size': [w, h]}
-                                    except: pass
-                            elif attr[0] == 'roundrect_rratio':
-                                try: pad['roundrect_rratio'] = float(attr[1])
-                                except: pass
-                            elif attr[0] == 'options':
-                                for opt in attr[1:]:
-                                    if isinstance(opt, list) and opt[0] == 'anchor':
-                                        pad['anchor_shape'] = opt[1]
-                            elif attr[0] == 'primitives':
-                                pad['primitives'] = []
-                                for prim in attr[1:]:
-                                    if isinstance(prim, list):
-                                        prim_data = {'type': prim[0]}
-                                        for p_attr in prim:
-                                            if isinstance(p_attr, list):
-                                                if p_attr[0] == 'pts':
-                                                    prim_data['pts'] = [[float(xy[1]), float(xy[2])] for xy in p_attr[1:] if isinstance(xy, list) and xy[0] == 'xy']
-                                                elif p_attr[0] == 'width':
-                                                    try: prim_data['width'] = float(p_attr[1])
-                                                    except: pass
-                                                elif p_attr[0] in ['start', 'end', 'center', 'mid']: prim_data[p_attr[0]] = [float(x) for x in p_attr[1:]]
-                                                elif p_attr[0] in ['radius', 'angle']: prim_data[p_attr[0]] = float(p_attr[1])
-                                        pad['primitives'].append(prim_data)
-                    geom['pads'].append(pad)
-                elif head in ['fp_line', 'fp_rect', 'fp_circle', 'fp_arc', 'fp_poly', 'zone']:
-                    shape = {'type': head, 'layer': 'F.Fab', 'width': 0.15, 'pts': []}
-                    for attr in item:
-                        if isinstance(attr, list):
-                            if attr[0] == 'layer': shape['layer'] = attr[1]
-                            elif attr[0] == 'width': shape['width'] = float(attr[1])
-                            elif attr[0] == 'start': shape['start'] = [float(x) for x in attr[1:]]
-                            elif attr[0] == 'end': shape['end'] = [float(x) for x in attr[1:]]
-                            elif attr[0] == 'center': shape['center'] = [float(x) for x in attr[1:]]
-                            elif attr[0] == 'angle': shape['angle'] = float(attr[1])
-                            elif attr[0] == 'pts':
-                                shape['pts'] = [[float(xy[1]), float(xy[2])] for xy in attr[1:] if isinstance(xy, list) and xy[0] == 'xy']
-                    geom['lines'].append(shape)
-                elif head == 'model' and len(item) >= 2:
-                    geom['model_path'] = item[1]
-
-            print(f"DEBUG: [Footprint] {path.name} parsed. Pads: {len(geom['pads'])}, Lines: {len(geom['lines'])}")
+            # Only the sub-elements used for geometry are built; the rest is bracket-skipped.
+            with KiCadParser.open_source(file_path) as src:
+                root, forms = KiCadParser.read_top_level_forms(src, heads=KiCadParser.FOOTPRINT_FORM_HEADS)
+                with closing(forms):
+                    for item in (forms if root == 'footprint' else ()):
+                        if not isinstance(item, list) or not item: continue
+                        head = item[0]
+                        if head == 'pad' and len(item) >= 3:
+                            pad_shape = item[3] if len(item) > 3 and isinstance(item[3], str) else "rect"
+                            pad = {"number": str(item[1]), "type": item[2], "shape": pad_shape, "layers": [], "at": [0.0, 0.0], "size": [0.0, 0.0], "drill": 0.0, "anchor_shape": "rect", "roundrect_rratio": 0.25}
+                            for attr in item:
+                                if isinstance(attr, list):
+                                    if attr[0] == 'at': pad['at'] = [float(x) for x in attr[1:]]
+                                    elif attr[0] == 'size': pad['size'] = [float(attr[1]), float(attr[2])]
+                                    elif attr[0] == 'layers': 
+                                        pad['layers'] = attr[1:]
+                                        # Expand wildcards for easier UI handling
+                                        if "*.Cu" in pad['layers']:
+                                            pad['layers'].extend(["F.Cu", "B.Cu"])
+                                        if "*.Mask" in pad['layers']:
+                                            pad['layers'].extend(["F.Mask", "B.Mask"])
+                                    elif attr[0] == 'drill':
+                                        # Handle (drill 0.8) or (drill oval 1.2 0.8)
+                                        if len(attr) == 2:
+                                            try:
+                                                d = float(attr[1])
+                                                pad['drill'] = {'shape': 'circle', 'size': [d, d]}
+                                            except: pass
+                                        elif len(attr) >= 3 and attr[1] == 'oval':
+                                            try:
+                                                w = float(attr[2])
+                                                h = float(attr[3]) if len(attr) > 3 else w
+                                                pad['drill'] = {'shape': 'oval', 'size': [w, h]}
+                                            except: pass
+                                    elif attr[0] == 'roundrect_rratio':
+                                        try: pad['roundrect_rratio'] = float(attr[1])
+                                        except: pass
+                                    elif attr[0] == 'options':
+                                        for opt in attr[1:]:
+                                            if isinstance(opt, list) and opt[0] == 'anchor':
+                                                pad['anchor_shape'] = opt[1]
+                                    elif attr[0] == 'primitives':
+                                        pad['primitives'] = []
+                                        for prim in attr[1:]:
+                                            if isinstance(prim, list):
+                                                prim_data = {'type': prim[0]}
+                                                for p_attr in prim:
+                                                    if isinstance(p_attr, list):
+                                                        if p_attr[0] == 'pts':
+                                                            prim_data['pts'] = [[float(xy[1]), float(xy[2])] for xy in p_attr[1:] if isinstance(xy, list) and xy[0] == 'xy']
+                                                        elif p_attr[0] == 'width':
+                                                            try: prim_data['width'] = float(p_attr[1])
+                                                            except: pass
+                                                        elif p_attr[0] in ['start', 'end', 'center', 'mid']: prim_data[p_attr[0]] = [float(x) for x in p_attr[1:]]
+                                                        elif p_attr[0] in ['radius', 'angle']: prim_data[p_attr[0]] = float(p_attr[1])
+                                                pad['primitives'].append(prim_data)
+                            geom['pads'].append(pad)
+                        elif head in ['fp_line', 'fp_rect', 'fp_circle', 'fp_arc', 'fp_poly', 'zone']:
+                            shape = {'type': head, 'layer': 'F.Fab', 'width': 0.15, 'pts': []}
+                            for attr in item:
+                                if isinstance(attr, list):
+                                    if attr[0] == 'layer': shape['layer'] = attr[1]
+                                    elif attr[0] == 'width': shape['width'] = float(attr[1])
+                                    elif attr[0] == 'start': shape['start'] = [float(x) for x in attr[1:]]
+                                    elif attr[0] == 'end': shape['end'] = [float(x) for x in attr[1:]]
+                                    elif attr[0] == 'center': shape['center'] = [float(x) for x in attr[1:]]
+                                    elif attr[0] == 'angle': shape['angle'] = float(attr[1])
+                                    elif attr[0] == 'pts':
+                                        shape['pts'] = [[float(xy[1]), float(xy[2])] for xy in attr[1:] if isinstance(xy, list) and xy[0] == 'xy']
+                            geom['lines'].append(shape)
+                        elif head == 'model' and len(item) >= 2:
+                            geom['model_path'] = item[1]
+
+            if log:
+                print(f"DEBUG: [Footprint] {path.name} parsed. Pads: {len(geom['pads'])}, Lines: {len(geom['lines'])}")
             
         except Exception as e:
             print(f"DEBUG: [Footprint] Error parsing {path.name}: {e}")
@@ -269,61 +652,68 @@ class KiCadParser:
         return geom
 
     @staticmethod
-    def parse_schematic(file_path):
-        """Extracts components and sheets from a KiCad schematic (.kicad_sch)."""
+    def parse_schematic(file_path, skip_heads=None, root_info=None):
+        """
+        Extracts components and sheets from a KiCad schematic (.kicad_sch).
+        Pass skip_heads (usually SCHEMATIC_SKIP_HEADS) to jump over unused blocks without tokenizing them.
+        Pass a dict as root_info to also receive the schematic's own "uuid" (the root of instance paths).
+        """
         components = []
         sheets = []
         path = Path(file_path)
         print(f"DEBUG: [Schematic] Extracting BOM from: {path.name}")
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            data = KiCadParser.parse_s_expression(content)
-            
-            for item in data:
-                if isinstance(item, list):
-                    if item[0] == 'symbol':
-                        comp = {"ref": "", "value": "", "lib_id": "", "exclude_from_bom": False, "dnp": False, "is_power_symbol": False, "instances": []}
-                        is_power_symbol = False
-                        for sub in item:
-                            if isinstance(sub, list):
-                                if sub[0] == 'lib_id': 
-                                    comp['lib_id'] = sub[1]
-                                elif sub[0] == 'property' and len(sub) >= 3:
-                                    if sub[1] == 'Reference': comp['ref'] = sub[2]
-                                    elif sub[1] == 'Value': comp['value'] = sub[2]
-                                    elif sub[1] == 'Footprint': comp['footprint'] = sub[2]
-                                elif sub[0] == 'attr':
-                                    if 'exclude_from_bom' in sub:
-                                        comp['exclude_from_bom'] = True
-                                    if 'dnp' in sub:
-                                        comp['dnp'] = True
-                                elif sub[0] == 'dnp':
-                                    if len(sub) > 1 and sub[1] == 'yes':
-                                        comp['dnp'] = True
-                                elif sub[0] == 'in_bom':
-                                    if len(sub) > 1 and sub[1] == 'no':
-                                        comp['exclude_from_bom'] = True
-                                elif sub[0] == 'power':
-                                    comp['is_power_symbol'] = True
-                                elif sub[0] == 'instances':
-                                    comp['instances'] = sub
+            # Only top-level symbol/sheet forms are built; everything else is bracket-skipped.
+            with KiCadParser.open_source(file_path) as src:
+                _, forms = KiCadParser.read_top_level_forms(src, heads=("symbol", "sheet", "uuid"), skip_heads=skip_heads)
+                with closing(forms):
+                    for item in forms:
+                        if isinstance(item, list):
+                            if item[0] == 'symbol':
+                                comp = {"ref": "", "value": "", "lib_id": "", "exclude_from_bom": False, "dnp": False, "is_power_symbol": False, "instances": []}
+                                is_power_symbol = False
+                                for sub in item:
+                                    if isinstance(sub, list):
+                                        if sub[0] == 'lib_id': 
+                                            comp['lib_id'] = sub[1]
+                                        elif sub[0] == 'property' and len(sub) >= 3:
+                                            if sub[1] == 'Reference': comp['ref'] = sub[2]
+                                            elif sub[1] == 'Value': comp['value'] = sub[2]
+                                            elif sub[1] == 'Footprint': comp['footprint'] = sub[2]
+                                        elif sub[0] == 'attr':
+                                            if 'exclude_from_bom' in sub:
+                                                comp['exclude_from_bom'] = True
+                                            if 'dnp' in sub:
+                                                comp['dnp'] = True
+                                        elif sub[0] == 'dnp':
+                                            if len(sub) > 1 and sub[1] == 'yes':
+                                                comp['dnp'] = True
+                                        elif sub[0] == 'in_bom':
+                                            if len(sub) > 1 and sub[1] == 'no':
+                                                comp['exclude_from_bom'] = True
+                                        elif sub[0] == 'power':
+                                            comp['is_power_symbol'] = True
+                                        elif sub[0] == 'instances':
+                                            comp['instances'] = sub
                         
-                        if comp['ref']:
-                            components.append(comp)
-
-                    elif item[0] == 'sheet':
-                        sheet = {'uuid': '', 'filename': ''}
-                        for sub in item:
-                            if isinstance(sub, list):
-                                if sub[0] == 'uuid': sheet['uuid'] = sub[1]
-                                elif sub[0] == 'property' and len(sub) >= 3:
-                                    if sub[1] in ["Sheetfile", "Sheet file"]: sheet['filename'] = sub[2]
-                                elif sub[0] == 'file':
-                                    sheet['filename'] = sub[1]
-                        if sheet['filename']:
-                            sheets.append(sheet)
+                                if comp['ref']:
+                                    components.append(comp)
+
+                            elif item[0] == 'sheet':
+                                sheet = {'uuid': '', 'filename': ''}
+                                for sub in item:
+                                    if isinstance(sub, list):
+                                        if sub[0] == 'uuid': sheet['uuid'] = sub[1]
+                                        elif sub[0] == 'property' and len(sub) >= 3:
+                                            if sub[1] in ["Sheetfile", "Sheet file"]: sheet['filename'] = sub[2]
+                                        elif sub[0] == 'file':
+                                            sheet['filename'] = sub[1]
+                                if sheet['filename']:
+                                    sheets.append(sheet)
+
+                            elif item[0] == 'uuid' and len(item) > 1 and root_info is not None:
+                                root_info['uuid'] = item[1]
 
             print(f"DEBUG: [Schematic] {path.name} finished. Found {len(components)} symbols.")
             
@@ -335,42 +725,53 @@ class KiCadParser:
     @staticmethod
     def update_symbol_property(file_path, symbol_name, key, new_value):
         """Safely updates a symbol property on disk with an automatic backup."""
+        success, msg, _ = KiCadParser.update_symbol_properties(file_path, {symbol_name: {key: new_value}})
+        return success, msg
+
+    @staticmethod
+    def update_symbol_properties(file_path, edits):
+        """
+        Applies many property edits to one library file: `edits` maps symbol name -> {key: value},
+        where a missing property is added and a value of None deletes it. Edits are byte splices
+        located by index_symbol_spans, so every other byte is kept, and the file is written once
+        (after a single backup) through a temporary copy.
+        Returns (success, backup path or error, set of (symbol, key) pairs written; empty on failure).
+        """
+        applied = set()
+        tmp_path = None
         try:
             path = Path(file_path)
+            with open(file_path, 'rb') as f:
+                content = f.read()
+            symbols = index_symbol_spans(content)
+            editor = SpanEditor(content)
+            for name, props in edits.items():
+                symbol = symbols.get(name)
+                if symbol is not None:
+                    applied.update((name, key) for key in edit_symbol_properties(editor, symbol, props))
+            if not len(editor):
+                print(f"DEBUG: [Update] No matching properties in '{path.name}'.")
+                return True, "", applied
+            new_content = editor.apply()
+
             backup_path = path.with_suffix(f".{datetime.now().strftime('%Y%m%d_%H%M%S')}.bak")
             shutil.copy(file_path, backup_path)
             print(f"DEBUG: [Update] Backup created at {backup_path.name}")
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-            new_lines = []
-            in_sym = False
-            updated = False
-
-            # Pattern to match: (property "Key" "Value")
-            prop_pattern = re.compile(r'(\(property\s+"' + re.escape(key) + r'"\s+)"(.*?)"')
-
-            for line in lines:
-                stripped = line.strip()
-                # Detection of specific symbol block
-                if stripped.startswith(f'(symbol "{symbol_name}"'):
-                    in_sym = True
-                elif in_sym and stripped.startswith('(symbol '):
-                    in_sym = False
-
-                if in_sym and stripped.startswith(f'(property "{key}"'):
-                    line = prop_pattern.sub(r'\1"' + str(new_value) + '"', line, count=1)
-                    updated = True
-                
-                new_lines.append(line)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(new_content)
+            os.replace(tmp_path, file_path)
 
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.writelines(new_lines)
+            print(f"DEBUG: [Update] {len(applied)} properties updated in '{path.name}'.")
+            return True, str(backup_path), applied
 
-            print(f"DEBUG: [Update] Property '{key}' updated for '{symbol_name}'. Success: {updated}")
-            return True, str(backup_path)
-            
         except Exception as e:
             print(f"DEBUG: [Update] Error: {e}")
-            return False, str(e)
+            if tmp_path is not None:
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+            # Nothing reached disk, so nothing counts as applied
+            return False, str(e), set()
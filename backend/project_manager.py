@@ -1,29 +1,50 @@
 import os
-import re
-import re
-import re
-import re
 import shutil
 import copy
-import json
 from datetime import datetime
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
-from backend.parser import KiCadParser
+from backend.cache_models import ChangeCounts
 from kanban_templates import columns_from_templates
 
+class ProjectUsage:
+    """One project's contribution to the usage indexes, with the schematic stats it was built from."""
+
+    __slots__ = ("stats", "symbols", "footprints", "parts")
+
+    def __init__(self, stats):
+        self.stats = stats # cache key -> (mtime_ns, size)
+        self.symbols = Counter() # lib_id -> placed count
+        self.footprints = Counter() # footprint ref -> placed count
+        self.parts = defaultdict(set) # footprint ref -> part references
+
+    def add(self, components):
+        for comp in components:
+            lib_id = comp.get('lib_id', '')
+            if lib_id:
+                self.symbols[lib_id] += 1
+            footprint_ref = comp.get('footprint', '')
+            if footprint_ref:
+                self.footprints[footprint_ref] += 1
+                ref = comp.get('ref', '')
+                if ref:
+                    self.parts[footprint_ref].add(ref)
+
+
 class ProjectManager:
     """Manages project-specific data, registry, and actions."""
     def __init__(self, logic):
         self.logic = logic
         self.bom_service = logic.bom_service
-        self.project_index = defaultdict(list)
+        self.project_index = defaultdict(set) # lib_id -> project names
         self.project_usage_counts = defaultdict(lambda: defaultdict(int))
-        self.footprint_index = defaultdict(list)
-        self.footprint_parts = defaultdict(list)
-        self._schematic_cache_path = self.logic.cache_dir / "schematic_cache.json"
-        self._schematic_cache = self._load_schematic_cache()
+        self.footprint_index = defaultdict(set) # footprint ref -> project names
+        self.footprint_parts = defaultdict(set) # footprint ref -> part references
+        self.schematic_models = logic.schematic_models
+        self._project_usage = {} # project -> ProjectUsage of its last indexing, reused while its schematics are unchanged
+        self.index_changes = ChangeCounts() # skipped/rehashed/reparsed schematics of the last index_projects
 
     def get_project_data(self, identifier):
         """
@@ -150,75 +171,93 @@ class ProjectManager:
     def index_projects(self):
         """
         Indexes which symbols are used in which projects.
-        Populates self.project_index (lib_id -> [project_names]) and records per-project counts.
+        Populates self.project_index (lib_id -> {project_names}) and records per-project counts.
+        Projects are listed in parallel; only projects whose schematic set or stats changed are
+        re-read, and their changed schematics are parsed on the library scan pool.
         """
-        self.project_index.clear()
-        self.project_usage_counts.clear()
-        self.footprint_index.clear()
-        self.footprint_parts.clear()
         registry = self.logic.settings.get("project_registry", {})
-        cache_dirty = False
-        active_paths = set()
+        locations = {}
         for proj_name, data in registry.items():
             p_path = data.get("metadata", {}).get("location", "")
-            if not p_path or not os.path.exists(p_path):
-                continue
-            
-            proj = proj_name or Path(p_path).stem
-            for sch_file in Path(p_path).rglob("*.kicad_sch"):
-                try:
-                    path_key = self.logic.normalize_path(str(sch_file.resolve()))
-                except Exception:
+            if p_path and os.path.exists(p_path):
+                locations[proj_name or Path(p_path).stem] = p_path
+
+        workers = self.logic.settings.get("library_scan_workers") or self.logic.LIBRARY_SCAN_WORKERS
+        backend = self.logic.settings.get("library_scan_backend") or self.logic.LIBRARY_SCAN_BACKEND
+        listings = {}
+        if locations:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers or os.cpu_count() or 1, len(locations)))) as executor:
+                listings = dict(zip(locations, executor.map(self._list_schematics, locations.values())))
+
+        changes = ChangeCounts()
+        stale = {}
+        for proj, files in listings.items():
+            usage = self._project_usage.get(proj)
+            if usage is not None and usage.stats == {key: stat for key, (_, stat) in files.items()}:
+                changes.skipped += len(files)
+            else:
+                stale[proj] = files
+
+        if stale:
+            paths = {key: path for files in stale.values() for key, (path, _) in files.items()}
+            models = self.schematic_models.refresh(paths.values(), max_workers=workers, backend=backend)
+            for proj, files in stale.items():
+                usage = ProjectUsage({key: stat for key, (_, stat) in files.items()})
+                for key in files:
+                    model, status = models.get(key, (None, "missing"))
+                    if model is None:
+                        continue
+                    changes.record(status)
+                    usage.add(model.get("components", []))
+                self._project_usage[proj] = usage
+        for proj in set(self._project_usage) - set(listings):
+            del self._project_usage[proj]
+
+        project_index = defaultdict(set)
+        usage_counts = defaultdict(lambda: defaultdict(int))
+        footprint_index = defaultdict(set)
+        footprint_parts = defaultdict(set)
+        for proj, usage in self._project_usage.items():
+            for lib_id, count in usage.symbols.items():
+                project_index[lib_id].add(proj)
+                usage_counts[lib_id][proj] += count
+            for footprint_ref, count in usage.footprints.items():
+                footprint_index[footprint_ref].add(proj)
+                usage_counts[footprint_ref][proj] += count
+            for footprint_ref, refs in usage.parts.items():
+                footprint_parts[footprint_ref].update(refs)
+        # Swapped in whole so readers on the UI thread never see a half-built index
+        self.project_index, self.project_usage_counts = project_index, usage_counts
+        self.footprint_index, self.footprint_parts = footprint_index, footprint_parts
+
+        self.schematic_models.prune(key for files in listings.values() for key in files)
+        self.schematic_models.save()
+        self.index_changes = changes
+        print(f"DEBUG: [Projects] Schematic index: {len(stale)}/{len(listings)} projects reindexed, {changes.skipped} skipped, {changes.rehashed} rehashed, {changes.reparsed} reparsed")
+
+    def _list_schematics(self, location):
+        """Returns cache key -> (path, (mtime_ns, size)) for every schematic under a project folder."""
+        files = {}
+        for dirpath, _, filenames in os.walk(location):
+            for filename in filenames:
+                if not filename.endswith(".kicad_sch"):
                     continue
-                active_paths.add(path_key)
+                path = os.path.join(dirpath, filename)
                 try:
-                    mtime = sch_file.stat().st_mtime
+                    stat = os.stat(path)
+                    files[self.schematic_models.key(path)] = (path, (stat.st_mtime_ns, stat.st_size))
                 except Exception:
                     continue
-                cache_entry = self._schematic_cache.get(path_key)
-                if not cache_entry or cache_entry.get("mtime") != mtime:
-                    try:
-                        components, _ = KiCadParser.parse_schematic(sch_file)
-                    except Exception:
-                        continue
-                    processed = []
-                    for comp in components:
-                        processed.append({
-                            "lib_id": comp.get("lib_id", ""),
-                            "footprint": comp.get("footprint", ""),
-                            "ref": comp.get("ref", ""),
-                        })
-                    cache_entry = {"mtime": mtime, "components": processed}
-                    self._schematic_cache[path_key] = cache_entry
-                    cache_dirty = True
-                for comp in cache_entry.get("components", []):
-                    lib_id = comp.get('lib_id', '')
-                    if lib_id:
-                        if proj not in self.project_index[lib_id]:
-                            self.project_index[lib_id].append(proj)
-                        self.project_usage_counts[lib_id][proj] += 1
-                    footprint_ref = comp.get('footprint', '')
-                    ref = comp.get('ref', '')
-                    if footprint_ref:
-                        if proj not in self.footprint_index[footprint_ref]:
-                            self.footprint_index[footprint_ref].append(proj)
-                        if ref and ref not in self.footprint_parts[footprint_ref]:
-                            self.footprint_parts[footprint_ref].append(ref)
-                        self.project_usage_counts[footprint_ref][proj] += 1
-                cache_dirty = cache_dirty or (cache_entry.get("mtime") != mtime)
-        removed = set(self._schematic_cache.keys()) - active_paths
-        if removed:
-            cache_dirty = True
-            for key in removed:
-                self._schematic_cache.pop(key, None)
-        if cache_dirty:
-            self._save_schematic_cache()
+        return files
+
+    def get_projects_using_symbol(self, lib_id):
+        return sorted(self.project_index.get(lib_id, ()))
 
     def get_projects_using_footprint(self, ref):
-        return list(self.footprint_index.get(ref, []))
+        return sorted(self.footprint_index.get(ref, ()))
 
     def get_parts_using_footprint(self, ref):
-        return list(self.footprint_parts.get(ref, []))
+        return sorted(self.footprint_parts.get(ref, ()))
 
     def clone_project(self, source_name, new_name):
         """Clones an existing project registry entry to a new name."""
@@ -275,87 +314,13 @@ class ProjectManager:
                 except: pass
         return count
 
-    def _load_schematic_cache(self):
-        try:
-            if self._schematic_cache_path.exists():
-                with open(self._schematic_cache_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                if isinstance(data, dict):
-                    return data
-        except Exception:
-            pass
-        return {}
-
-    def _save_schematic_cache(self):
-        try:
-            self._schematic_cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self._schematic_cache_path, "w", encoding="utf-8") as f:
-                json.dump(self._schematic_cache, f, indent=2)
-        except Exception:
-            pass
-
     def get_subsheets(self, root_path):
-        if not root_path or not os.path.exists(root_path): return []
-        
-        found_sheets = set()
-        to_scan = [str(Path(root_path).resolve())]
-        
-        while to_scan:
-            current = to_scan.pop(0)
-            if current in found_sheets: continue
-            found_sheets.add(current)
-            
-            try:
-                with open(current, 'r', encoding='utf-8', errors='replace') as f:
-                    content = f.read()
-                
-                sheets = re.findall(r'\(property\s+"Sheet(?:file| file)"\s+"([^"]+)"', content)
-                sheets += re.findall(r'\(file\s+"([^"]+)"\)', content)
-
-                for s in sheets:
-                    sub_path = (Path(current).parent / s).resolve()
-                    if sub_path.exists():
-                        to_scan.append(str(sub_path))
-            except: pass
-            
-        return sorted(list(found_sheets))
+        """Proxy to AppLogic's cached sheet graph."""
+        return self.logic.get_subsheets(root_path)
 
     def get_subsheets_hierarchy(self, root_path):
-        if not root_path or not os.path.exists(root_path): return None
-        
-        def build_tree(path, visited):
-            abs_path = str(Path(path).resolve())
-            if abs_path in visited: 
-                return {"name": Path(path).name + " (Recursive)", "path": abs_path, "children": [], "part_count": 0}
-            
-            visited.add(abs_path)
-            
-            part_count = 0
-            try:
-                comps, _ = KiCadParser.parse_schematic(path)
-                part_count = len(comps)
-            except: pass
-            
-            node = {"name": Path(path).name, "path": abs_path, "children": [], "part_count": part_count}
-            
-            try:
-                with open(path, 'r', encoding='utf-8', errors='replace') as f:
-                    content = f.read()
-                
-                sheets = re.findall(r'\(property\s+"Sheet(?:file| file)"\s+"([^"]+)"', content)
-                sheets += re.findall(r'\(file\s+"([^"]+)"\)', content)
-                
-                for s in sheets:
-                    sub_path = (Path(path).parent / s).resolve()
-                    if sub_path.exists():
-                        child = build_tree(str(sub_path), visited.copy())
-                        if child: node["children"].append(child)
-            except: pass
-            
-            node["children"].sort(key=lambda x: x["name"].lower())
-            return node
-
-        return build_tree(root_path, set())
+        """Proxy to AppLogic's cached sheet graph."""
+        return self.logic.get_subsheets_hierarchy(root_path)
 
     def generate_bom(self, root_sch_path):
         """Proxy to BOMService so callers keep working."""
@@ -0,0 +1,218 @@
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from pickle import PicklingError
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.change_detection import check_file
+from backend.parser import KiCadParser
+
+
+def _instance_refs(instances) -> Dict[str, str]:
+    """
+    Flattens a symbol's raw (instances ...) block to {instance path: reference}.
+    KiCad 7+ nests the reference in the path node; older files put it on the project node.
+    """
+    refs: Dict[str, str] = {}
+    if not isinstance(instances, list):
+        return refs
+    for inst in instances:
+        if not isinstance(inst, list) or not inst or inst[0] != "project":
+            continue
+        project_ref = ""
+        for child in inst:
+            if isinstance(child, list) and child[0] == "reference" and len(child) > 1:
+                project_ref = child[1]
+        for attr in inst[2:]:
+            if not isinstance(attr, list) or attr[0] != "path" or len(attr) < 2:
+                continue
+            ref = project_ref
+            for child in attr[2:]:
+                if isinstance(child, list) and child[0] == "reference" and len(child) > 1:
+                    ref = child[1]
+            if ref:
+                refs[attr[1]] = ref
+    return refs
+
+
+class SchematicModelCache:
+    """
+    Per-file model of every schematic the app has read: the file's own UUID, the BOM fields and
+    instance path -> reference map of each placed symbol, and the child sheets with their UUIDs. The project index, BOM generation and the sheet
+    hierarchy all read through it, so a schematic is parsed once per change. Entries are
+    validated with check_file (size+mtime, then content hash) and persisted to schematic_cache.json.
+    """
+
+    FORMAT_VERSION = 4
+    COMPONENT_KEYS = ("ref", "value", "lib_id", "footprint", "exclude_from_bom", "dnp", "is_power_symbol")
+
+    def __init__(self, cache_path: Path, normalize=None):
+        self.cache_path = Path(cache_path)
+        self._normalize = normalize
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._files: Dict[str, Dict] = self._load()
+
+    def key(self, path) -> str:
+        resolved = str(Path(path).resolve())
+        return self._normalize(resolved) if self._normalize else resolved
+
+    def lookup(self, path) -> Tuple[Optional[Dict], str]:
+        """
+        Returns (entry, status) for one schematic, reparsing it when it changed.
+        Status is "skipped", "rehashed", "reparsed" or "missing" (entry None).
+        """
+        key = self.key(path)
+        with self._lock:
+            entry = self._files.get(key)
+            check = check_file(path, entry)
+            if check.status == "missing":
+                if self._files.pop(key, None) is not None:
+                    self._dirty = True
+                return None, "missing"
+            if entry and check.unchanged:
+                if check.status == "rehashed":
+                    entry.update(mtime=check.mtime, size=check.size, hash=check.hash)
+                    self._dirty = True
+                return entry, check.status
+        # Parse outside the lock so concurrent lookups of other files are not serialized
+        entry = self._parse(path)
+        entry.update(mtime=check.mtime, size=check.size, hash=check.hash)
+        with self._lock:
+            self._files[key] = entry
+            self._dirty = True
+        return entry, "reparsed"
+
+    def refresh(self, paths: Iterable, max_workers: Optional[int] = None, backend: str = "thread") -> Dict[str, Tuple[Optional[Dict], str]]:
+        """
+        Batch form of lookup: brings the models of `paths` up to date, parsing the changed files
+        in parallel ("process", "thread" or "serial", as for library scans). Returns key -> (entry, status),
+        where status is one of lookup's or "failed".
+        """
+        results: Dict[str, Tuple[Optional[Dict], str]] = {}
+        targets = []
+        with self._lock:
+            for path in paths:
+                key = self.key(path)
+                entry = self._files.get(key)
+                check = check_file(path, entry)
+                if check.status == "missing":
+                    if self._files.pop(key, None) is not None:
+                        self._dirty = True
+                    results[key] = (None, "missing")
+                elif entry and check.unchanged:
+                    if check.status == "rehashed":
+                        entry.update(mtime=check.mtime, size=check.size, hash=check.hash)
+                        self._dirty = True
+                    results[key] = (entry, check.status)
+                else:
+                    targets.append((key, str(path), check))
+        for (key, _, check), entry in zip(targets, self._parse_all([path for _, path, _ in targets], max_workers, backend)):
+            if entry is None:
+                results[key] = (None, "failed")
+                continue
+            entry.update(mtime=check.mtime, size=check.size, hash=check.hash)
+            with self._lock:
+                self._files[key] = entry
+                self._dirty = True
+            results[key] = (entry, "reparsed")
+        return results
+
+    def get(self, path) -> Optional[Dict]:
+        return self.lookup(path)[0]
+
+    def components(self, path) -> List[Dict]:
+        entry = self.get(path)
+        return entry.get("components", []) if entry else []
+
+    def sheets(self, path) -> List[Dict]:
+        entry = self.get(path)
+        return entry.get("sheets", []) if entry else []
+
+    def invalidate(self, path=None) -> None:
+        """Drops one file's model (or all of them) so the next lookup reparses it."""
+        with self._lock:
+            if path is None:
+                self._dirty = self._dirty or bool(self._files)
+                self._files.clear()
+            elif self._files.pop(self.key(path), None) is not None:
+                self._dirty = True
+
+    def prune(self, keep: Iterable[str]) -> None:
+        """Forgets cached files whose keys are not in `keep`."""
+        keep = set(keep)
+        with self._lock:
+            for key in list(self._files):
+                if key not in keep:
+                    del self._files[key]
+                    self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": self.FORMAT_VERSION, "files": self._files}
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.cache_path.with_suffix(".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(payload, f)
+                os.replace(tmp, self.cache_path)
+                self._dirty = False
+            except Exception as exc:
+                print(f"DEBUG: [Schematic] Failed to save model cache: {exc}")
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return {}
+        # Caches from before the model held BOM fields and sheets are rebuilt on first use
+        if not isinstance(data, dict) or data.get("version") != self.FORMAT_VERSION:
+            self._dirty = True
+            return {}
+        files = data.get("files")
+        return files if isinstance(files, dict) else {}
+
+    @classmethod
+    def _parse_all(cls, paths: List[str], max_workers: Optional[int], backend: str) -> List[Optional[Dict]]:
+        """Parses `paths` in order; a file that fails to parse yields None."""
+        worker_count = max(1, min(max_workers or os.cpu_count() or 1, len(paths)))
+        if backend == "serial" or worker_count == 1:
+            return [_parse_model(path) for path in paths]
+        if backend == "process":
+            try:
+                with ProcessPoolExecutor(max_workers=worker_count) as executor:
+                    return list(executor.map(_parse_model, paths, chunksize=max(1, len(paths) // (worker_count * 4))))
+            except (OSError, BrokenProcessPool, PicklingError) as exc:
+                print(f"DEBUG: [Schematic] Process pool unavailable ({exc}); parsing with threads")
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            return list(executor.map(_parse_model, paths))
+
+    @classmethod
+    def _parse(cls, path) -> Dict:
+        root_info = {}
+        comps, sheets = KiCadParser.parse_schematic(path, skip_heads=KiCadParser.SCHEMATIC_SKIP_HEADS, root_info=root_info)
+        components = []
+        for comp in comps or []:
+            model = {key: comp.get(key, "") for key in cls.COMPONENT_KEYS}
+            model["instances"] = _instance_refs(comp.get("instances"))
+            components.append(model)
+        return {
+            "uuid": root_info.get("uuid", ""),
+            "components": components,
+            "sheets": [{"uuid": s.get("uuid", ""), "filename": s["filename"]} for s in sheets or []],
+        }
+
+
+def _parse_model(path: str) -> Optional[Dict]:
+    """Pool worker for SchematicModelCache.refresh."""
+    try:
+        return SchematicModelCache._parse(path)
+    except Exception as exc:
+        print(f"DEBUG: [Schematic] Failed to parse {path}: {exc}")
+        return None
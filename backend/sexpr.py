@@ -0,0 +1,203 @@
+import mmap
+import re
+
+# Event kinds produced by KiCadParser.iter_s_expression_events
+EVENT_OPEN = "open"
+EVENT_ATOM = "atom"
+EVENT_CLOSE = "close"
+
+# Tokenizers yield these markers for brackets and plain str values for atoms,
+# so a quoted "(" can never be mistaken for a bracket.
+TOKEN_OPEN = object()
+TOKEN_CLOSE = object()
+
+BYTES_SOURCES = (bytes, bytearray, memoryview, mmap.mmap)
+
+
+def unescape_token(token):
+    """Strips the quotes of a quoted str token and unescapes internal quotes."""
+    return token[1:-1].replace('\\"', '"')
+
+
+def quote_token(value):
+    """Inverse of unescape_token: a quoted str token for `value`."""
+    return '"' + str(value).replace('"', '\\"') + '"'
+
+
+def unescape_bytes(token):
+    """
+    Bytes counterpart of unescape_token: unescapes on the raw UTF-8 bytes and decodes once.
+    Equivalent to decoding first because an escaped quote is plain ASCII in UTF-8.
+    """
+    return token[1:-1].replace(b'\\"', b'"').decode("utf-8")
+
+
+class SExprTokenizer:
+    """
+    Tokenizes KiCad S-expressions from a string or a text file handle.
+
+    File handles are read in fixed-size chunks; a token that straddles a chunk
+    boundary (including an unterminated quoted string) is carried over to the next
+    chunk, so memory stays bounded by the chunk size rather than the file size.
+    """
+
+    # Same token grammar as KiCadParser.TOKEN_RE; group 1 marks a complete quoted string.
+    TOKEN_RE = re.compile(r'\(|\)|("(?:\\.|[^"\\])*")|[^\s()]+')
+    # Bracket-only grammar used while skipping a subtree; a lone quote is an unterminated string.
+    SKIP_RE = re.compile(r'[()]|"(?:\\.|[^"\\])*"|"')
+    CHUNK_SIZE = 1 << 20
+    OPEN, CLOSE, QUOTE = "(", ")", '"'
+
+    def __init__(self, source, chunk_size=None):
+        self.source = source
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self._skip_requested = False
+
+    def _chunks(self):
+        if isinstance(self.source, str):
+            yield self.source
+            return
+        read = self.source.read
+        while True:
+            chunk = read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def skip_balanced(self):
+        """
+        Asks the running iteration to jump past the rest of the list whose tokens are
+        currently being read. Only parentheses and quoted strings are matched while
+        skipping, so the skipped subtree is never tokenized atom by atom.
+        """
+        self._skip_requested = True
+
+    def _skip(self, buf, pos, depth):
+        """Advances over balanced brackets; returns (position, remaining depth)."""
+        for match in self.SKIP_RE.finditer(buf, pos):
+            token = match.group(0)
+            if token == self.OPEN:
+                depth += 1
+            elif token == self.CLOSE:
+                depth -= 1
+                if not depth:
+                    return match.end(), 0
+            elif token == self.QUOTE:
+                # Unterminated string: resume from its opening quote once more input arrives.
+                return match.start(), depth
+        return len(buf), depth
+
+    def __iter__(self):
+        finditer = self.TOKEN_RE.finditer
+        chunks = self._chunks()
+        chunk = next(chunks, None)
+        carry = ""
+        skip_depth = 0
+        self._skip_requested = False
+        while chunk is not None:
+            following = next(chunks, None)
+            buf = carry + chunk if carry else chunk
+            carry = ""
+            final = following is None
+            end = len(buf)
+            pos = 0
+            while True:
+                if skip_depth:
+                    pos, skip_depth = self._skip(buf, pos, skip_depth)
+                    if skip_depth:
+                        if not final:
+                            carry = buf[pos:]
+                        break
+                resume = None
+                for match in finditer(buf, pos):
+                    token = match.group(0)
+                    if not final and (match.end() == end or (token[0] == '"' and match.lastindex is None)):
+                        # Possibly truncated token: re-read it together with the next chunk.
+                        carry = buf[match.start():]
+                        break
+                    if token == "(":
+                        yield TOKEN_OPEN
+                    elif token == ")":
+                        yield TOKEN_CLOSE
+                    elif token[0] == '"':
+                        yield unescape_token(token)
+                    else:
+                        yield token
+                    if self._skip_requested:
+                        self._skip_requested = False
+                        skip_depth = 1
+                        resume = match.end()
+                        break
+                if resume is None:
+                    break
+                pos = resume
+            chunk = following
+
+
+class BytesSExprTokenizer(SExprTokenizer):
+    """
+    Tokenizes UTF-8 encoded S-expressions straight from a bytes-like buffer, typically an mmap.
+
+    Nothing is decoded up front: quoted strings are unescaped on the raw bytes and decoded
+    individually, repeated atoms are decoded once per distinct value and shared, and subtrees
+    passed over with skip_balanced() are never decoded at all.
+
+    `offset` is the byte offset just past the last bracket yielded, so a caller can record
+    the source span of a list from its opening and closing brackets.
+    """
+
+    TOKEN_RE = re.compile(rb'\(|\)|("(?:\\.|[^"\\])*")|[^\s()]+')
+    SKIP_RE = re.compile(rb'[()]|"(?:\\.|[^"\\])*"|"')
+    OPEN, CLOSE, QUOTE = b"(", b")", b'"'
+
+    def __iter__(self):
+        finditer = self.TOKEN_RE.finditer
+        buf = self.source
+        atoms = {}
+        pos = depth = 0
+        self.offset = 0
+        self._skip_requested = False
+        while True:
+            resume = None
+            for match in finditer(buf, pos):
+                token = match.group(0)
+                first = token[0]
+                if first == 40:  # (
+                    self.offset = match.end()
+                    yield TOKEN_OPEN
+                elif first == 41:  # )
+                    self.offset = match.end()
+                    yield TOKEN_CLOSE
+                else:
+                    # Quoted tokens keep their quotes, so they never collide with bare atoms here.
+                    atom = atoms.get(token)
+                    if atom is None:
+                        atom = unescape_bytes(token) if first == 34 else token.decode("utf-8")
+                        atoms[token] = atom
+                    yield atom
+                if self._skip_requested:
+                    self._skip_requested = False
+                    resume, depth = self._skip(buf, match.end(), 1)
+                    break
+            if resume is None or depth:
+                return
+            pos = resume
+
+
+def list_end(buf, start=0):
+    """
+    Returns the offset just past the list opening at `start` in a bytes-like buffer,
+    or None when no balanced list starts there.
+    """
+    if buf[start:start + 1] != b"(":
+        return None
+    tokenizer = BytesSExprTokenizer(buf)
+    end, depth = tokenizer._skip(buf, start + 1, 1)
+    return None if depth else end
+
+
+def make_tokenizer(source):
+    """Returns the byte tokenizer for bytes-like sources and the str tokenizer otherwise."""
+    if isinstance(source, BYTES_SOURCES):
+        return BytesSExprTokenizer(source)
+    return SExprTokenizer(source)
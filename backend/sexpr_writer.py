@@ -0,0 +1,222 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from backend.sexpr import BytesSExprTokenizer, quote_token, unescape_bytes
+
+_TOKEN_RE = BytesSExprTokenizer.TOKEN_RE
+_WHITESPACE = b" \t\r\n"
+_ID_RE = re.compile(rb"\(id\s+(\d+)\)")
+_HIDE_RE = re.compile(rb"\bhide\b")
+# Property written when the symbol has no hidden property to copy the layout from
+DEFAULT_PROPERTY = b'(property %s %s (at 0 0 0) (effects (font (size 1.27 1.27)) hide))'
+
+
+@dataclass
+class PropertySpan:
+    """Byte spans of one (property "Key" "Value" ...) list: the whole list and its key and value atoms."""
+    key: str
+    start: int
+    end: int
+    key_span: Tuple[int, int]
+    value_span: Tuple[int, int]
+
+
+@dataclass
+class SymbolSpans:
+    """A top-level library symbol: its list span, the end of its name atom and its own properties."""
+    name: str
+    start: int
+    end: int
+    name_end: int
+    properties: Dict[str, PropertySpan] = field(default_factory=dict)
+
+    @property
+    def last_property(self) -> Optional[PropertySpan]:
+        return max(self.properties.values(), key=lambda p: p.start, default=None)
+
+
+class SpanEditor:
+    """
+    Collects byte splices against one buffer and applies them in a single pass; every byte
+    outside a splice is copied unchanged, so layout (minified or not) and untouched symbols
+    round-trip exactly.
+    """
+
+    def __init__(self, buf: bytes):
+        self.buf = buf
+        self._splices: List[Tuple[int, int, int, bytes]] = [] # (start, end, order, replacement)
+
+    def __len__(self) -> int:
+        return len(self._splices)
+
+    def replace(self, start: int, end: int, data: bytes) -> None:
+        self._splices.append((start, end, len(self._splices), data))
+
+    def insert(self, offset: int, data: bytes) -> None:
+        self.replace(offset, offset, data)
+
+    def delete(self, start: int, end: int) -> None:
+        self.replace(start, end, b"")
+
+    def apply(self) -> bytes:
+        """Returns the edited buffer. Overlapping splices raise ValueError; inserts at one offset keep their order."""
+        parts = []
+        pos = 0
+        for start, end, _, data in sorted(self._splices):
+            if start < pos:
+                raise ValueError(f"Overlapping edits at byte {start}")
+            parts.append(self.buf[pos:start])
+            parts.append(data)
+            pos = end
+        parts.append(self.buf[pos:])
+        return b"".join(parts)
+
+
+def _token(buf, pos):
+    match = _TOKEN_RE.search(buf, pos)
+    if match is None:
+        raise ValueError("Unexpected end of S-expression")
+    return match
+
+
+def _skip_rest(buf, match, depth=1) -> int:
+    """Offset just past the list `match` (the last token read) belongs to, `depth` lists deep."""
+    token = match.group(0)
+    if token == b")":
+        depth -= 1
+        if not depth:
+            return match.end()
+    elif token == b"(":
+        depth += 1
+    end, depth = BytesSExprTokenizer(buf)._skip(buf, match.end(), depth)
+    if depth:
+        raise ValueError("Unbalanced S-expression")
+    return end
+
+
+def _atom(match) -> Optional[str]:
+    token = match.group(0)
+    if token in (b"(", b")"):
+        return None
+    return unescape_bytes(token) if token[:1] == b'"' else token.decode("utf-8")
+
+
+def index_symbol_spans(buf: bytes) -> Dict[str, SymbolSpans]:
+    """
+    Byte spans of every top-level symbol in a kicad_symbol_lib buffer, with the spans of the
+    symbol's own properties. Only brackets and atoms are matched, so layout does not matter;
+    unit sub-symbols and all other lists are skipped without being read.
+    """
+    match = _token(buf, 0)
+    head = _token(buf, match.end())
+    if match.group(0) != b"(" or head.group(0) != b"kicad_symbol_lib":
+        raise ValueError("Not a KiCad symbol library")
+    symbols: Dict[str, SymbolSpans] = {}
+    pos = head.end()
+    while True:
+        match = _token(buf, pos)
+        if match.group(0) == b")":
+            return symbols
+        if match.group(0) != b"(":
+            pos = match.end()
+            continue
+        head = _token(buf, match.end())
+        if head.group(0) == b"symbol":
+            symbol = _read_symbol(buf, match.start(), head.end())
+            symbols.setdefault(symbol.name, symbol)
+            pos = symbol.end
+        else:
+            pos = _skip_rest(buf, head)
+
+
+def _read_symbol(buf, start, pos) -> SymbolSpans:
+    name = _token(buf, pos)
+    symbol = SymbolSpans(_atom(name) or "", start, 0, name.end())
+    if name.group(0) in (b"(", b")"):
+        symbol.end = _skip_rest(buf, name)
+        return symbol
+    pos = name.end()
+    while True:
+        match = _token(buf, pos)
+        if match.group(0) == b")":
+            symbol.end = match.end()
+            return symbol
+        if match.group(0) != b"(":
+            pos = match.end()
+            continue
+        head = _token(buf, match.end())
+        if head.group(0) != b"property":
+            pos = _skip_rest(buf, head)
+            continue
+        key = _token(buf, head.end())
+        value = _token(buf, key.end()) if _atom(key) is not None else key
+        pos = _skip_rest(buf, value)
+        if _atom(key) is not None and _atom(value) is not None:
+            symbol.properties.setdefault(_atom(key), PropertySpan(
+                _atom(key), match.start(), pos, key.span(), value.span(),
+            ))
+
+
+def _leading_space(buf, offset) -> int:
+    """Start of the whitespace run that ends at `offset`."""
+    while offset > 0 and buf[offset - 1] in _WHITESPACE:
+        offset -= 1
+    return offset
+
+
+def _new_property(buf, symbol: SymbolSpans, key, value, prop_id) -> bytes:
+    """A property list for `key`, laid out like the symbol's hidden properties where it has one."""
+    template = None
+    for prop in sorted(symbol.properties.values(), key=lambda p: p.start):
+        if _HIDE_RE.search(buf, prop.value_span[1], prop.end):
+            template = prop
+    if template is None:
+        text = DEFAULT_PROPERTY % (quote_token(key).encode("utf-8"), quote_token(value).encode("utf-8"))
+        if prop_id is not None:
+            text = text.replace(b" (at ", b" (id %d) (at " % prop_id, 1)
+        return text
+    text = (
+        buf[template.start:template.key_span[0]]
+        + quote_token(key).encode("utf-8")
+        + buf[template.key_span[1]:template.value_span[0]]
+        + quote_token(value).encode("utf-8")
+        + buf[template.value_span[1]:template.end]
+    )
+    # KiCad 6 numbers properties; the copy takes the next free id
+    return text if prop_id is None else _ID_RE.sub(b"(id %d)" % prop_id, text, count=1)
+
+
+def edit_symbol_properties(editor: SpanEditor, symbol: SymbolSpans, props: Dict[str, Optional[str]]) -> List[str]:
+    """
+    Queues property edits for one symbol: a value replaces the existing value atom or adds the
+    property after the symbol's last one, and None deletes the property with its leading whitespace.
+    Returns the keys that were edited (deleting an absent property is not an edit).
+    """
+    buf = editor.buf
+    done = []
+    last = symbol.last_property
+    anchor = last.end if last else symbol.name_end
+    indent = buf[_leading_space(buf, last.start):last.start] if last else b""
+    if not indent or b"\n" not in indent:
+        indent = b" "
+    inserts = []
+    ids = [int(m.group(1)) for p in symbol.properties.values() for m in _ID_RE.finditer(buf, p.start, p.end)]
+    next_id = max(ids) + 1 if ids else None # KiCad 7+ files have no property ids
+    for key, value in props.items():
+        prop = symbol.properties.get(key)
+        if value is None:
+            if prop is not None:
+                editor.delete(_leading_space(buf, prop.start), prop.end)
+                done.append(key)
+        elif prop is not None:
+            editor.replace(prop.value_span[0], prop.value_span[1], quote_token(value).encode("utf-8"))
+            done.append(key)
+        else:
+            inserts.append(indent + _new_property(buf, symbol, key, value, next_id))
+            if next_id is not None:
+                next_id += 1
+            done.append(key)
+    if inserts:
+        editor.insert(anchor, b"".join(inserts))
+    return done
@@ -0,0 +1,98 @@
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional
+
+from backend.change_detection import stat_signature
+
+
+class SheetGraph:
+    """
+    Sheet hierarchy of one root schematic as a DAG. Every file is a single node holding its
+    part count and one child path per sheet instance, so shared sub-sheets are read once.
+    """
+
+    def __init__(self, root: str, nodes: Dict[str, Dict], signature: FrozenSet):
+        self.root = root
+        self.nodes = nodes # resolved path -> {"part_count": int, "children": [resolved paths]}
+        self.signature = signature
+
+    def files(self) -> List[str]:
+        """Flat, sorted list of every schematic in the hierarchy, root included."""
+        return sorted(self.nodes)
+
+    def tree(self) -> Dict:
+        """Nested view with one node per sheet instance, as shown in the project structure panel."""
+        def expand(path, ancestors):
+            name = Path(path).name
+            if path in ancestors:
+                return {"name": name + " (Recursive)", "path": path, "children": [], "part_count": 0}
+            node = self.nodes[path]
+            ancestors = ancestors | {path}
+            children = [expand(child, ancestors) for child in node["children"]]
+            children.sort(key=lambda x: x["name"].lower())
+            return {"name": name, "path": path, "children": children, "part_count": node["part_count"]}
+
+        return expand(self.root, frozenset())
+
+
+class SheetHierarchy:
+    """
+    Builds SheetGraphs from the shared schematic model cache in one breadth-first pass and
+    keeps them per root until a sheet of the hierarchy changes (see stat_signature).
+    """
+
+    CACHE_SIZE = 16
+
+    def __init__(self, models):
+        self.models = models
+        self._graphs: "OrderedDict[str, SheetGraph]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def graph(self, root_path) -> Optional[SheetGraph]:
+        root = Path(root_path) if root_path else None
+        if root is None or not root.exists():
+            return None
+        root_key = str(root.resolve())
+        with self._lock:
+            cached = self._graphs.get(root_key)
+        if cached is not None and stat_signature(path for path, _, _ in cached.signature) == cached.signature:
+            return cached
+
+        graph = self._build(root_key)
+        with self._lock:
+            self._graphs[root_key] = graph
+            self._graphs.move_to_end(root_key)
+            while len(self._graphs) > self.CACHE_SIZE:
+                self._graphs.popitem(last=False)
+        return graph
+
+    def invalidate(self, root_path=None) -> None:
+        with self._lock:
+            if root_path is None:
+                self._graphs.clear()
+            else:
+                self._graphs.pop(str(Path(root_path).resolve()), None)
+
+    def _build(self, root: str) -> SheetGraph:
+        nodes: Dict[str, Dict] = {}
+        missing = set() # Referenced sheets that do not exist yet; their appearance invalidates the graph
+        queue = deque([root])
+        while queue:
+            path = queue.popleft()
+            if path in nodes:
+                continue
+            model = self.models.get(path) or {}
+            children = []
+            parent = Path(path).parent
+            for sheet in model.get("sheets", []):
+                sub_path = (parent / sheet["filename"]).resolve()
+                if sub_path.exists():
+                    children.append(str(sub_path))
+                    if str(sub_path) not in nodes:
+                        queue.append(str(sub_path))
+                else:
+                    missing.add(str(sub_path))
+            nodes[path] = {"part_count": len(model.get("components", [])), "children": children}
+        self.models.save()
+        return SheetGraph(root, nodes, stat_signature(set(nodes) | missing))
@@ -0,0 +1,312 @@
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Property keys searched as manufacturer part numbers, in priority order
+MPN_KEYS = ("MPN", "MFR_PART", "MANUFACTURER_PART_NUMBER", "Part Number")
+DESCRIPTION_KEYS = ("Description", "ki_description")
+KEYWORD_KEYS = ("ki_keywords", "Keywords")
+
+
+class SymbolDatabase:
+    """
+    Persistent SQLite (WAL) index of library symbols, their properties and pin numbers, with an
+    FTS5 table over name, description, keywords, value and MPN-like properties.
+    SymbolIndexer keeps it in step with the library cache one file at a time.
+    """
+
+    SCHEMA_VERSION = 3
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.ready = False  # True once a scan has synced it with the current libraries
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # The library scan runs on a worker thread while the UI queries; the lock serializes access
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA cache_size=-32768")  # 32 MB page cache
+        self.fts_tokenizer = self._create_schema()
+
+    def _create_schema(self) -> str:
+        conn = self._conn
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            for table in ("symbol_fts", "pins", "properties", "symbols", "files"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                library TEXT NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                hash TEXT NOT NULL DEFAULT '',
+                position INTEGER NOT NULL DEFAULT 0 -- library scan order; later files shadow same-named symbols
+            );
+            CREATE TABLE IF NOT EXISTS symbols (
+                id INTEGER PRIMARY KEY,
+                file TEXT NOT NULL,
+                library TEXT NOT NULL,
+                name TEXT NOT NULL,
+                extends TEXT,
+                pin_count INTEGER NOT NULL DEFAULT 0,
+                mpn TEXT NOT NULL DEFAULT ''
+            );
+            CREATE INDEX IF NOT EXISTS symbols_file ON symbols(file);
+            CREATE INDEX IF NOT EXISTS symbols_lib_name ON symbols(library, name);
+            CREATE INDEX IF NOT EXISTS symbols_mpn ON symbols(mpn) WHERE mpn <> '';
+            CREATE TABLE IF NOT EXISTS properties (
+                symbol_id INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS properties_symbol ON properties(symbol_id);
+            CREATE INDEX IF NOT EXISTS properties_key_value ON properties(key, value);
+            CREATE TABLE IF NOT EXISTS pins (
+                symbol_id INTEGER NOT NULL,
+                number TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pins_symbol ON pins(symbol_id);
+            """
+        )
+        tokenizer = "trigram"
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS symbol_fts USING fts5("
+                "library, name, description, keywords, value, mpn, tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
+            # SQLite before 3.34 has no trigram tokenizer; fall back to word prefixes
+            tokenizer = "unicode61"
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS symbol_fts USING fts5("
+                "library, name, description, keywords, value, mpn, prefix='2 3')"
+            )
+        conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+        conn.commit()
+        return tokenizer
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def batch(self):
+        """Groups several sync_file/remove_file calls into one transaction (used for full scans)."""
+        with self._lock:
+            if self._batch_depth:
+                yield self
+                return
+            self._batch_depth += 1
+            try:
+                with self._conn:
+                    yield self
+            finally:
+                self._batch_depth -= 1
+
+    @contextmanager
+    def _write(self):
+        with self._lock:
+            if self._batch_depth:
+                yield
+            else:
+                with self._conn:
+                    yield
+
+    # --- Maintenance (SymbolIndexer) ---
+
+    def file_states(self) -> Dict[str, str]:
+        """Path -> content hash of every indexed library file."""
+        with self._lock:
+            rows = self._conn.execute("SELECT path, hash FROM files").fetchall()
+        return dict(rows)
+
+    def sync_file(self, path: str, library: str, mtime: float, size: int, content_hash: str, symbols: Iterable[Dict]) -> None:
+        """Replaces every row of one library file in a single transaction."""
+        with self._write():
+            self._delete_file(path)
+            self._conn.execute(
+                "INSERT INTO files(path, library, mtime, size, hash) VALUES (?, ?, ?, ?, ?)",
+                (path, library, mtime, size, content_hash),
+            )
+            next_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM symbols").fetchone()[0]
+            symbol_rows, property_rows, pin_rows, fts_rows = [], [], [], []
+            for symbol in symbols:
+                name = symbol.get("name")
+                if not name:
+                    continue
+                symbol_id = next_id
+                next_id += 1
+                props = {k: v for k, v in (symbol.get("properties") or {}).items() if isinstance(v, str)}
+                symbol_rows.append(
+                    (symbol_id, path, library, name, symbol.get("extends"), symbol.get("pin_count", 0), self._mpn(props))
+                )
+                property_rows.extend((symbol_id, key, value) for key, value in props.items())
+                pin_rows.extend((symbol_id, str(number)) for number in symbol.get("pin_numbers") or ())
+                fts_rows.append((
+                    symbol_id, library, name,
+                    self._first(props, DESCRIPTION_KEYS), self._first(props, KEYWORD_KEYS), props.get("Value", ""),
+                    " ".join(props[k] for k in MPN_KEYS if k in props),
+                ))
+            self._conn.executemany(
+                "INSERT INTO symbols(id, file, library, name, extends, pin_count, mpn) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                symbol_rows,
+            )
+            self._conn.executemany("INSERT INTO properties(symbol_id, key, value) VALUES (?, ?, ?)", property_rows)
+            self._conn.executemany("INSERT INTO pins(symbol_id, number) VALUES (?, ?)", pin_rows)
+            self._conn.executemany(
+                "INSERT INTO symbol_fts(rowid, library, name, description, keywords, value, mpn) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                fts_rows,
+            )
+
+    def set_file_order(self, paths: Iterable[str]) -> None:
+        """Records the scan order of the library files, which decides how same-named libraries merge."""
+        with self._write():
+            self._conn.executemany(
+                "UPDATE files SET position = ? WHERE path = ?", ((i, path) for i, path in enumerate(paths))
+            )
+
+    def remove_file(self, path: str) -> None:
+        with self._write():
+            self._delete_file(path)
+
+    def set_property(self, library: str, name: str, key: str, value: Optional[str]) -> None:
+        """Mirrors an in-memory property edit (None deletes it) until the next scan re-syncs the file."""
+        with self._write():
+            ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM symbols WHERE library = ? AND name = ?", (library, name)
+            )]
+            for symbol_id in ids:
+                self._conn.execute("DELETE FROM properties WHERE symbol_id = ? AND key = ?", (symbol_id, key))
+                if value is not None:
+                    self._conn.execute(
+                        "INSERT INTO properties(symbol_id, key, value) VALUES (?, ?, ?)", (symbol_id, key, value)
+                    )
+                column = self._fts_column(key)
+                if not column:
+                    continue
+                props = dict(self._conn.execute(
+                    "SELECT key, value FROM properties WHERE symbol_id = ?", (symbol_id,)
+                ).fetchall())
+                if column == "mpn":
+                    self._conn.execute("UPDATE symbols SET mpn = ? WHERE id = ?", (self._mpn(props), symbol_id))
+                    value = " ".join(props[k] for k in MPN_KEYS if k in props)
+                self._conn.execute(f"UPDATE symbol_fts SET {column} = ? WHERE rowid = ?", (value or "", symbol_id))
+
+    def _delete_file(self, path: str) -> None:
+        ids = "SELECT id FROM symbols WHERE file = ?"
+        self._conn.execute(f"DELETE FROM properties WHERE symbol_id IN ({ids})", (path,))
+        self._conn.execute(f"DELETE FROM pins WHERE symbol_id IN ({ids})", (path,))
+        self._conn.execute(f"DELETE FROM symbol_fts WHERE rowid IN ({ids})", (path,))
+        self._conn.execute("DELETE FROM symbols WHERE file = ?", (path,))
+        self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    @staticmethod
+    def _mpn(props: Dict) -> str:
+        """The MPN Validator.check_duplicate_mpns compares: first key present, placeholders dropped."""
+        for key in MPN_KEYS:
+            if key in props:
+                mpn = props[key]
+                return "" if mpn == "~" or mpn.lower() == "n/a" else mpn
+        return ""
+
+    @staticmethod
+    def _first(props: Dict, keys) -> str:
+        for key in keys:
+            value = props.get(key)
+            if isinstance(value, str):
+                return value
+        return ""
+
+    @staticmethod
+    def _fts_column(key: str) -> Optional[str]:
+        if key == "Value":
+            return "value"
+        if key in DESCRIPTION_KEYS:
+            return "description"
+        if key in KEYWORD_KEYS:
+            return "keywords"
+        if key in MPN_KEYS:
+            return "mpn"
+        return None
+
+    # --- Queries ---
+
+    def is_selective(self, text: str) -> bool:
+        """False when no term is long enough for the trigram index; such searches scan every row."""
+        terms = (text or "").split()
+        if self.fts_tokenizer != "trigram":
+            return bool(terms)
+        return any(len(term) >= 3 for term in terms)
+
+    def search(self, text: str, library: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """
+        Returns (library, name) of symbols matching every whitespace-separated term of `text`
+        in the library, name, description, keywords, value or MPN.
+        """
+        terms = [t for t in re.split(r"\s+", text or "") if t]
+        if not terms:
+            return []
+        clauses = []
+        params = []
+        match_terms = []
+        for term in terms:
+            if self.fts_tokenizer == "trigram" and len(term) < 3:
+                # Too short for trigrams: substring scan over the indexed columns
+                pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                clauses.append(
+                    "(" + " OR ".join(f"symbol_fts.{col} LIKE ? ESCAPE '\\'" for col in
+                                      ("library", "name", "description", "keywords", "value", "mpn")) + ")"
+                )
+                params.extend([pattern] * 6)
+            else:
+                quoted = '"' + term.replace('"', '""') + '"'
+                match_terms.append(quoted if self.fts_tokenizer == "trigram" else quoted + "*")
+        if match_terms:
+            clauses.insert(0, "symbol_fts MATCH ?")
+            params.insert(0, " AND ".join(match_terms))
+        sql = "SELECT symbols.library, symbols.name FROM symbol_fts JOIN symbols ON symbols.id = symbol_fts.rowid"
+        sql += " WHERE " + " AND ".join(clauses)
+        if library:
+            sql += " AND symbols.library = ?"
+            params.append(library)
+        sql += " ORDER BY symbols.id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        try:
+            with self._lock:
+                return self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as exc:
+            print(f"DEBUG: [SymbolDB] Search failed for {text!r}: {exc}")
+            return []
+
+    def duplicate_mpns(self) -> Dict[str, List[str]]:
+        """MPN -> ["lib:name", ...] for MPNs shared by more than one symbol (see Validator.check_duplicate_mpns)."""
+        # Same-named libraries merge in data_store with the later file (in scan order) winning, and within
+        # a file the later symbol; rows shadowed that way are skipped
+        sql = """
+            WITH ranked AS (
+                SELECT s.id, s.library, s.name, s.mpn, f.position FROM symbols AS s JOIN files AS f ON f.path = s.file
+            )
+            SELECT library, name, mpn FROM ranked AS s
+            WHERE mpn IN (SELECT mpn FROM symbols WHERE mpn <> '' GROUP BY mpn HAVING COUNT(*) > 1)
+              AND NOT EXISTS (
+                  SELECT 1 FROM ranked AS o
+                  WHERE o.library = s.library AND o.name = s.name
+                    AND (o.position > s.position OR (o.position = s.position AND o.id > s.id))
+              )
+            ORDER BY (SELECT MIN(position) FROM ranked AS l WHERE l.library = s.library), position, id
+        """
+        with self._lock:
+            rows = self._conn.execute(sql).fetchall()
+        mpn_map = {}
+        for library, name, mpn in rows:
+            mpn_map.setdefault(mpn, []).append(f"{library}:{name}")
+        return {k: v for k, v in mpn_map.items() if len(v) > 1}
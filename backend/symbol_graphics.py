@@ -0,0 +1,234 @@
+import math
+from typing import List, Optional, Tuple
+
+# Graphic heads KiCadParser._extract_lib_symbol collects into "graphics"
+SHAPE_KINDS = ("rectangle", "polyline", "circle", "arc", "text")
+
+
+class TextLayout:
+    """Position, size and justification of a text element, parsed from its (at ...) and (effects ...)."""
+
+    __slots__ = ("at", "size", "h_align", "v_align")
+
+    def __init__(self, at=None, size=None, h_align="center", v_align="center"):
+        self.at: Tuple[float, ...] = tuple(at) if at else (0.0, 0.0, 0.0)
+        self.size: Tuple[float, ...] = tuple(size) if size else (1.27, 1.27)
+        self.h_align = h_align  # "left", "center" or "right"
+        self.v_align = v_align  # "top", "center" or "bottom"
+
+    @classmethod
+    def from_attributes(cls, attributes) -> "TextLayout":
+        at = None
+        size = None
+        h_align = v_align = "center"
+        for attr in attributes:
+            if not isinstance(attr, list) or not attr:
+                continue
+            if attr[0] == "at":
+                at = [float(x) for x in attr[1:]]
+            elif attr[0] == "effects":
+                for e in attr[1:]:
+                    if not isinstance(e, list) or not e:
+                        continue
+                    if e[0] == "font":
+                        for f in e[1:]:
+                            if isinstance(f, list) and f and f[0] == "size":
+                                size = [float(x) for x in f[1:]]
+                    elif e[0] == "justify":
+                        for j in e[1:]:
+                            if j in ("left", "right"):
+                                h_align = j
+                            elif j in ("top", "bottom"):
+                                v_align = j
+        if size is not None and len(size) == 1:
+            size.append(size[0])
+        return cls(at, size, h_align, v_align)
+
+
+class Shape:
+    """
+    One symbol graphic with float coordinates and stroke/fill already resolved, so painting
+    never re-walks the S-expression. `coords` depends on `kind`:
+    rectangle (x1, y1, x2, y2), polyline (x0, y0, x1, y1, ...), circle (cx, cy),
+    arc (start, mid, end as x/y pairs) and text (x, y).
+    """
+
+    __slots__ = (
+        "kind", "coords", "radius", "arc", "stroke_width", "stroke_color", "fill_type", "fill_color", "text", "layout",
+    )
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.coords: Tuple[float, ...] = ()
+        self.radius = 0.0
+        # (center x, center y, radius, start angle, span angle), angles in degrees; None if degenerate
+        self.arc: Optional[Tuple[float, float, float, float, float]] = None
+        self.stroke_width: Optional[float] = None
+        self.stroke_color: Optional[Tuple[int, int, int, int]] = None
+        self.fill_type: Optional[str] = None
+        self.fill_color: Optional[Tuple[int, int, int, int]] = None
+        self.text = ""
+        self.layout: Optional[TextLayout] = None
+
+    @property
+    def filled(self) -> bool:
+        return bool(self.fill_type) and self.fill_type not in ("none", "outline")
+
+    def extent_points(self) -> List[Tuple[float, float]]:
+        """Points that bound the shape, matching what SymbolWidget fits into view."""
+        c = self.coords
+        if self.kind == "circle":
+            return [(c[0] - self.radius, c[1] - self.radius), (c[0] + self.radius, c[1] + self.radius)]
+        return [(c[i], c[i + 1]) for i in range(0, len(c) - 1, 2)]
+
+
+def to_rgba(r, g, b, a=255.0) -> Tuple[int, int, int, int]:
+    """KiCad stores colors as floats 0-1; values may also be 0-255."""
+    scaled = []
+    for v in (r, g, b, a):
+        try:
+            v = float(v)
+        except Exception:
+            v = 0.0
+        if 0.0 <= v <= 1.0:
+            v *= 255.0
+        scaled.append(int(max(0, min(255, round(v)))))
+    return tuple(scaled)
+
+
+def _xy(attr) -> Tuple[float, float]:
+    return float(attr[1]), float(attr[2])
+
+
+def _resolve_style(shape: Shape, node) -> None:
+    for attr in node[1:]:
+        if not isinstance(attr, list) or not attr:
+            continue
+        if attr[0] == "fill":
+            for f in attr[1:]:
+                if shape.fill_type is None and isinstance(f, str):
+                    shape.fill_type = f
+                elif isinstance(f, list) and f:
+                    if f[0] == "type" and len(f) > 1 and shape.fill_type is None:
+                        shape.fill_type = f[1]
+                    elif f[0] == "color" and len(f) >= 4 and shape.fill_color is None:
+                        shape.fill_color = to_rgba(f[1], f[2], f[3], f[4] if len(f) > 4 else 255.0)
+        elif attr[0] == "stroke":
+            for s in attr[1:]:
+                if not isinstance(s, list) or not s:
+                    continue
+                if s[0] == "width" and len(s) > 1 and shape.stroke_width is None:
+                    try:
+                        shape.stroke_width = float(s[1])
+                    except Exception:
+                        pass
+                elif s[0] == "color" and len(s) >= 4 and shape.stroke_color is None:
+                    shape.stroke_color = to_rgba(s[1], s[2], s[3], s[4] if len(s) > 4 else 255.0)
+        elif attr[0] == "width" and len(attr) > 1 and shape.stroke_width is None:
+            # Legacy formats store the width directly
+            try:
+                shape.stroke_width = float(attr[1])
+            except Exception:
+                pass
+
+
+def _arc_geometry(x1, y1, x2, y2, x3, y3):
+    """Circle through start/mid/end with Qt start and span angles (Y axis flipped by the painter)."""
+    d = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
+    if d == 0:
+        return None
+    ux = ((x1**2 + y1**2) * (y2 - y3) + (x2**2 + y2**2) * (y3 - y1) + (x3**2 + y3**2) * (y1 - y2)) / d
+    uy = ((x1**2 + y1**2) * (x3 - x2) + (x2**2 + y2**2) * (x1 - x3) + (x3**2 + y3**2) * (x2 - x1)) / d
+    radius = math.sqrt((x1 - ux)**2 + (y1 - uy)**2)
+    start_angle = math.degrees(math.atan2(-(y1 - uy), x1 - ux))
+    mid_angle = math.degrees(math.atan2(-(y2 - uy), x2 - ux))
+    end_angle = math.degrees(math.atan2(-(y3 - uy), x3 - ux))
+    start_n = start_angle % 360
+    span_end = (end_angle % 360 - start_n) % 360
+    span_mid = (mid_angle % 360 - start_n) % 360
+    # Counter-clockwise when mid lies on the CCW path from start to end
+    span = span_end if span_mid < span_end else span_end - 360
+    return ux, uy, radius, start_angle, span
+
+
+def normalize_shape(node) -> Optional[Shape]:
+    """Converts one raw graphic node; returns None for unknown or malformed nodes."""
+    if not isinstance(node, list) or not node or node[0] not in SHAPE_KINDS:
+        return None
+    shape = Shape(node[0])
+    try:
+        if shape.kind == "text":
+            shape.text = node[1] if len(node) > 1 else ""
+            shape.layout = TextLayout.from_attributes(node[2:])
+            shape.coords = shape.layout.at[:2]
+            return shape
+        _resolve_style(shape, node)
+        if shape.kind == "rectangle":
+            start = end = (0.0, 0.0)
+            for attr in node[1:]:
+                if isinstance(attr, list) and attr:
+                    if attr[0] == "start":
+                        start = _xy(attr)
+                    elif attr[0] == "end":
+                        end = _xy(attr)
+            shape.coords = start + end
+        elif shape.kind == "polyline":
+            coords = []
+            for pt in node[1:]:
+                if isinstance(pt, list) and pt and pt[0] == "pts":
+                    for xy in pt[1:]:
+                        if isinstance(xy, list) and xy and xy[0] == "xy":
+                            coords.extend(_xy(xy))
+            shape.coords = tuple(coords)
+        elif shape.kind == "circle":
+            center = (0.0, 0.0)
+            for attr in node[1:]:
+                if isinstance(attr, list) and attr:
+                    if attr[0] == "center":
+                        center = _xy(attr)
+                    elif attr[0] == "radius":
+                        shape.radius = float(attr[1])
+            shape.coords = center
+        elif shape.kind == "arc":
+            coords = []
+            for attr in node[1:]:
+                if isinstance(attr, list) and attr and attr[0] in ("start", "mid", "end"):
+                    coords.extend(_xy(attr))
+            shape.coords = tuple(coords)
+            if len(coords) == 6:
+                shape.arc = _arc_geometry(*coords)
+    except (ValueError, TypeError, IndexError):
+        return None
+    return shape
+
+
+def normalize_graphics(graphics) -> List[Shape]:
+    """Normalizes a symbol's raw "graphics" list once, in drawing order."""
+    shapes = []
+    for node in graphics or ():
+        shape = normalize_shape(node)
+        if shape is not None:
+            shapes.append(shape)
+    return shapes
+
+
+def normalize_property_labels(visual_properties) -> List[Tuple[str, str, TextLayout, bool]]:
+    """Turns raw (property ...) nodes into (key, value, layout, hidden) tuples."""
+    labels = []
+    for prop in visual_properties or ():
+        if not isinstance(prop, list) or len(prop) < 3:
+            continue
+        hidden = False
+        for attr in prop[3:]:
+            if attr == "hide":
+                hidden = True
+            elif isinstance(attr, list) and attr and attr[0] == "effects":
+                for e in attr[1:]:
+                    if e == "hide" or (isinstance(e, list) and e and e[0] == "hide"):
+                        hidden = True
+        try:
+            layout = TextLayout.from_attributes(prop[3:])
+        except (ValueError, TypeError):
+            continue
+        labels.append((prop[1], prop[2], layout, hidden))
+    return labels
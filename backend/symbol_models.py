@@ -0,0 +1,296 @@
+import math
+import sys
+import tracemalloc
+from array import array
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Iterable, List, Optional
+
+# Key order of the pin dicts built by KiCadParser._extract_lib_symbol
+PIN_KEYS = (
+    "type", "at", "number", "name", "length", "visible", "name_visible", "num_visible",
+    "name_text_size", "num_text_size", "stroke_width",
+)
+_VISIBLE, _NAME_VISIBLE, _NUM_VISIBLE = 1, 2, 4
+_FLAG_BITS = {"visible": _VISIBLE, "name_visible": _NAME_VISIBLE, "num_visible": _NUM_VISIBLE}
+_STRING_SLOTS = {"type": 0, "number": 1, "name": 2}
+_VALUE_SLOTS = {"length": 3, "name_text_size": 4, "num_text_size": 5}
+_NAN = float("nan")
+
+
+class PinTable:
+    """
+    Packed storage for a symbol's pins: the numeric fields of every pin share one `array` of
+    doubles and the strings are interned, so a pin costs a few dozen bytes instead of a
+    12-key dict. Indexing or iterating yields PinView objects that read like the pin dicts.
+    """
+
+    # Per-pin layout of `values`: x, y, rotation (NaN when "at" has none), length,
+    # name text size, number text size, stroke width (NaN for None)
+    STRIDE = 7
+    __slots__ = ("strings", "values", "flags", "_overflow")
+
+    def __init__(self):
+        self.strings: List[str] = []  # type, number, name per pin
+        self.values = array("d")
+        self.flags = array("B")
+        self._overflow: Optional[Dict[int, Dict]] = None  # pins that do not fit the layout, kept as dicts
+
+    @classmethod
+    def from_dicts(cls, pins: Iterable[Dict]) -> "PinTable":
+        table = cls()
+        for pin in pins:
+            table.append(pin)
+        return table
+
+    def append(self, pin: Dict) -> None:
+        index = len(self.flags)
+        packed = self._pack(pin)
+        if packed is None:
+            if self._overflow is None:
+                self._overflow = {}
+            self._overflow[index] = dict(pin)
+            packed = ("", "", ""), (0.0,) * self.STRIDE, 0
+        strings, values, flags = packed
+        self.strings.extend(sys.intern(value) for value in strings)
+        self.values.extend(values)
+        self.flags.append(flags)
+
+    @staticmethod
+    def _pack(pin: Dict):
+        """Returns (strings, values, flags) for a pin, or None when it cannot be stored losslessly."""
+        if len(pin) != len(PIN_KEYS) or any(key not in pin for key in PIN_KEYS):
+            return None
+        at = pin["at"]
+        if not isinstance(at, list) or len(at) not in (2, 3):
+            return None
+        strings = (pin["type"], pin["number"], pin["name"])
+        if not all(type(value) is str for value in strings):
+            return None
+        stroke = pin["stroke_width"]
+        values = (
+            at[0], at[1], at[2] if len(at) == 3 else _NAN,
+            pin["length"], pin["name_text_size"], pin["num_text_size"], _NAN if stroke is None else stroke,
+        )
+        if not all(type(value) is float for value in values):
+            return None
+        if not all(type(pin[key]) is bool for key in ("visible", "name_visible", "num_visible")):
+            return None
+        flags = (
+            (_VISIBLE if pin["visible"] else 0)
+            | (_NAME_VISIBLE if pin["name_visible"] else 0)
+            | (_NUM_VISIBLE if pin["num_visible"] else 0)
+        )
+        return strings, values, flags
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+    def __bool__(self) -> bool:
+        return bool(self.flags)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [PinView(self, i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pin index out of range")
+        return PinView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield PinView(self, index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PinTable, list, tuple)):
+            return len(self) == len(other) and all(dict(a) == dict(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    def value(self, index: int, key: str):
+        if self._overflow and index in self._overflow:
+            return self._overflow[index][key]
+        if key in _STRING_SLOTS:
+            return self.strings[index * 3 + _STRING_SLOTS[key]]
+        if key in _FLAG_BITS:
+            return bool(self.flags[index] & _FLAG_BITS[key])
+        base = index * self.STRIDE
+        if key == "at":
+            x, y, rot = self.values[base:base + 3]
+            return [x, y] if math.isnan(rot) else [x, y, rot]
+        if key == "stroke_width":
+            stroke = self.values[base + 6]
+            return None if math.isnan(stroke) else stroke
+        if key in _VALUE_SLOTS:
+            return self.values[base + _VALUE_SLOTS[key]]
+        raise KeyError(key)
+
+    def keys_at(self, index: int):
+        if self._overflow and index in self._overflow:
+            return tuple(self._overflow[index])
+        return PIN_KEYS
+
+    def to_dicts(self) -> List[Dict]:
+        return [dict(pin) for pin in self]
+
+
+class PinView(Mapping):
+    """Read-only dict view of one PinTable row."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: PinTable, index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        if key not in self._table.keys_at(self._index):
+            raise KeyError(key)
+        return self._table.value(self._index, key)
+
+    def __iter__(self):
+        return iter(self._table.keys_at(self._index))
+
+    def __len__(self) -> int:
+        return len(self._table.keys_at(self._index))
+
+    def __repr__(self) -> str:
+        return f"PinView({dict(self)!r})"
+
+
+class Symbol(MutableMapping):
+    """
+    Slotted symbol record behaving like the dicts the parser and indexer produce.
+    Known fields are slots; any other key lands in a small per-instance dict.
+    """
+
+    FIELDS = (
+        "library", "name", "extends", "file_path", "properties", "pin_count", "pin_numbers", "span",
+        "pins", "graphics", "show_pin_numbers", "show_pin_names", "pin_names_offset", "visual_properties",
+        "shapes", "property_labels",
+    )
+    __slots__ = FIELDS + ("_extra",)
+
+    def __init__(self, data: Optional[Mapping] = None, **kwargs):
+        self._extra = None
+        if data:
+            self.update(data)
+        if kwargs:
+            self.update(kwargs)
+
+    @classmethod
+    def from_record(cls, record: Mapping) -> "Symbol":
+        """Converts a parser/indexer dict, packing pins into a PinTable and sharing pin number strings."""
+        symbol = cls(record)
+        pins = record.get("pins")
+        if isinstance(pins, list):
+            symbol.pins = PinTable.from_dicts(pins)
+        numbers = record.get("pin_numbers")
+        if isinstance(numbers, list):
+            symbol.pin_numbers = tuple(sys.intern(n) if type(n) is str else n for n in numbers)
+        span = record.get("span")
+        if isinstance(span, list):
+            symbol.span = tuple(span)
+        return symbol
+
+    def __getitem__(self, key):
+        if key in Symbol.FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value) -> None:
+        if key in Symbol.FIELDS:
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key) -> None:
+        if key in Symbol.FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self):
+        for key in Symbol.FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key) -> bool:
+        if key in Symbol.FIELDS:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def copy(self) -> "Symbol":
+        return Symbol(self)
+
+    def to_dict(self) -> Dict:
+        """Plain dict copy, with pins unpacked, for JSON or callers that need a real dict."""
+        record = dict(self)
+        if isinstance(record.get("pins"), PinTable):
+            record["pins"] = record["pins"].to_dicts()
+        return record
+
+    def __repr__(self) -> str:
+        return f"Symbol({self.get('library')!r}, {self.get('name')!r})"
+
+
+def measure_memory(records: List[Dict]) -> Dict[str, int]:
+    """
+    Memory benchmark: bytes allocated to hold `records` as plain dicts (deep-copied fresh)
+    versus as Symbol/PinTable objects, measured with tracemalloc.
+    """
+    import copy
+
+    def allocated(build):
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            kept = build()
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del kept
+        return after - before
+
+    return {
+        "symbols": len(records),
+        "pins": sum(len(r.get("pins") or ()) for r in records),
+        "dict_bytes": allocated(lambda: copy.deepcopy(records)),
+        # Each record is deep-copied too, so neither side shares objects with `records`
+        "compact_bytes": allocated(lambda: [Symbol.from_record(copy.deepcopy(r)) for r in records]),
+        "pin_dict_bytes": allocated(lambda: [copy.deepcopy(r.get("pins") or []) for r in records]),
+        "pin_table_bytes": allocated(lambda: [PinTable.from_dicts(copy.deepcopy(r.get("pins") or [])) for r in records]),
+    }
+
+
+if __name__ == "__main__":
+    # python -m backend.symbol_models path/to/lib.kicad_sym [...]
+    from backend.parser import KiCadParser
+
+    records = []
+    for lib_path in sys.argv[1:]:
+        records.extend(KiCadParser.parse_lib_full(lib_path))
+    report = measure_memory(records)
+    print(f"{report['symbols']} symbols, {report['pins']} pins")
+    for label, before, after in (
+        ("symbols", report["dict_bytes"], report["compact_bytes"]),
+        ("pins only", report["pin_dict_bytes"], report["pin_table_bytes"]),
+    ):
+        ratio = before / after if after else 0.0
+        print(f"  {label}: dicts {before / 1e6:.2f} MB, compact {after / 1e6:.2f} MB ({ratio:.1f}x)")
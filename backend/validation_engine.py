@@ -0,0 +1,154 @@
+import json
+import re
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+Failure = Tuple[str, str, str] # (lib, name, message), as shown in the validation table
+
+
+class CompiledRules:
+    """Property rules and exemptions prepared once per rules change: regexes compiled, exemptions as sets."""
+
+    def __init__(self, global_rules: Dict, library_rules: Dict, exemptions: Dict):
+        self.global_rules: List[Tuple[str, str, Optional["re.Pattern"]]] = []
+        for rule_name, rule_regex in (global_rules or {}).items():
+            pattern = None
+            if rule_regex:
+                try:
+                    pattern = re.compile(rule_regex)
+                except re.error as e:
+                    print(f"DEBUG: [Validation] Ignoring invalid regex for '{rule_name}': {e}")
+            self.global_rules.append((rule_name, rule_regex, pattern))
+        self.global_key = tuple((name, regex) for name, regex, _ in self.global_rules)
+        self.library_rules = {lib: tuple(names) for lib, names in (library_rules or {}).items()}
+        self.lib_exemptions = {lib: frozenset(rules) for lib, rules in (exemptions.get("libraries") or {}).items()}
+        self.part_exemptions: Dict[str, Dict[str, frozenset]] = defaultdict(dict) # lib -> part name -> rules
+        for uid, rules in (exemptions.get("parts") or {}).items():
+            lib, _, name = uid.partition(":")
+            self.part_exemptions[lib][name] = frozenset(rules)
+        self._global_names = tuple(name for name, _, _ in self.global_rules)
+        self._tokens = {}
+
+    def library_token(self, lib: str) -> tuple:
+        """
+        (global rules, library rules, library exemptions, property names read) for one library.
+        The same tuple object is returned until the rules are recompiled, so cache checks are identity tests.
+        """
+        token = self._tokens.get(lib)
+        if token is None:
+            lib_rules = self.library_rules.get(lib, ())
+            token = self._tokens[lib] = (
+                self.global_key, lib_rules, self.lib_exemptions.get(lib, frozenset()), self._global_names + lib_rules,
+            )
+        return token
+
+
+class ValidationEngine:
+    """
+    Property validation with a per-part result cache. A part is re-evaluated only when its
+    fingerprint changes: the values of the properties its rules read plus the rules and
+    exemptions that apply to it. Normal and exempted failures come out of the same pass.
+    """
+
+    _EMPTY = frozenset()
+
+    def __init__(self):
+        self._rules: Optional[CompiledRules] = None
+        self._rules_source = None
+        # lib -> part name -> (library token, property values, part exemptions, failures, exempted)
+        self._results: Dict[str, Dict[str, tuple]] = {}
+        self.evaluated = 0 # Parts evaluated (not served from cache) by the last run
+
+    def compile(self, global_rules: Dict, library_rules: Dict, exemptions: Dict) -> CompiledRules:
+        """Returns the compiled rules, rebuilding them only when the rule or exemption data changed."""
+        source = json.dumps(
+            [global_rules, library_rules, exemptions.get("libraries"), exemptions.get("parts")],
+            sort_keys=True, default=str,
+        )
+        if self._rules is None or source != self._rules_source:
+            self._rules = CompiledRules(global_rules, library_rules, exemptions)
+            self._rules_source = source
+        return self._rules
+
+    def iter_run(self, data_store, global_rules, library_rules, exemptions, lib_matches=None) -> Iterator[Tuple[str, List[Failure], List[Failure], int]]:
+        """
+        Validates `data_store` one library at a time, yielding (lib, failures, exempted failures,
+        parts checked) per library in data_store order. Stopping early keeps the libraries done so far cached.
+        """
+        rules = self.compile(global_rules, library_rules, exemptions)
+        libs = [lib for lib in data_store if lib_matches is None or lib_matches(lib)]
+        self.evaluated = 0
+        for lib in libs:
+            parts = data_store.get(lib) or {}
+            token = rules.library_token(lib)
+            _, lib_rules, lib_ex, keys = token
+            part_exemptions = rules.part_exemptions.get(lib, {})
+            previous = self._results.get(lib, {})
+            current = {}
+            failures: List[Failure] = []
+            exempted: List[Failure] = []
+            for name, data in parts.items():
+                props = data.get("properties", {})
+                values = tuple(map(props.get, keys))
+                part_ex = part_exemptions.get(name, self._EMPTY)
+                entry = previous.get(name)
+                if entry is None or entry[1] != values or entry[2] != part_ex or (entry[0] is not token and entry[0] != token):
+                    entry = (token, values, part_ex) + self._evaluate(rules, lib, name, props, lib_rules, lib_ex | part_ex)
+                    self.evaluated += 1
+                current[name] = entry
+                if entry[3]:
+                    failures.extend(entry[3])
+                if entry[4]:
+                    exempted.extend(entry[4])
+            # Replacing the library's results drops parts that no longer exist
+            self._results[lib] = current
+            yield lib, failures, exempted, len(current)
+        if lib_matches is None:
+            for lib in set(self._results) - set(libs):
+                del self._results[lib]
+
+    def run(self, data_store, global_rules, library_rules, exemptions, lib_matches=None):
+        """
+        Validates every part of `data_store` in the libraries accepted by `lib_matches`.
+        Returns (failures, exempted failures, stats) in data_store order.
+        """
+        failures: List[Failure] = []
+        exempted: List[Failure] = []
+        stats = {"total_checked": 0, "total_fails": 0, "fails_by_lib": defaultdict(int)}
+        for lib, lib_failures, lib_exempted, checked in self.iter_run(data_store, global_rules, library_rules, exemptions, lib_matches):
+            stats["total_checked"] += checked
+            if lib_failures:
+                failures.extend(lib_failures)
+                stats["fails_by_lib"][lib] += len(lib_failures)
+            exempted.extend(lib_exempted)
+        stats["total_fails"] = len(failures)
+        return failures, exempted, stats
+
+    def invalidate(self) -> None:
+        self._results.clear()
+
+    @staticmethod
+    def _evaluate(rules: CompiledRules, lib, name, props, lib_rules, exempt) -> Tuple[Tuple[Failure, ...], Tuple[Failure, ...]]:
+        # Results are kept for every part, so they are tuples (shared empty tuple for clean parts)
+        failures = exempted = ()
+        # 1. Global Rules
+        for rule_name, rule_regex, pattern in rules.global_rules:
+            if rule_name not in props:
+                message = f"Missing Global Property: '{rule_name}'"
+            elif pattern is not None and not pattern.fullmatch(props[rule_name]):
+                message = f"Invalid '{rule_name}': '{props[rule_name]}' (Regex: {rule_regex})"
+            else:
+                continue
+            if rule_name in exempt:
+                exempted += ((lib, name, f"[Exempt] '{rule_name}'"),)
+            else:
+                failures += ((lib, name, message),)
+        # 2. Library Rules
+        for rule_name in lib_rules:
+            if rule_name in props:
+                continue
+            if rule_name in exempt:
+                exempted += ((lib, name, f"[Exempt] '{rule_name}'"),)
+            else:
+                failures += ((lib, name, f"Missing Library Rule: '{rule_name}'"),)
+        return failures, exempted
@@ -0,0 +1,156 @@
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+Failure = Tuple[str, str, str] # (lib, name, message)
+
+
+def _as_timestamp(value) -> str:
+    """Timestamps are stored as UTC ISO strings, which order the same way as the times they encode."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat()
+    return str(value or "")
+
+
+class ValidationHistory:
+    """
+    Append-only log of validation runs (one compact JSON object per line). Each run stores its
+    per-library counts and only the failures added and resolved since the previous run, so the
+    file grows by the size of the change rather than the size of the result. Queries stream the
+    file line by line; only the current failure set is kept in memory.
+
+    Record layout: {"v", "t" (timestamp), "scope", "target", "full", "libs": {lib: [checked, fails]},
+    "added": [[lib, name, message], ...], "resolved": [...]}
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._state: Optional[Dict[str, Dict[Failure, None]]] = None # lib -> ordered set of open failures
+        self._latest: Optional[Dict] = None
+
+    def record(self, timestamp, scope: str, target_lib, lib_counts: Dict[str, Tuple[int, int]],
+               failures: Iterable[Failure], full: bool) -> Dict:
+        """
+        Appends one run. `lib_counts` maps every library the run checked to (parts checked, failures);
+        a full run also resolves the open failures of libraries it no longer saw.
+        """
+        by_lib: Dict[str, Dict[Failure, None]] = {lib: {} for lib in lib_counts}
+        for failure in failures:
+            by_lib.setdefault(failure[0], {})[tuple(failure)] = None
+        with self._lock:
+            # Per-library sets are replaced, never mutated, so a shallow copy keeps the cached state
+            # intact until the line is on disk
+            state = dict(self._load_state())
+            libs = set(by_lib) | (set(state) if full else set())
+            added: List[Failure] = []
+            resolved: List[Failure] = []
+            for lib in libs:
+                old = state.get(lib, {})
+                new = by_lib.get(lib, {})
+                added.extend(f for f in new if f not in old)
+                resolved.extend(f for f in old if f not in new)
+                if new:
+                    state[lib] = new
+                else:
+                    state.pop(lib, None)
+            entry = {
+                "v": self.FORMAT_VERSION,
+                "t": _as_timestamp(timestamp),
+                "scope": scope,
+                "target": sorted(target_lib) if isinstance(target_lib, (list, tuple, set)) else target_lib,
+                "full": bool(full),
+                "libs": {lib: [int(checked), int(fails)] for lib, (checked, fails) in lib_counts.items()},
+                "added": added,
+                "resolved": resolved,
+            }
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            except Exception as exc:
+                # Later deltas must be computed against what is on disk, so the run is not kept
+                print(f"DEBUG: [Validation] Failed to append history: {exc}")
+                return entry
+            self._state = state
+            self._latest = entry
+        return entry
+
+    def runs(self, since=None) -> Iterator[Dict]:
+        """Yields the stored runs in order, oldest first, optionally only those at or after `since`."""
+        since = _as_timestamp(since) if since is not None else None
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except OSError:
+            return
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue # Torn last line from an interrupted write
+                if not isinstance(entry, dict) or entry.get("v") != self.FORMAT_VERSION:
+                    continue
+                if since is None or entry.get("t", "") >= since:
+                    yield entry
+
+    def latest(self) -> Optional[Dict]:
+        with self._lock:
+            self._load_state()
+            return self._latest
+
+    def current(self, libs: Optional[Iterable[str]] = None) -> List[Failure]:
+        """Open failures after the latest run, for all libraries or only `libs`."""
+        with self._lock:
+            state = self._load_state()
+            selected = state if libs is None else [lib for lib in libs if lib in state]
+            return [f for lib in selected for f in state[lib]]
+
+    def introduced_since(self, since, lib: Optional[str] = None, open_only: bool = False) -> List[Tuple[str, Failure]]:
+        """
+        (timestamp, failure) for every failure added by a run at or after `since`, oldest first.
+        With `open_only`, failures resolved by a later run are left out.
+        """
+        introduced: Dict[Failure, str] = {}
+        for entry in self.runs(since):
+            if open_only:
+                for failure in entry.get("resolved", []):
+                    introduced.pop(tuple(failure), None)
+            for failure in entry.get("added", []):
+                if lib is None or failure[0] == lib:
+                    introduced.setdefault(tuple(failure), entry.get("t", ""))
+        return sorted(((t, f) for f, t in introduced.items()), key=lambda item: item[0])
+
+    def library_trends(self, libs: Optional[Iterable[str]] = None, since=None) -> Dict[str, List[Tuple[str, int, int]]]:
+        """Per library, (timestamp, parts checked, failures) for each run that checked it."""
+        wanted = set(libs) if libs is not None else None
+        trends: Dict[str, List[Tuple[str, int, int]]] = {}
+        for entry in self.runs(since):
+            for lib, counts in entry.get("libs", {}).items():
+                if wanted is None or lib in wanted:
+                    trends.setdefault(lib, []).append((entry.get("t", ""), counts[0], counts[1]))
+        return trends
+
+    def _load_state(self) -> Dict[str, Dict[Failure, None]]:
+        """Replays the log once per process to rebuild the open failure set (caller holds the lock)."""
+        if self._state is not None:
+            return self._state
+        state: Dict[str, Dict[Failure, None]] = {}
+        for entry in self.runs():
+            for failure in entry.get("resolved", []):
+                lib_state = state.get(failure[0])
+                if lib_state is not None:
+                    lib_state.pop(tuple(failure), None)
+                    if not lib_state:
+                        del state[failure[0]]
+            for failure in entry.get("added", []):
+                state.setdefault(failure[0], {})[tuple(failure)] = None
+            self._latest = entry
+        self._state = state
+        return state
@@ -1,3 +1,4 @@
+import threading
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
@@ -19,3 +20,28 @@ class ValidationSummary:
     stats: Dict[str, Any]
     failures: List[ValidationFailure]
     affected: List[str]
+
+
+@dataclass
+class ValidationBatch:
+    lib: Optional[str]  # None on the final batch
+    failures: List[ValidationFailure]
+    exempted: List[ValidationFailure]
+    checked: int  # parts checked in this library
+    libs_done: int
+    libs_total: int
+    summary: Optional[ValidationSummary] = None  # set on the final batch of a completed run
+
+
+class CancelToken:
+    """Cooperative cancellation flag shared between a validation stream and its consumer."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
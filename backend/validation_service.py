@@ -1,43 +1,107 @@
 import json
-from dataclasses import asdict
+from collections import defaultdict
 from datetime import datetime
+from typing import Iterator, Optional
 
 from backend.validator import Validator
-from backend.validation_models import ValidationFailure, ValidationSummary
+from backend.validation_history import ValidationHistory
+from backend.validation_models import CancelToken, ValidationBatch, ValidationFailure, ValidationSummary
 
 
 class ValidationService:
-    CACHE_NAME = "validation_cache.json"
+    CACHE_NAME = "validation_cache.json" # Last full summary, written by older versions; read as a fallback
+    HISTORY_NAME = "validation_history.jsonl"
 
     def __init__(self, logic, validator=None):
         self.logic = logic
         self.validator = validator or Validator(logic)
         self.cache_path = self.logic.cache_dir / self.CACHE_NAME
+        self.history = ValidationHistory(self.logic.cache_dir / self.HISTORY_NAME)
 
     def run_validation(self, scope="all", target_lib=None) -> ValidationSummary:
-        failures, stats = self.validator.validate_and_get_stats(scope, target_lib)
-        formatted = self._format_failures(failures)
+        for batch in self.stream_validation(scope, target_lib):
+            if batch.summary is not None:
+                return batch.summary
+
+    def stream_validation(self, scope="all", target_lib=None, cancel: Optional[CancelToken] = None) -> Iterator[ValidationBatch]:
+        """
+        Runs property validation one library at a time, yielding a ValidationBatch per library
+        so callers can show results while the rest is checked. The final batch carries the
+        summary, which is recorded in the validation history like run_validation's. Only complete
+        runs are recorded: a cancelled run stops before the next library and records nothing, so
+        the history never mistakes unchecked libraries for fixed or removed ones.
+        """
+        libs_total = sum(1 for lib in self.logic.data_store if self.validator._lib_matches(lib, scope, target_lib))
+        failures = []
+        stats = {"total_checked": 0, "total_fails": 0, "fails_by_lib": defaultdict(int)}
+        lib_counts = {}
+        libs_done = 0
+        for lib, lib_failures, lib_exempted, checked in self.validator.iter_property_rules(scope, target_lib):
+            if cancel is not None and cancel.cancelled:
+                return
+            formatted = self._format_failures(lib_failures)
+            failures.extend(formatted)
+            stats["total_checked"] += checked
+            if formatted:
+                stats["total_fails"] += len(formatted)
+                stats["fails_by_lib"][lib] += len(formatted)
+            lib_counts[lib] = (checked, len(formatted))
+            libs_done += 1
+            yield ValidationBatch(lib, formatted, self._format_failures(lib_exempted), checked, libs_done, libs_total)
+        if cancel is not None and cancel.cancelled:
+            return
+
         summary = ValidationSummary(
             timestamp=datetime.utcnow().isoformat() + "Z",
             scope=scope,
             target_lib=target_lib,
             status="error" if stats.get("total_fails", 0) else "ok",
             stats=stats,
-            failures=formatted,
-            affected=sorted({f"{item.lib}:{item.name}" for item in formatted}),
+            failures=failures,
+            affected=sorted({f"{item.lib}:{item.name}" for item in failures}),
         )
-        self._cache_summary(summary)
-        return summary
+        if libs_done == libs_total:
+            self._record_summary(summary, lib_counts)
+        else:
+            # The library set changed under the run (e.g. a rescan), so its delta would be wrong
+            print(f"DEBUG: [Validation] Run covered {libs_done}/{libs_total} libraries; not recorded in history")
+        yield ValidationBatch(None, [], [], 0, libs_done, libs_total, summary=summary)
 
     def get_cached_summary(self) -> ValidationSummary | dict:
-        if not self.cache_path.exists():
-            return {}
-        try:
-            with open(self.cache_path, "r", encoding="utf-8") as f:
-                payload = json.load(f)
-            return self._deserialize_summary(payload)
-        except Exception:
-            return {}
+        """Summary of the last recorded run, rebuilt from the validation history."""
+        latest = self.history.latest()
+        if latest is None:
+            return self._load_legacy_summary()
+        libs = latest.get("libs", {})
+        failures = self._format_failures(self.history.current(libs))
+        fails_by_lib = defaultdict(int)
+        for lib, (_, fails) in libs.items():
+            if fails:
+                fails_by_lib[lib] = fails
+        stats = {
+            "total_checked": sum(checked for checked, _ in libs.values()),
+            "total_fails": len(failures),
+            "fails_by_lib": fails_by_lib,
+        }
+        return ValidationSummary(
+            timestamp=latest.get("t", ""),
+            scope=latest.get("scope", "all"),
+            target_lib=latest.get("target"),
+            status="error" if failures else "ok",
+            stats=stats,
+            failures=failures,
+            affected=sorted({f"{item.lib}:{item.name}" for item in failures}),
+        )
+
+    def failures_introduced_since(self, since, lib=None, open_only=False):
+        """(timestamp, ValidationFailure) for failures first reported at or after `since` (datetime or ISO string)."""
+        introduced = self.history.introduced_since(since, lib, open_only)
+        failures = self._format_failures(failure for _, failure in introduced)
+        return [(timestamp, failure) for (timestamp, _), failure in zip(introduced, failures)]
+
+    def get_library_trends(self, libs=None, since=None):
+        """Per library, (timestamp, parts checked, failures) for each recorded run that checked it."""
+        return self.history.library_trends(libs, since)
 
     def _format_failures(self, failures):
         results = []
@@ -61,13 +125,25 @@ class ValidationService:
         keywords = ("missing", "failed", "invalid", "duplicate", "error")
         return "error" if any(keyword in text for keyword in keywords) else "warning"
 
-    def _cache_summary(self, summary: ValidationSummary):
+    def _record_summary(self, summary: ValidationSummary, lib_counts):
+        self.history.record(
+            summary.timestamp,
+            summary.scope,
+            summary.target_lib,
+            lib_counts,
+            ((f.lib, f.name, f.message) for f in summary.failures),
+            full=summary.scope != "selected",
+        )
+
+    def _load_legacy_summary(self):
+        if not self.cache_path.exists():
+            return {}
         try:
-            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_path, "w", encoding="utf-8") as f:
-                json.dump(asdict(summary), f, indent=2)
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            return self._deserialize_summary(payload)
         except Exception:
-            pass
+            return {}
 
     def _deserialize_summary(self, payload):
         if not isinstance(payload, dict):
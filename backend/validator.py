@@ -1,8 +1,8 @@
-import re
 import os
 from collections import defaultdict
-from pathlib import Path
 from backend.parser import KiCadParser
+from backend.symbol_db import MPN_KEYS
+from backend.validation_engine import ValidationEngine
 
 class Validator:
     FOOTPRINT_RULES = (
@@ -13,8 +13,11 @@ class Validator:
         "Pad has zero size",
         "Pad drill larger than pad",
     )
+    FOOTPRINT_RULES_VERSION = 1 # Bump when _footprint_issues changes so cached results are recomputed
     def __init__(self, logic):
         self.logic = logic
+        self.engine = ValidationEngine() # Compiled property rules with per-part results
+        self._fp_results = {} # .kicad_mod path -> (mtime, size, rule set) key and its structural issues
 
     def _lib_matches(self, lib, scope, target_lib):
         if scope != "selected":
@@ -23,101 +26,50 @@ class Validator:
             return lib in target_lib
         return lib == target_lib
 
-    def validate_and_get_stats(self, scope="all", target_lib=None):
-        failures = []
-        stats = {
-            "total_checked": 0,
-            "total_fails": 0,
-            "fails_by_lib": defaultdict(int)
-        }
-
-        # Helper to run checks
-        def run_checks(is_shadow=False):
-            res_list = []
-            for lib, parts in self.logic.data_store.items():
-                if not self._lib_matches(lib, scope, target_lib):
-                    continue
+    def _run_property_rules(self, scope, target_lib):
+        return self.engine.run(*self._engine_args(scope, target_lib))
 
-                lib_exemptions = self.logic.exemptions['libraries'].get(lib, [])
-                
-                for name, data in parts.items():
-                    if not is_shadow: stats["total_checked"] += 1
-                    uid = f"{lib}:{name}"
-                    part_exemptions = self.logic.exemptions['parts'].get(uid, [])
-                    props = data.get("properties", {})
-
-                    # 1. Global Rules
-                    for rule_name, rule_regex in self.logic.global_rules.items():
-                        is_exempt = rule_name in lib_exemptions or rule_name in part_exemptions
-                        
-                        if is_shadow != is_exempt: continue # Skip if mode doesn't match exemption status
-
-                        if rule_name not in props:
-                            res_list.append((lib, name, f"Missing Global Property: '{rule_name}'"))
-                            if not is_shadow: 
-                                stats["total_fails"] += 1
-                                stats["fails_by_lib"][lib] += 1
-                        elif rule_regex:
-                            val = props[rule_name]
-                            if not re.fullmatch(rule_regex, val):
-                                res_list.append((lib, name, f"Invalid '{rule_name}': '{val}' (Regex: {rule_regex})"))
-                                if not is_shadow:
-                                    stats["total_fails"] += 1
-                                    stats["fails_by_lib"][lib] += 1
-
-                    # 2. Library Rules
-                    if lib in self.logic.library_rules:
-                        for rule_name in self.logic.library_rules[lib]:
-                            is_exempt = rule_name in lib_exemptions or rule_name in part_exemptions
-                            if is_shadow != is_exempt: continue
-
-                            if rule_name not in props:
-                                res_list.append((lib, name, f"Missing Library Rule: '{rule_name}'"))
-                                if not is_shadow:
-                                    stats["total_fails"] += 1
-                                    stats["fails_by_lib"][lib] += 1
-            return res_list
-
-        failures = run_checks(is_shadow=False)
+    def iter_property_rules(self, scope="all", target_lib=None):
+        """Per-library form of validate_all: yields (lib, failures, exempted failures, parts checked)."""
+        return self.engine.iter_run(*self._engine_args(scope, target_lib))
+
+    def _engine_args(self, scope, target_lib):
+        return (
+            self.logic.data_store,
+            self.logic.global_rules,
+            self.logic.library_rules,
+            self.logic.exemptions,
+            None if scope != "selected" else (lambda lib: self._lib_matches(lib, scope, target_lib)),
+        )
+
+    def validate_all(self, scope="all", target_lib=None):
+        """Property failures, stats and exempted failures from one pass."""
+        failures, exempted, stats = self._run_property_rules(scope, target_lib)
+        return failures, stats, exempted
+
+    def validate_and_get_stats(self, scope="all", target_lib=None):
+        failures, _, stats = self._run_property_rules(scope, target_lib)
         return failures, stats
 
     def get_exempted_failures(self, scope="all", target_lib=None):
-        # Re-runs logic but flips the exemption filter
-        failures = []
-        for lib, parts in self.logic.data_store.items():
-            if not self._lib_matches(lib, scope, target_lib):
-                continue
-            
-            lib_exemptions = self.logic.exemptions['libraries'].get(lib, [])
-            
-            for name, data in parts.items():
-                uid = f"{lib}:{name}"
-                part_exemptions = self.logic.exemptions['parts'].get(uid, [])
-                props = data.get("properties", {})
-
-                # Check Global
-                for rule_name, rule_regex in self.logic.global_rules.items():
-                    if rule_name in lib_exemptions or rule_name in part_exemptions:
-                        # Check if it actually fails
-                        if rule_name not in props or (rule_regex and not re.fullmatch(rule_regex, props[rule_name])):
-                            failures.append((lib, name, f"[Exempt] '{rule_name}'"))
-
-                # Check Library
-                if lib in self.logic.library_rules:
-                    for rule_name in self.logic.library_rules[lib]:
-                        if rule_name in lib_exemptions or rule_name in part_exemptions:
-                            if rule_name not in props:
-                                failures.append((lib, name, f"[Exempt] '{rule_name}'"))
-        return failures
+        # Same pass as validate_and_get_stats; unchanged parts are served from the engine's cache
+        _, exempted, _ = self._run_property_rules(scope, target_lib)
+        return exempted
 
     def check_duplicate_mpns(self):
+        db = getattr(self.logic, "symbol_db", None)
+        if db and db.ready:
+            try:
+                return db.duplicate_mpns()
+            except Exception as e:
+                print(f"DEBUG: [SymbolDB] Duplicate MPN query failed, scanning in memory: {e}")
         mpn_map = defaultdict(list)
         for lib, parts in self.logic.data_store.items():
             for name, data in parts.items():
                 props = data.get("properties", {})
                 # Try common keys for MPN
                 mpn = None
-                for k in ["MPN", "MFR_PART", "MANUFACTURER_PART_NUMBER", "Part Number"]:
+                for k in MPN_KEYS:
                     if k in props:
                         mpn = props[k]
                         break
@@ -130,30 +82,72 @@ class Validator:
     def check_footprint_integrity(self):
         """Checks if symbol pins match footprint pads."""
         issues = []
-        fp_cache = {} # Cache parsed footprints to speed up check
+        pads_by_ref = {} # Pad numbers per footprint reference; geometry itself comes from the shared LRU
 
         for lib, parts in self.logic.data_store.items():
             for name, data in parts.items():
                 fp_ref = data.get("properties", {}).get("Footprint")
                 if not fp_ref: continue # Skip parts without footprints (e.g. logos)
                 
-                if fp_ref not in fp_cache:
-                    fp_cache[fp_ref] = self.logic.get_footprint_data(fp_ref)
+                if fp_ref not in pads_by_ref:
+                    fp_data = self.logic.get_footprint_data(fp_ref)
+                    pads_by_ref[fp_ref] = set(p["number"] for p in fp_data.get("pads", [])) if fp_data else None
                 
-                fp_data = fp_cache[fp_ref]
-                if not fp_data:
+                fp_pads = pads_by_ref[fp_ref]
+                if fp_pads is None:
                     issues.append((lib, name, f"Footprint file not found: {fp_ref}"))
                     continue
                 
                 # Compare Pins vs Pads
-                sym_pins = set(p["number"] for p in data.get("pins", []))
-                fp_pads = set(p["number"] for p in fp_data.get("pads", []))
+                sym_pins = set(self._pin_numbers(data))
                 
                 missing_on_fp = sym_pins - fp_pads
                 if missing_on_fp:
                     issues.append((lib, name, f"Pins missing on footprint: {', '.join(sorted(missing_on_fp))}"))
         return issues
 
+    def _pin_numbers(self, data):
+        """Pin numbers of a symbol; indexed headers carry them without the full pin records."""
+        if "pin_numbers" in data:
+            return data.get("pin_numbers") or []
+        return [p.get("number", "") for p in data.get("pins", []) or []]
+
+    def _footprint_issues(self, record):
+        """
+        Structural issues of one footprint record as (rule, message) pairs, cached per
+        (path, mtime, size, rule set) so unchanged footprints are not re-checked.
+        """
+        path = record.get("file_path", "")
+        key = (record.get("mtime"), record.get("size"), self.FOOTPRINT_RULES, self.FOOTPRINT_RULES_VERSION)
+        cached = self._fp_results.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        found = []
+        pad_sizes = record.get("pad_sizes") or []
+        if not pad_sizes:
+            found.append(("No pads defined", "No pads defined"))
+        else:
+            pad_nums = [str(n).strip() for n in record.get("pad_numbers") or []]
+            has_numbered = any(n and n != "~" for n in pad_nums)
+            has_empty = any((not n) or n == "~" for n in pad_nums)
+            if has_numbered and has_empty:
+                found.append(("Unnumbered pads present", "Unnumbered pads present"))
+
+            for number, (width, height, drill_max) in zip(pad_nums, pad_sizes):
+                num = number or "?"
+                if width <= 0 or height <= 0:
+                    found.append(("Pad has zero size", f"Pad has zero size: Pad {num}"))
+
+                pad_min = min(width, height)
+                if drill_max and pad_min > 0 and drill_max > pad_min:
+                    found.append(("Pad drill larger than pad", f"Pad drill larger than pad: Pad {num}"))
+
+        found = tuple(found)
+        if path:
+            self._fp_results[path] = (key, found)
+        return found
+
     def get_footprint_rules(self):
         return list(self.FOOTPRINT_RULES)
 
@@ -170,7 +164,7 @@ class Validator:
                 continue
             for name, data in parts.items():
                 props = data.get("properties", {})
-                pins = data.get("pins", []) or []
+                pins = self._pin_numbers(data)
 
                 if "Reference" not in props:
                     issues.append((lib, name, "Missing Reference property"))
@@ -180,7 +174,7 @@ class Validator:
                     issues.append((lib, name, "No pins defined"))
 
                 # Pin number checks (warn-level)
-                pin_nums = [str(p.get("number", "")).strip() for p in pins]
+                pin_nums = [str(n).strip() for n in pins]
                 empty_pins = [n for n in pin_nums if not n or n == "~"]
                 if pins and empty_pins:
                     issues.append((lib, name, "Pin(s) with empty number"))
@@ -199,10 +193,12 @@ class Validator:
     def validate_footprints(self, scope="all", target_lib=None):
         """Runs structural footprint checks on all footprint libraries."""
         issues = []
+        seen = set()
 
         if not getattr(self.logic, "footprint_lib_map", {}):
             self.logic.scan_footprint_libraries()
 
+        in_scope = {}
         for lib, lib_path in (self.logic.footprint_lib_map or {}).items():
             if not self._lib_matches(lib, scope, target_lib):
                 continue
@@ -211,68 +207,107 @@ class Validator:
                 if not self._fp_is_exempt(lib, "-", rule):
                     issues.append((lib, "-", rule))
                 continue
-
-            for fp_file in Path(lib_path).rglob("*.kicad_mod"):
-                fp_name = fp_file.stem
-                fp = KiCadParser.parse_footprint_full(fp_file)
-                if not fp:
-                    rule = "Failed to parse footprint"
-                    if not self._fp_is_exempt(lib, fp_name, rule):
-                        issues.append((lib, fp_name, rule))
-                    continue
-
-                pads = fp.get("pads", []) or []
-                if not pads:
-                    rule = "No pads defined"
-                    if not self._fp_is_exempt(lib, fp_name, rule):
-                        issues.append((lib, fp_name, rule))
-                    continue
-
-                pad_nums = [str(p.get("number", "")).strip() for p in pads]
-                has_numbered = any(n and n != "~" for n in pad_nums)
-                has_empty = any((not n) or n == "~" for n in pad_nums)
-                if has_numbered and has_empty:
-                    rule = "Unnumbered pads present"
+            in_scope[lib] = lib_path
+
+        # Metadata records from FootprintIndexer, re-checked against the files on disk so edits
+        # since the last scan are picked up; unchanged files are not re-read and the changed ones
+        # of all libraries are parsed in one pool. Structural results are cached per file,
+        # exemptions are applied on top of them.
+        settings = getattr(self.logic, "settings", {}) or {}
+        refreshed = self.logic.footprint_indexer.refresh_libraries(
+            in_scope,
+            max_workers=settings.get("library_scan_workers") or self.logic.LIBRARY_SCAN_WORKERS,
+            backend=settings.get("library_scan_backend") or self.logic.LIBRARY_SCAN_BACKEND,
+        )
+        for lib, records in refreshed.items():
+            for record in records:
+                fp_name = record.get("name", "")
+                seen.add(record.get("file_path", ""))
+                for rule, message in self._footprint_issues(record):
                     if not self._fp_is_exempt(lib, fp_name, rule):
-                        issues.append((lib, fp_name, rule))
-
-                for pad in pads:
-                    num = str(pad.get("number", "")).strip() or "?"
-                    size = pad.get("size", [])
-                    if not size or len(size) < 2 or size[0] <= 0 or size[1] <= 0:
-                        rule = "Pad has zero size"
-                        if not self._fp_is_exempt(lib, fp_name, rule):
-                            issues.append((lib, fp_name, f"{rule}: Pad {num}"))
-
-                    drill = pad.get("drill")
-                    if isinstance(drill, dict):
-                        dsize = drill.get("size", [])
-                        if dsize:
-                            drill_max = max(dsize)
-                            pad_min = min(size) if size and len(size) >= 2 else 0
-                            if pad_min > 0 and drill_max > pad_min:
-                                rule = "Pad drill larger than pad"
-                                if not self._fp_is_exempt(lib, fp_name, rule):
-                                    issues.append((lib, fp_name, f"{rule}: Pad {num}"))
+                        issues.append((lib, fp_name, message))
 
+        if scope != "selected":
+            self._fp_results = {path: cached for path, cached in self._fp_results.items() if path in seen}
         return issues
 
+    def _refresh_spans(self, file_path):
+        """
+        Re-indexes a rewritten library file once and moves every data_store header from it to its
+        new byte span, so later loads do not each fall back to re-indexing the file.
+        """
+        try:
+            spans = {entry.get("name"): entry.get("span") for entry in KiCadParser.index_lib_symbols(file_path)}
+        except Exception as e:
+            print(f"DEBUG: [Update] Failed to re-index {os.path.basename(file_path)}: {e}")
+            return
+        library = self.logic.data_store.get(os.path.splitext(os.path.basename(file_path))[0]) or {}
+        for name, header in library.items():
+            if header.get("file_path") == file_path and spans.get(name):
+                header["span"] = spans[name]
+
     def bulk_edit_property(self, lib, name, key, new_val):
         """Updates a property in the actual .kicad_sym file."""
-        if lib not in self.logic.data_store or name not in self.logic.data_store[lib]:
-            return False, "Part not found in memory."
-        
-        data = self.logic.data_store[lib][name]
-        file_path = data.get('file_path')
-        
-        if not file_path or not os.path.exists(file_path):
-            return False, "Source file not found."
-
-        success, msg = KiCadParser.update_symbol_property(file_path, name, key, new_val)
-        if success:
-            # Update memory
-            if "properties" not in self.logic.data_store[lib][name]:
-                self.logic.data_store[lib][name]["properties"] = {}
-            self.logic.data_store[lib][name]["properties"][key] = new_val
-            return True, "Property updated successfully."
-        return False, msg
+        updated, errors = self.bulk_edit_properties([(lib, name, key, new_val)])
+        if errors:
+            return False, errors[0][3]
+        return True, "Property updated successfully."
+
+    def bulk_edit_properties(self, edits):
+        """
+        Applies many (lib, name, key, value) edits to the .kicad_sym files; a missing property is
+        added and a value of None deletes it. Edits are grouped per file so each file gets one backup
+        and one rewrite; data_store and the symbol DB are updated in place for the edits that were
+        written. Returns (number updated, [(lib, name, key, error)]).
+        """
+        errors = []
+        by_file = defaultdict(lambda: defaultdict(dict)) # file -> symbol -> {key: value}
+        owners = {} # (file, symbol) -> lib
+        for lib, name, key, new_val in edits:
+            data = self.logic.data_store.get(lib, {}).get(name)
+            if data is None:
+                errors.append((lib, name, key, "Part not found in memory."))
+                continue
+            file_path = data.get('file_path')
+            if not file_path or not os.path.exists(file_path):
+                errors.append((lib, name, key, "Source file not found."))
+                continue
+            by_file[file_path][name][key] = new_val
+            owners[(file_path, name)] = lib
+
+        written = []
+        for file_path, file_edits in by_file.items():
+            success, msg, applied = KiCadParser.update_symbol_properties(file_path, file_edits)
+            if not success:
+                applied = set() # The file was left as it was; report every edit against it
+            if applied:
+                self._refresh_spans(file_path)
+                if hasattr(self.logic, "symbol_loader"):
+                    # Expanded copies of the edited file are stale
+                    self.logic.symbol_loader.invalidate(file_path)
+            for name, props in file_edits.items():
+                lib = owners[(file_path, name)]
+                for key, new_val in props.items():
+                    if (name, key) in applied:
+                        written.append((lib, name, key, new_val))
+                    elif not success:
+                        errors.append((lib, name, key, f"Write failed: {msg}"))
+                    else:
+                        errors.append((lib, name, key, f"'{key}' of '{name}' not found in source file."))
+
+        # Update memory
+        for lib, name, key, new_val in written:
+            props = self.logic.data_store[lib][name].setdefault("properties", {})
+            if new_val is None:
+                props.pop(key, None)
+            else:
+                props[key] = new_val
+        db = getattr(self.logic, "symbol_db", None)
+        if written and db and db.ready:
+            try:
+                with db.batch():
+                    for lib, name, key, new_val in written:
+                        db.set_property(lib, name, key, new_val)
+            except Exception as e:
+                print(f"DEBUG: [SymbolDB] Failed to mirror property edits: {e}")
+        return len(written), errors
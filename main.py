@@ -1,6 +1,7 @@
 import sys
 import os
 import traceback
+import multiprocessing
 
 from PySide6.QtWidgets import QApplication, QMessageBox, QSplashScreen, QStyle
 from PySide6.QtCore import QLockFile, QDir, Qt, qInstallMessageHandler
@@ -85,4 +86,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Library scans use a process pool; required for frozen Windows builds.
+    multiprocessing.freeze_support()
     main()
@@ -1,6 +1,5 @@
 import os
-import re
-from pathlib import Path
+from collections.abc import Mapping
 from datetime import datetime
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QInputDialog,
                              QTreeView, QSplitter, QPushButton, QLabel, QGroupBox, QTabWidget,
@@ -40,14 +39,16 @@ class SymbolFilterProxy(QSortFilterProxyModel):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._text = ""
+        self._matches = None # "lib:name" ids from the symbol index, accepted on top of substring matches
         self._library = "All Libraries"
         self._orphans_only = False
         self._has_fp = False
         self._has_ds = False
         self._min_pins = 0
 
-    def setTextFilter(self, text):
+    def setTextFilter(self, text, matches=None):
         self._text = (text or "").lower()
+        self._matches = matches if self._text.strip() else None
         self.invalidateFilter()
 
     def setLibraryFilter(self, lib):
@@ -86,8 +87,9 @@ class SymbolFilterProxy(QSortFilterProxyModel):
             return False
 
         if self._text:
+            # Library/name substring as before; index hits add description, keyword, value and MPN matches
             hay = f"{lib} {name}".lower()
-            if self._text not in hay:
+            if self._text not in hay and (self._matches is None or f"{lib}:{name}" not in self._matches):
                 return False
 
         if self._orphans_only and usage not in (0, "0"):
@@ -97,7 +99,7 @@ class SymbolFilterProxy(QSortFilterProxyModel):
             return False
 
         data = idx_name.data(Qt.UserRole) or {}
-        props = data.get("properties", {}) if isinstance(data, dict) else {}
+        props = data.get("properties", {}) if isinstance(data, Mapping) else {}
         if self._has_fp:
             fp = (props.get("Footprint") or "").strip()
             if not fp or fp == "~":
@@ -976,7 +978,7 @@ class ExplorerTab(QWidget):
         for lib, parts in self.logic.data_store.items():
             libs.append(lib)
             for name, data in parts.items():
-                if not isinstance(data, dict):
+                if not isinstance(data, Mapping):
                     continue
                 file_path = data.get("file_path", "")
                 data["file_path"] = self.logic.resolve_path(file_path)
@@ -987,7 +989,7 @@ class ExplorerTab(QWidget):
                     data.setdefault("properties", {})["Datasheet"] = self.logic.resolve_path(datasheet)
                 i_lib = QStandardItem(lib)
                 i_name = QStandardItem(name)
-                i_pins = QStandardItem(); i_pins.setData(len(data.get("pins", [])), Qt.DisplayRole)
+                i_pins = QStandardItem(); i_pins.setData(data.get("pin_count", len(data.get("pins", []))), Qt.DisplayRole)
                 
                 uid = f"{lib}:{name}"
                 usage_count = len(self.logic.project_manager.project_index.get(uid, []))
@@ -1020,9 +1022,10 @@ class ExplorerTab(QWidget):
             fp_libs.append(lib)
             if not lib_path or not os.path.exists(lib_path):
                 continue
-            for fp_file in Path(lib_path).rglob("*.kicad_mod"):
-                name = fp_file.stem
-                pads_count, has_model = self._quick_fp_stats(fp_file)
+            for record in self.logic.footprint_indexer.library_footprints(lib):
+                name = record.get("name", "")
+                pads_count = record.get("pad_count", 0)
+                has_model = record.get("has_model", False)
                 i_lib = QStandardItem(lib)
                 i_name = QStandardItem(name)
                 i_pads = QStandardItem()
@@ -1030,7 +1033,7 @@ class ExplorerTab(QWidget):
                 i_model = QStandardItem("Yes" if has_model else "No")
                 ref = f"{lib}:{name}"
                 i_name.setData(
-                    {"lib": lib, "name": name, "ref": ref, "file_path": str(fp_file)},
+                    {"lib": lib, "name": name, "ref": ref, "file_path": record.get("file_path", "")},
                     Qt.UserRole,
                 )
                 part_refs = self.logic.project_manager.get_parts_using_footprint(ref)
@@ -1128,19 +1131,6 @@ class ExplorerTab(QWidget):
             self.usage_heatmap.setItem(0, col, QTableWidgetItem())
         self.usage_heatmap.setSpan(0, 0, 1, colspan)
 
-    def _quick_fp_stats(self, fp_file):
-        pads_count = 0
-        has_model = False
-        try:
-            with open(fp_file, "r", encoding="utf-8", errors="ignore") as f:
-                text = f.read()
-            pads_count = len(re.findall(r"\(pad\\s", text))
-            has_model = "(model " in text
-        except Exception:
-            pads_count = 0
-            has_model = False
-        return pads_count, has_model
-
     def update_fp_layer_visibility(self):
         """Updates the visible layers in the footprint widget based on checkbox state."""
         visible = {layer for layer, act in self.layer_actions.items() if act.isChecked()}
@@ -1208,7 +1198,9 @@ class ExplorerTab(QWidget):
 
     def apply_filters(self):
         txt = self.search_main.text()
-        self.proxy.setTextFilter(txt)
+        # Indexed full-text search (name, description, keywords, value, MPN) when the database is ready
+        matches = self.logic.search_symbols(txt) if txt.strip() else None
+        self.proxy.setTextFilter(txt, matches)
         self.proxy.setLibraryFilter(self.sym_lib_combo.currentText())
         self.proxy.setShowOrphans(self.filter_orphan.isChecked())
         self.proxy.setRequireFootprint(self.chk_has_fp.isChecked())
@@ -1250,6 +1242,8 @@ class ExplorerTab(QWidget):
         if not data:
             self.update_usage_heatmap(None)
             return
+        # The index only holds headers; pins and graphics are parsed on selection
+        data = self.logic.get_symbol_data(data.get("library", ""), data.get("name", "")) or data
 
         self.pin_table.setHorizontalHeaderLabels(["Pin", "Name", "Type", "Pad"])
         
@@ -1304,7 +1298,7 @@ class ExplorerTab(QWidget):
         self.lbl_ds_path.setText(f"Datasheet: {ds_label}")
         self.lbl_ds_path.setToolTip(self.current_datasheet or "")
         uid = f"{data.get('library', '')}:{data.get('name', '')}"
-        projects = list(self.logic.project_manager.project_index.get(uid, []))
+        projects = self.logic.project_manager.get_projects_using_symbol(uid)
         self._populate_project_usage(projects)
         self.update_usage_heatmap(uid)
 
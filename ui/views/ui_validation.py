@@ -2,9 +2,10 @@ import re
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
                              QGroupBox, QLabel, QPushButton, QComboBox, QLineEdit,
                              QSplitter, QTreeWidget, QTreeWidgetItem, QHeaderView,
-                             QMenu, QMessageBox, QInputDialog, QFrame, QAbstractItemView)
+                             QMenu, QMessageBox, QInputDialog, QFrame, QAbstractItemView, QProgressBar)
 from PySide6.QtGui import QColor, QAction
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThread, Signal
+from backend.validation_models import CancelToken
 from .ui_configuration import RulesConfigTab, ExemptionsConfigTab
 try:
     from .resources.icons import Icons
@@ -20,6 +21,8 @@ class ValidationTab(QWidget):
         self.all_current_failures = []
         self.shadow_failures = []
         self.current_filter_lib = None
+        self._validation_worker = None
+        self._retired_workers = set() # Cancelled workers kept alive until their thread finishes
         self.setup_ui()
 
     def setup_ui(self):
@@ -118,6 +121,19 @@ class ValidationTab(QWidget):
         btn_run.setStyleSheet("font-weight: 600; background-color: #1565C0; color: white; height: 32px; border-radius: 8px;")
         btn_run.clicked.connect(lambda checked=False: self.run_validation("all"))
         ctrl_layout.addWidget(btn_run)
+
+        # Streaming progress (libraries checked) and cancellation
+        progress_row = QHBoxLayout()
+        self.validation_progress = QProgressBar()
+        self.validation_progress.setTextVisible(True)
+        self.validation_progress.setFormat("%v / %m libraries")
+        self.validation_progress.setVisible(False)
+        progress_row.addWidget(self.validation_progress, 1)
+        self.btn_cancel_validation = QPushButton("Cancel")
+        self.btn_cancel_validation.setVisible(False)
+        self.btn_cancel_validation.clicked.connect(self.cancel_validation)
+        progress_row.addWidget(self.btn_cancel_validation)
+        ctrl_layout.addLayout(progress_row)
         
         # Toggle Exemptions
         self.check_show_exempt = QPushButton("Toggle Exempted in Log")
@@ -283,22 +299,94 @@ class ValidationTab(QWidget):
         if target_lib and target_lib != "All Libraries" and scope == "all":
              scope = "selected"
 
-        failures, stats = self.logic.validate_and_get_stats(scope, target_lib)
-        self.all_current_failures = failures
-        
-        # Fetch shadowed (exempted) failures if backend supports it
-        if hasattr(self.logic, 'get_exempted_failures'):
-            self.shadow_failures = self.logic.get_exempted_failures(scope)
+        if hasattr(self.logic, 'stream_validation'):
+            self._start_validation_stream(scope, target_lib)
+            return
+
+        if hasattr(self.logic, 'validate_all'):
+            # Normal and shadowed (exempted) failures from one pass
+            failures, stats, self.shadow_failures = self.logic.validate_all(scope, target_lib)
         else:
-            self.shadow_failures = []
+            failures, stats = self.logic.validate_and_get_stats(scope, target_lib)
+            # Fetch shadowed (exempted) failures if backend supports it
+            if hasattr(self.logic, 'get_exempted_failures'):
+                self.shadow_failures = self.logic.get_exempted_failures(scope)
+            else:
+                self.shadow_failures = []
+        self.all_current_failures = failures
+        self._update_metrics(stats['total_checked'], stats['total_fails'], len(stats['fails_by_lib'].keys()))
+        self.refresh_current_view()
+
+    def _start_validation_stream(self, scope, target_lib):
+        """Runs validation on a worker thread; the log fills in library by library."""
+        previous = self._validation_worker
+        if previous is not None:
+            # Replaced, not awaited: its late batches and finished signal are ignored
+            previous.cancel.cancel()
+            self._retired_workers.add(previous)
+            self._validation_worker = None
+        self.all_current_failures = []
+        self.shadow_failures = []
+        self._stream_checked = 0
+        self._stream_failed_libs = set()
+        self.tree_valid.clear()
+        self._update_metrics(0, 0, 0)
+        self.validation_progress.setRange(0, 0)
+        self.validation_progress.setFormat("%v / %m libraries")
+        self.validation_progress.setVisible(True)
+        self.btn_cancel_validation.setEnabled(True)
+        self.btn_cancel_validation.setVisible(True)
+
+        worker = _ValidationWorker(self.logic, scope, target_lib, CancelToken(), previous)
+        worker.batch_ready.connect(lambda batch, w=worker: self._on_validation_batch(w, batch))
+        worker.failed.connect(lambda message, w=worker: self._on_validation_failed(w, message))
+        worker.finished.connect(lambda w=worker: self._on_validation_finished(w))
+        self._validation_worker = worker
+        worker.start()
+
+    def cancel_validation(self):
+        """Asks the running validation to stop; the UI is reset from the worker's finished signal."""
+        worker = self._validation_worker
+        if worker is None:
+            return
+        worker.cancel.cancel()
+        self.btn_cancel_validation.setEnabled(False)
+        self.validation_progress.setFormat("Cancelling...")
+
+    def _on_validation_batch(self, worker, batch):
+        if worker is not self._validation_worker:
+            return # Late batch from a cancelled run
+        failures = [(f.lib, f.name, f.message) for f in batch.failures]
+        shadow = [(f.lib, f.name, f.message) for f in batch.exempted]
+        self.all_current_failures.extend(failures)
+        self.shadow_failures.extend(shadow)
+        self._stream_checked += batch.checked
+        if failures:
+            self._stream_failed_libs.add(batch.lib)
+        self.validation_progress.setRange(0, max(1, batch.libs_total))
+        self.validation_progress.setValue(batch.libs_done)
+        self._update_metrics(self._stream_checked, len(self.all_current_failures), len(self._stream_failed_libs))
+        self._add_log_rows(failures, shadow)
+
+    def _on_validation_failed(self, worker, message):
+        if worker is not self._validation_worker:
+            return
+        QMessageBox.critical(self, "Error", f"Validation failed: {message}")
+
+    def _on_validation_finished(self, worker):
+        self._retired_workers.discard(worker)
+        if worker is not self._validation_worker:
+            return
+        self._validation_worker = None
+        self.validation_progress.setVisible(False)
+        self.btn_cancel_validation.setVisible(False)
 
-        # Update Dashboard
-        total = stats['total_checked']
+    def _update_metrics(self, total, fails, failed_libs):
         self.lbl_checked.setText(str(total))
-        self.lbl_fails.setText(str(stats['total_fails']))
+        self.lbl_fails.setText(str(fails))
         
         if total > 0:
-            unique_failed = len(set(f"{f[0]}:{f[1]}" for f in failures))
+            unique_failed = len(set(f"{f[0]}:{f[1]}" for f in self.all_current_failures))
             pass_rate = ((total - unique_failed) / total) * 100
             self.lbl_score.setText(f"{pass_rate:.1f}%")
         else:
@@ -308,18 +396,19 @@ class ValidationTab(QWidget):
         total_exempt = sum(len(v) for v in self.logic.exemptions.get('libraries', {}).values()) + \
                        sum(len(v) for v in self.logic.exemptions.get('parts', {}).values())
         self.lbl_exempt.setText(str(total_exempt))
-        self.lbl_libs.setText(str(len(stats['fails_by_lib'].keys())))
-
-        self.refresh_current_view()
+        self.lbl_libs.setText(str(failed_libs))
 
     def refresh_current_view(self):
         self.tree_valid.clear()
+        self._add_log_rows(self.all_current_failures, self.shadow_failures)
+
+    def _add_log_rows(self, failures, shadow_failures):
         query = ""
         if hasattr(self, "issue_search"):
             query = (self.issue_search.text() or "").strip().lower()
         
         # 1. Normal Failures
-        for f in self.all_current_failures:
+        for f in failures:
             if self.current_filter_lib and f[0] != self.current_filter_lib: continue
             if query and query not in f"{f[0]} {f[1]} {f[2]}".lower():
                 continue
@@ -327,7 +416,7 @@ class ValidationTab(QWidget):
 
         # 2. Exempted (Shadow) Failures
         if self.check_show_exempt.isChecked():
-            for f in self.shadow_failures:
+            for f in shadow_failures:
                 if self.current_filter_lib and f[0] != self.current_filter_lib: continue
                 if query and query not in f"{f[0]} {f[1]} {f[2]}".lower():
                     continue
@@ -417,10 +506,16 @@ class ValidationTab(QWidget):
         val, ok = QInputDialog.getText(self, "Bulk Edit", f"New value for '{key}' in {target_desc}:")
         if ok and val:
             errors = []
-            for i in items:
-                l, s = i.text(0), i.text(1)
-                success, msg = self.logic.bulk_edit_property(l, s, key, val)
-                if not success: errors.append(f"{s}: {msg}")
+            if hasattr(self.logic, 'bulk_edit_properties'):
+                # One backup and one rewrite per library file
+                parts = list(dict.fromkeys((i.text(0), i.text(1)) for i in items))
+                _, failed = self.logic.bulk_edit_properties([(l, s, key, val) for l, s in parts])
+                errors = [f"{s}: {msg}" for _, s, _, msg in failed]
+            else:
+                for i in items:
+                    l, s = i.text(0), i.text(1)
+                    success, msg = self.logic.bulk_edit_property(l, s, key, val)
+                    if not success: errors.append(f"{s}: {msg}")
             
             if errors:
                 QMessageBox.warning(self, "Errors", "\n".join(errors[:10]))
@@ -448,3 +543,29 @@ class ValidationTab(QWidget):
             libs = sorted(self.logic.data_store.keys())
             self.lib_combo.addItem("All Libraries")
             self.lib_combo.addItems(libs)
+
+
+class _ValidationWorker(QThread):
+    batch_ready = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, logic, scope, target_lib, cancel, previous=None):
+        super().__init__()
+        self.logic = logic
+        self.scope = scope
+        self.target_lib = target_lib
+        self.cancel = cancel
+        self.previous = previous # Cancelled run still winding down; waited for here, off the UI thread
+
+    def run(self):
+        if self.previous is not None:
+            self.previous.wait()
+            self.previous = None
+        try:
+            for batch in self.logic.stream_validation(self.scope, self.target_lib, self.cancel):
+                if self.cancel.cancelled:
+                    break
+                if batch.lib is not None:
+                    self.batch_ready.emit(batch)
+        except Exception as exc:
+            self.failed.emit(str(exc))
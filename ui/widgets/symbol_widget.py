@@ -1,10 +1,10 @@
 import os
 import re
-import math
 from pathlib import Path
 from PySide6.QtWidgets import QWidget
-from PySide6.QtGui import QPainter, QPen, QColor, QPainterPath, QFont, QFontDatabase, QTextDocument
+from PySide6.QtGui import QPainter, QPen, QColor, QPainterPath, QPicture, QFont, QFontDatabase, QTextDocument
 from PySide6.QtCore import Qt, QPointF, QRectF, QPoint
+from backend.symbol_graphics import normalize_graphics, normalize_property_labels
 from .paint_utils import painting
 
 class SymbolWidget(QWidget):
@@ -15,6 +15,11 @@ class SymbolWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.data = None
+        self._picture = None # Recorded shapes and pin lines of the current symbol
+        self._text_docs = {}
+        self._shapes = []
+        self._labels = []
+        self._pin_labels = []
         self.setMinimumHeight(200)
         # Force white background regardless of theme, as requested
         self.setStyleSheet("background-color: #FFFFFF; border: 1px solid #ccc; color: black;") # Ensures consistent background (KiCad default white)
@@ -53,10 +58,92 @@ class SymbolWidget(QWidget):
     def set_data(self, data):
         """Sets the symbol data to be displayed and triggers a repaint."""
         self.data = data
+        self._prepare_geometry()
         self._calculate_bounds()
         self.reset_view()
         self.update()
 
+    def _prepare_geometry(self):
+        """
+        Resolves what paintEvent needs once per symbol. Expanded symbols carry normalized
+        shapes and labels; raw parser output is normalized here. Also drops the recorded
+        picture and text documents of the previous symbol.
+        """
+        self._picture = None
+        self._text_docs = {}
+        self._shapes = []
+        self._labels = []
+        self._pin_labels = []
+        if not self.data:
+            return
+        shapes = self.data.get("shapes")
+        self._shapes = shapes if shapes is not None else normalize_graphics(self.data.get("graphics", []))
+        labels = self.data.get("property_labels")
+        if labels is None:
+            labels = normalize_property_labels(self.data.get("visual_properties", []))
+        self._labels = labels
+        self._pin_labels = self._layout_pin_labels()
+
+    def _layout_pin_labels(self):
+        """Precomputes number/name placement for every visible pin."""
+        layouts = []
+        offset = self.data.get("pin_names_offset") or 0.6 # Default offset if not specified
+        show_nums = self.data.get("show_pin_numbers")
+        if show_nums is None: show_nums = True
+        show_names = self.data.get("show_pin_names")
+        if show_names is None: show_names = True
+        dist = 0.8
+
+        for p in self.data.get("pins", []):
+            if not p.get("visible", True):
+                continue
+            at = p.get("at", [0, 0])
+            length = p.get("length", 2.54)
+            x, y = at[0], at[1]
+            angle = at[2] if len(at) > 2 else 0
+            mid_pin = length / 2.0
+
+            num_pos = QPointF(0, 0)
+            name_pos = QPointF(0, 0)
+            text_rot = 0
+            name_align = Qt.AlignVCenter | Qt.AlignLeft
+            name_rect_offset = QPointF(0, -1.5)
+
+            if angle == 0: # Right
+                num_pos = QPointF(x + mid_pin, y + dist)
+                name_pos = QPointF(x + length + offset, y)
+            elif angle == 180: # Left
+                num_pos = QPointF(x - mid_pin, y + dist)
+                name_pos = QPointF(x - length - offset, y)
+                name_align = Qt.AlignVCenter | Qt.AlignRight
+                name_rect_offset = QPointF(-10, -1.5)
+            elif angle == 90: # Up
+                num_pos = QPointF(x - dist, y + mid_pin)
+                name_pos = QPointF(x, y + length + offset)
+                text_rot = 90
+            elif angle == 270: # Down
+                num_pos = QPointF(x - dist, y - mid_pin)
+                name_pos = QPointF(x, y - length - offset)
+                text_rot = 90
+                name_align = Qt.AlignVCenter | Qt.AlignRight
+                name_rect_offset = QPointF(-10, -1.5)
+
+            name_text = p.get("name", "")
+            layouts.append({
+                "num_pos": num_pos,
+                "name_pos": name_pos,
+                "text_rot": text_rot,
+                "name_align": name_align,
+                "name_rect_offset": name_rect_offset,
+                "number": str(p.get("number", "")),
+                "num_size": p.get("num_text_size", 1.27),
+                "show_num": bool(show_nums and p.get("num_visible", True)),
+                "name": name_text,
+                "name_size": p.get("name_text_size", 1.27),
+                "show_name": bool(show_names and name_text != "~" and p.get("name_visible", True)),
+            })
+        return layouts
+
     def _calculate_bounds(self):
         """Calculates the bounding box of the symbol content."""
         if not self.data:
@@ -76,38 +163,13 @@ class SymbolWidget(QWidget):
             points.append((at[0], at[1] - l))
 
         # Graphics
-        for g in self.data.get("graphics", []):
-            if g[0] == "polyline":
-                for pt in g[1:]:
-                    if isinstance(pt, list) and pt[0] == "pts":
-                        for xy in pt[1:]:
-                            if isinstance(xy, list) and xy[0] == "xy":
-                                points.append((float(xy[1]), float(xy[2])))
-            elif g[0] == "rectangle":
-                for attr in g[1:]:
-                    if attr[0] in ["start", "end"]:
-                        points.append((float(attr[1]), float(attr[2])))
-            elif g[0] == "arc":
-                for attr in g[1:]:
-                    if isinstance(attr, list) and attr[0] in ["start", "mid", "end"]:
-                        points.append((float(attr[1]), float(attr[2])))
-            elif g[0] == "circle":
-                 center = [0,0]; radius = 0
-                 for attr in g[1:]:
-                     if attr[0] == "center": center = [float(attr[1]), float(attr[2])]
-                     elif attr[0] == "radius": radius = float(attr[1])
-                 points.append((center[0]-radius, center[1]-radius))
-                 points.append((center[0]+radius, center[1]+radius))
-            elif g[0] == "text":
-                for attr in g[2:]:
-                    if isinstance(attr, list) and attr[0] == "at":
-                        points.append((float(attr[1]), float(attr[2])))
-        
+        for shape in self._shapes:
+            points.extend(shape.extent_points())
+
         # Visual Properties
-        for prop in self.data.get("visual_properties", []):
-            for attr in prop[3:]:
-                if isinstance(attr, list) and attr[0] == "at":
-                    points.append((float(attr[1]), float(attr[2])))
+        for _key, _value, layout, _hidden in self._labels:
+            if len(layout.at) >= 2:
+                points.append((layout.at[0], layout.at[1]))
 
         if points:
             xs = [p[0] for p in points]
@@ -195,144 +257,117 @@ class SymbolWidget(QWidget):
             painter.scale(self.view_scale, -self.view_scale)
             painter.translate(-self.view_center)
 
-            # Draw Content
-            pins = self.data.get("pins", [])
-            graphics = self.data.get("graphics", [])
-            base_pen = QPen(QColor("#800000")) # KiCad default symbol color
-            base_pen.setCapStyle(Qt.RoundCap)
-            base_pen.setJoinStyle(Qt.RoundJoin)
+            # Shapes and pin lines do not depend on the view: record them once, replay on pan/zoom
+            if self._picture is None:
+                self._picture = self._record_geometry()
+            painter.drawPicture(QPointF(0, 0), self._picture)
             painter.setBrush(Qt.NoBrush)
 
-            for g in graphics:
-                fill_type = self._extract_fill_type(g)
-                stroke_width = self._extract_stroke_width(g)
-                stroke_color = self._extract_stroke_color(g) or base_pen.color()
-                fill_color = self._extract_fill_color(g)
+            # Text is drawn per frame since text too small for the current zoom is skipped
+            for shape in self._shapes:
+                if shape.kind == "text":
+                    self._draw_text_element(painter, shape.text, shape.layout, QColor("#000080"))
+
+            # Draw Visual Properties (Reference, Value)
+            for key, value, layout, hidden in self._labels:
+                if not hidden:
+                    # Use Teal for Reference/Value, Navy for Others
+                    color = QColor("#008080") if key in ["Reference", "Value"] else QColor("#000080")
+                    self._draw_text_element(painter, value, layout, color)
+
+            # Draw Pin Numbers and Names (Consistent Orientation)
+            p_font = self._kicad_font()
+            ref_size = 48.0 # Reference size scaling for smooth text
+            p_font.setPointSizeF(ref_size)
+            p_font.setHintingPreference(QFont.PreferNoHinting)
+            painter.setFont(p_font)
+
+            for label in self._pin_labels:
+                point_size = label["num_size"]
+                if label["show_num"] and point_size > 0 and (point_size * self.view_scale) >= self._min_text_px:
+                        painter.save()
+                        painter.translate(label["num_pos"])
+                        painter.rotate(label["text_rot"])
+                        painter.scale(1, -1)
+                        scale = point_size / ref_size
+                        painter.scale(scale, scale)
+                        painter.setPen(QColor("#800000"))
+                        # Draw in a large enough rect centered at 0,0 (scaled coords)
+                        painter.drawText(QRectF(-100, -50, 200, 100), Qt.AlignCenter, label["number"])
+                        painter.restore()
+
+                point_size = label["name_size"]
+                if label["show_name"] and point_size > 0 and (point_size * self.view_scale) >= self._min_text_px:
+                        painter.save()
+                        painter.translate(label["name_pos"])
+                        painter.rotate(label["text_rot"])
+                        painter.scale(1, -1)
+                        scale = point_size / ref_size
+                        painter.scale(scale, scale)
+                        painter.setPen(QColor("#008080"))
+                        # Scale the layout rect to match the new coordinate system
+                        offset = label["name_rect_offset"]
+                        rect = QRectF(offset.x()/scale, offset.y()/scale, 10.0/scale, 3.0/scale)
+                        painter.drawText(rect, label["name_align"], label["name"])
+                        painter.restore()
+
+    def _record_geometry(self):
+        """Records shapes, pin lines and connection points into a QPicture in symbol coordinates."""
+        picture = QPicture()
+        painter = QPainter(picture)
+        try:
+            painter.setRenderHint(QPainter.Antialiasing)
+            base_color = QColor("#800000") # KiCad default symbol color
+
+            for shape in self._shapes:
+                if shape.kind == "text":
+                    continue
                 # Use a fresh pen per element to avoid width bleed-over between graphics
-                pen = QPen(base_pen)
+                pen = QPen(base_color)
+                pen.setCapStyle(Qt.RoundCap)
+                pen.setJoinStyle(Qt.RoundJoin)
+                stroke_color = QColor(*shape.stroke_color) if shape.stroke_color else base_color
                 pen.setColor(stroke_color)
                 # Default to KiCad pin width (10 mil = 0.254 mm) when unspecified
-                target_w = stroke_width if stroke_width is not None else 0.254
+                target_w = shape.stroke_width if shape.stroke_width is not None else 0.254
                 pen.setWidthF(self._effective_width(target_w))
                 painter.setPen(pen)
-                if fill_type and fill_type not in ("none", "outline"):
-                    if fill_type == "background":
+                if shape.filled:
+                    if shape.fill_type == "background":
                         painter.setBrush(QColor("#FFFFFF"))
                     else:
-                        painter.setBrush(fill_color or stroke_color)
+                        painter.setBrush(QColor(*shape.fill_color) if shape.fill_color else stroke_color)
                 else:
                     painter.setBrush(Qt.NoBrush)
-                # Draw Rectangles
-                if g[0] == "rectangle":
-                    start = [0,0]
-                    end = [0,0]
-                    for attr in g[1:]:
-                        if attr[0] == "start": start = [float(attr[1]), float(attr[2])]
-                        if attr[0] == "end": end = [float(attr[1]), float(attr[2])]
-                    painter.drawRect(QRectF(QPointF(start[0], start[1]), QPointF(end[0], end[1])))
-                
-                # Draw Polylines
-                elif g[0] == "polyline":
+
+                c = shape.coords
+                if shape.kind == "rectangle":
+                    painter.drawRect(QRectF(QPointF(c[0], c[1]), QPointF(c[2], c[3])))
+                elif shape.kind == "polyline":
+                    if len(c) < 2:
+                        continue
                     path = QPainterPath()
-                    first = True
-                    for pt in g[1:]:
-                        if isinstance(pt, list) and pt[0] == "pts":
-                            for xy in pt[1:]:
-                                if xy[0] == "xy":
-                                    x, y = float(xy[1]), float(xy[2])
-                                    if first: path.moveTo(x, y); first = False
-                                    else: path.lineTo(x, y)
-                    if fill_type and fill_type not in ("none", "outline"):
+                    path.moveTo(c[0], c[1])
+                    for i in range(2, len(c) - 1, 2):
+                        path.lineTo(c[i], c[i + 1])
+                    if shape.filled:
                         path.closeSubpath()
                     painter.drawPath(path)
-                
-                # Draw Circles
-                elif g[0] == "circle":
-                    center = [0,0]
-                    rad = 0
-                    for attr in g[1:]:
-                        if attr[0] == "center": center = [float(attr[1]), float(attr[2])]
-                        if attr[0] == "radius": rad = float(attr[1])
-                    painter.drawEllipse(QPointF(center[0], center[1]), rad, rad)
-                
-                # Draw Arcs (using 3-point arc calculation)
-                elif g[0] == "arc":
-                    pts = []
-                    for attr in g[1:]:
-                        if isinstance(attr, list) and attr[0] in ["start", "mid", "end"]:
-                            pts.append(QPointF(float(attr[1]), float(attr[2])))
-                    
-                    if len(pts) == 3:
-                        # Calculate circle center and radius from 3 points
-                        x1, y1 = pts[0].x(), pts[0].y()
-                        x2, y2 = pts[1].x(), pts[1].y()
-                        x3, y3 = pts[2].x(), pts[2].y()
-                        
-                        D = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
-                        if D != 0:
-                            Ux = ((x1**2 + y1**2) * (y2 - y3) + (x2**2 + y2**2) * (y3 - y1) + (x3**2 + y3**2) * (y1 - y2)) / D
-                            Uy = ((x1**2 + y1**2) * (x3 - x2) + (x2**2 + y2**2) * (x1 - x3) + (x3**2 + y3**2) * (x2 - x1)) / D
-                            center = QPointF(Ux, Uy)
-                            radius = math.sqrt((x1 - Ux)**2 + (y1 - Uy)**2)
-                            
-                            # Calculate angles
-                            # Negate Y delta because painter uses inverted Y axis (scale(1, -1))
-                            start_angle = math.degrees(math.atan2(-(y1 - Uy), x1 - Ux))
-                            mid_angle = math.degrees(math.atan2(-(y2 - Uy), x2 - Ux))
-                            end_angle = math.degrees(math.atan2(-(y3 - Uy), x3 - Ux))
-                            
-                            # Normalize angles to 0-360 for comparison
-                            start_n = start_angle % 360
-                            mid_n = mid_angle % 360
-                            end_n = end_angle % 360
-                            
-                            # Calculate CCW spans
-                            span_end = (end_n - start_n) % 360
-                            span_mid = (mid_n - start_n) % 360
-                            
-                            # Determine direction: if mid is within the CCW path to end, then it's CCW
-                            if span_mid < span_end:
-                                span = span_end
-                            else:
-                                span = span_end - 360
-                            
-                            # Draw Arc (startAngle and spanAngle in 1/16th of a degree)
-                            painter.drawArc(QRectF(center.x() - radius, center.y() - radius, radius*2, radius*2), int(start_angle * 16), int(span * 16))
-
-                elif g[0] == "text":
-                    self._draw_text_element(painter, g[1], g[2:], QColor("#000080"))
+                elif shape.kind == "circle":
+                    painter.drawEllipse(QPointF(c[0], c[1]), shape.radius, shape.radius)
+                elif shape.kind == "arc" and shape.arc:
+                    # Center, radius and angles are precomputed from the start/mid/end points
+                    cx, cy, radius, start_angle, span = shape.arc
+                    # startAngle and spanAngle in 1/16th of a degree
+                    painter.drawArc(QRectF(cx - radius, cy - radius, radius*2, radius*2), int(start_angle * 16), int(span * 16))
 
             painter.setBrush(Qt.NoBrush)
-
-            # Draw Visual Properties (Reference, Value)
-            for prop in self.data.get("visual_properties", []):
-                # prop: ['property', 'Reference', 'U1', ['at', ...], ['effects', ...]]
-                # Check visibility
-                is_hidden = False
-                for attr in prop[3:]:
-                    if attr == "hide": is_hidden = True
-                    elif isinstance(attr, list) and attr[0] == "effects":
-                        if "hide" in attr: is_hidden = True
-                        for e in attr[1:]:
-                            if e == "hide" or (isinstance(e, list) and e[0] == "hide"):
-                                is_hidden = True
-                
-                if not is_hidden:
-                    # Use Teal for Reference/Value, Navy for Others
-                    color = QColor("#008080") if prop[1] in ["Reference", "Value"] else QColor("#000080")
-                    self._draw_text_element(painter, prop[2], prop[3:], color)
-
-            # Draw Pins
-            base_pin_pen = QPen(QColor("#800000"))
+            base_pin_pen = QPen(base_color)
             base_pin_pen.setCapStyle(Qt.RoundCap)
             base_pin_pen.setJoinStyle(Qt.RoundJoin)
-            # Reusable font object
-            p_font = self._kicad_font()
-            
-            for p in pins:
+            for p in self.data.get("pins", []):
                 if not p.get("visible", True):
                     continue
-
                 pin_pen = QPen(base_pin_pen)
                 pin_width = p.get("stroke_width")
                 # KiCad symbol pin default stroke width is 0.254 mm (10 mil) when unspecified
@@ -340,14 +375,10 @@ class SymbolWidget(QWidget):
                 pin_pen.setWidthF(self._effective_width(target_pin_w))
                 painter.setPen(pin_pen)
 
-                # Pin position and length
                 at = p.get("at", [0, 0])
                 length = p.get("length", 2.54)
                 x, y = at[0], at[1]
-                
-                # Determine pin angle from 'at' attribute (if present)
-                angle = 0
-                if len(at) > 2: angle = at[2]
+                angle = at[2] if len(at) > 2 else 0
 
                 # Calculate end point of the pin line based on angle
                 end_x, end_y = x + length, y # Default 0 deg
@@ -355,124 +386,22 @@ class SymbolWidget(QWidget):
                 elif angle == 180: end_x, end_y = x - length, y
                 elif angle == 270: end_x, end_y = x, y - length
 
-                # Draw pin line and connection point
                 painter.drawLine(QPointF(x, y), QPointF(end_x, end_y))
                 painter.drawEllipse(QPointF(x, y), 0.1, 0.1) # Connection point
-                
-                # Draw Pin Number and Name (Consistent Orientation)
-                mid_pin = length / 2.0
-                dist = 0.8
-                offset = self.data.get("pin_names_offset") or 0.6 # Default offset if not specified
-                
-                num_pos = QPointF(0, 0)
-                name_pos = QPointF(0, 0)
-                text_rot = 0
-                name_align = Qt.AlignVCenter | Qt.AlignLeft
-                name_rect_offset = QPointF(0, -1.5)
-                
-                if angle == 0: # Right
-                    num_pos = QPointF(x + mid_pin, y + dist)
-                    name_pos = QPointF(x + length + offset, y)
-                    text_rot = 0
-                    name_align = Qt.AlignVCenter | Qt.AlignLeft
-                    name_rect_offset = QPointF(0, -1.5)
-                elif angle == 180: # Left
-                    num_pos = QPointF(x - mid_pin, y + dist)
-                    name_pos = QPointF(x - length - offset, y)
-                    text_rot = 0
-                    name_align = Qt.AlignVCenter | Qt.AlignRight
-                    name_rect_offset = QPointF(-10, -1.5)
-                elif angle == 90: # Up
-                    num_pos = QPointF(x - dist, y + mid_pin)
-                    name_pos = QPointF(x, y + length + offset)
-                    text_rot = 90
-                    name_align = Qt.AlignVCenter | Qt.AlignLeft
-                    name_rect_offset = QPointF(0, -1.5)
-                elif angle == 270: # Down
-                    num_pos = QPointF(x - dist, y - mid_pin)
-                    name_pos = QPointF(x, y - length - offset)
-                    text_rot = 90
-                    name_align = Qt.AlignVCenter | Qt.AlignRight
-                    name_rect_offset = QPointF(-10, -1.5)
-
-                show_nums = self.data.get("show_pin_numbers")
-                if show_nums is None: show_nums = True
-                
-                num_size = p.get("num_text_size", 1.27)
-                point_size = num_size
-                if show_nums and p.get("num_visible", True) and num_size > 0 and (point_size * self.view_scale) >= self._min_text_px:
-                        painter.save()
-                        painter.translate(num_pos)
-                        painter.rotate(text_rot)
-                        painter.scale(1, -1)
-                        
-                        # Use reference size scaling for smooth text
-                        ref_size = 48.0
-                        scale = point_size / ref_size
-                        painter.scale(scale, scale)
-                        p_font.setPointSizeF(ref_size)
-                        p_font.setHintingPreference(QFont.PreferNoHinting)
-                        painter.setFont(p_font)
-                        painter.setPen(QColor("#800000"))
-                        # Draw in a large enough rect centered at 0,0 (scaled coords)
-                        painter.drawText(QRectF(-100, -50, 200, 100), Qt.AlignCenter, str(p.get("number", "")))
-                        painter.restore()
-
-                show_names = self.data.get("show_pin_names")
-                if show_names is None: show_names = True
-
-                name_text = p.get("name", "")
-                name_size = p.get("name_text_size", 1.27)
-                point_size = name_size
-                if show_names and name_text != "~" and p.get("name_visible", True) and name_size > 0 and (point_size * self.view_scale) >= self._min_text_px:
-                        painter.save()
-                        painter.translate(name_pos)
-                        painter.rotate(text_rot)
-                        painter.scale(1, -1)
-                        
-                        # Use reference size scaling
-                        ref_size = 48.0
-                        scale = point_size / ref_size
-                        painter.scale(scale, scale)
-                        p_font.setPointSizeF(ref_size)
-                        p_font.setHintingPreference(QFont.PreferNoHinting)
-                        painter.setFont(p_font)
-                        painter.setPen(QColor("#008080"))
-                        
-                        # Scale the layout rect to match the new coordinate system
-                        rect = QRectF(name_rect_offset.x()/scale, name_rect_offset.y()/scale, 10.0/scale, 3.0/scale)
-                        painter.drawText(rect, name_align, name_text)
-                        painter.restore()
-
-    def _draw_text_element(self, painter, content, attributes, color):
-        at = [0, 0, 0]
-        size = [1.27, 1.27]
-        h_align = Qt.AlignHCenter
-        v_align = Qt.AlignVCenter
-
-        for attr in attributes:
-            if isinstance(attr, list):
-                if attr[0] == "at": at = [float(x) for x in attr[1:]]
-                elif attr[0] == "effects":
-                    for e in attr[1:]:
-                        if isinstance(e, list):
-                            if e[0] == "font":
-                                for f in e[1:]:
-                                    if isinstance(f, list) and f[0] == "size":
-                                        size = [float(x) for x in f[1:]]
-                            elif e[0] == "justify":
-                                for j in e[1:]:
-                                    if j == "left": h_align = Qt.AlignLeft
-                                    elif j == "right": h_align = Qt.AlignRight
-                                    elif j == "top": v_align = Qt.AlignTop
-                                    elif j == "bottom": v_align = Qt.AlignBottom
-        
+        finally:
+            painter.end()
+        return picture
+
+    def _draw_text_element(self, painter, content, layout, color):
+        """Draws a text element from its precomputed TextLayout."""
+        at = layout.at
+        size = layout.size
         if not size or size[0] <= 0:
             return
 
-        # Ensure size has 2 elements (Height, Width)
-        if len(size) < 2:
-            size.append(size[0])
+        # Heuristic to prevent rendering errors with tiny fonts
+        if abs(size[0]) * self.view_scale < self._min_text_px:
+            return
 
         painter.save()
         painter.translate(at[0], at[1]) # Move to text position
@@ -489,16 +418,33 @@ class SymbolWidget(QWidget):
         
         # KiCad size is [Height, Width]
         # We scale the painter to match the target dimensions using the reference font size
-        scale_x = abs(size[1]) / ref_size
+        scale_x = abs(size[1] if len(size) > 1 else size[0]) / ref_size
         scale_y = abs(size[0]) / ref_size
-        
-        # Heuristic to prevent rendering errors with tiny fonts
-        if abs(size[0]) * self.view_scale < self._min_text_px:
-            painter.restore()
-            return
-
         painter.scale(scale_x, scale_y)
 
+        doc = self._text_document(content, color, ref_size)
+        w = doc.size().width()
+        h = doc.size().height()
+        
+        x_off = 0
+        if layout.h_align == "center": x_off = -w / 2
+        elif layout.h_align == "right": x_off = -w
+        
+        y_off = 0
+        if layout.v_align == "top": y_off = 0
+        elif layout.v_align == "bottom": y_off = -h
+        else: y_off = -h / 2.0
+        
+        painter.translate(x_off, y_off)
+        doc.drawContents(painter)
+        painter.restore()
+
+    def _text_document(self, content, color, ref_size):
+        """Laid-out rich text for a text element, cached per symbol so repaints skip HTML layout."""
+        key = (content, color.name())
+        doc = self._text_docs.get(key)
+        if doc is not None:
+            return doc
         t_font = self._kicad_font()
         t_font.setPointSizeF(ref_size)
         t_font.setHintingPreference(QFont.PreferNoHinting) # Important for smooth scaling
@@ -512,87 +458,8 @@ class SymbolWidget(QWidget):
         
         html_content = self._format_kicad_text(content)
         doc.setHtml(f"<body>{html_content}</body>")
-        
-        w = doc.size().width()
-        h = doc.size().height()
-        
-        x_off = 0
-        if h_align == Qt.AlignHCenter: x_off = -w / 2
-        elif h_align == Qt.AlignRight: x_off = -w
-        
-        y_off = 0
-        if v_align == Qt.AlignTop: y_off = 0
-        elif v_align == Qt.AlignBottom: y_off = -h
-        elif v_align == Qt.AlignVCenter: y_off = -h / 2.0
-        
-        painter.translate(x_off, y_off)
-        doc.drawContents(painter)
-        painter.restore()
-
-    def _extract_fill_type(self, node):
-        for attr in node[1:]:
-            if not isinstance(attr, list):
-                continue
-            if attr[0] == "fill":
-                if len(attr) > 1 and isinstance(attr[1], str):
-                    return attr[1]
-                for f in attr[1:]:
-                    if isinstance(f, list) and f[0] == "type" and len(f) > 1:
-                        return f[1]
-        return None
-
-    def _to_qcolor(self, r, g, b, a=255.0):
-        # KiCad stores colors as floats 0-1; user may also store 0-255.
-        vals = [r, g, b, a]
-        scaled = []
-        for v in vals:
-            try:
-                v = float(v)
-            except Exception:
-                v = 0.0
-            # If in 0-1 range, scale to 0-255
-            if 0.0 <= v <= 1.0:
-                v *= 255.0
-            scaled.append(int(max(0, min(255, round(v)))))
-        return QColor(scaled[0], scaled[1], scaled[2], scaled[3])
-
-    def _extract_fill_color(self, node):
-        for attr in node[1:]:
-            if not isinstance(attr, list):
-                continue
-            if attr[0] == "fill":
-                for f in attr[1:]:
-                    if isinstance(f, list) and f[0] == "color" and len(f) >= 4:
-                        return self._to_qcolor(f[1], f[2], f[3], f[4] if len(f) > 4 else 255.0)
-        return None
-
-    def _extract_stroke_color(self, node):
-        for attr in node[1:]:
-            if not isinstance(attr, list):
-                continue
-            if attr[0] == "stroke":
-                for s in attr[1:]:
-                    if isinstance(s, list) and s[0] == "color" and len(s) >= 4:
-                        return self._to_qcolor(s[1], s[2], s[3], s[4] if len(s) > 4 else 255.0)
-        return None
-
-    def _extract_stroke_width(self, node):
-        for attr in node[1:]:
-            if not isinstance(attr, list):
-                continue
-            if attr[0] == "stroke":
-                for s in attr[1:]:
-                    if isinstance(s, list) and s[0] == "width" and len(s) > 1:
-                        try:
-                            return float(s[1])
-                        except Exception:
-                            return None
-            if attr[0] == "width" and len(attr) > 1:
-                try:
-                    return float(attr[1])
-                except Exception:
-                    return None
-        return None
+        self._text_docs[key] = doc
+        return doc
 
     def _clamp_width(self, width):
         """